@@ -0,0 +1 @@
+# ATS v2 Benchmarks Package
@@ -0,0 +1,170 @@
+"""
+핫 패스 마이크로벤치마크
+"""
+
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+def bench(name: str, func: Callable[[], object], number: int = 1000, repeat: int = 7,
+          warmup: int = 1) -> Dict:
+    """func 를 number 회씩 repeat 번 실행해 1회당 시간 통계 반환"""
+    for _ in range(warmup):
+        for _ in range(min(number, 100)):
+            func()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "name": name,
+        "iterations": number * repeat,
+        "mean_us": mean * 1e6,
+        "min_us": samples[0] * 1e6,
+        "median_us": statistics.median(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        "ops_per_sec": 1 / mean if mean > 0 else float("inf"),
+    }
+
+
+def bench_trigger() -> List[Dict]:
+    from core.trigger import Trigger
+    from core.portfolio import Portfolio
+
+    trigger = Trigger("BENCH/USDT")
+    portfolio = Portfolio("BENCH/USDT")
+    prices = [10_000 + (i % 37) * 13 for i in range(1000)]
+    state = {"i": 0}
+
+    def check():
+        i = state["i"] = (state["i"] + 1) % len(prices)
+        trigger.check(prices[i], portfolio)
+
+    holding = Portfolio("BENCH/USDT")
+    holding.holdings = 1.0
+    holding.avg_price = 10_500.0
+    holding.total_cost = 10_500.0
+
+    def check_holding():
+        i = state["i"] = (state["i"] + 1) % len(prices)
+        trigger.check(prices[i], holding)
+
+    return [
+        bench("trigger.check", check, number=20000),
+        bench("trigger.check[holding]", check_holding, number=20000),
+    ]
+
+
+def bench_portfolio() -> List[Dict]:
+    import logging
+    from core.portfolio import Portfolio
+
+    # 매매 로그는 벤치마크 대상이 아니므로 비활성화
+    logging.getLogger("core.portfolio").setLevel(logging.WARNING)
+    portfolio = Portfolio("BENCH/USDT")
+
+    def buy():
+        portfolio.add_buy(0.001, 10_000.0, 0.005)
+
+    def sell():
+        portfolio.holdings += 0.001
+        portfolio.add_sell(0.001, 10_100.0, 0.005)
+
+    def status():
+        portfolio.get_status(10_050.0)
+
+    return [
+        bench("portfolio.add_buy", buy, number=20000),
+        bench("portfolio.add_sell", sell, number=20000),
+        bench("portfolio.get_status", status, number=50000),
+    ]
+
+
+def bench_data_collector(api_url: str, symbol_counts=(1, 10, 100)) -> List[Dict]:
+    from core.config import config
+    from core.data_collector import DataCollector
+
+    results = []
+    for count in symbol_counts:
+        symbols = [f"BENCH{i:03d}/USDT" for i in range(count)]
+        for symbol in symbols:
+            config.register_market(symbol, f"KRW-BENCH{symbol[5:8]}")
+        collector = DataCollector()
+        collector.base_url = api_url
+
+        def fetch():
+            collector.price_cache.clear()
+            collector.get_multiple_prices(symbols)
+
+        results.append(bench(f"data_collector.get_multiple_prices[{count}]", fetch, number=50, repeat=5))
+
+        def cached():
+            collector.get_multiple_prices(symbols)
+
+        collector.get_multiple_prices(symbols)
+        results.append(bench(f"data_collector.get_multiple_prices[{count},cached]", cached, number=2000))
+    return results
+
+
+def bench_jwt() -> List[Dict]:
+    from core.upbit_client import UpbitClient
+
+    client = UpbitClient("bench-access-key", "bench-secret-key-0123456789abcdef")
+    params = {"market": "KRW-BTC", "side": "bid", "ord_type": "price", "price": "10000"}
+    return [
+        bench("upbit_client._generate_jwt_token", lambda: client._generate_jwt_token(), number=5000),
+        bench("upbit_client._generate_jwt_token[query]", lambda: client._generate_jwt_token(params), number=5000),
+    ]
+
+
+def bench_notifier() -> List[Dict]:
+    from core.notifier import Notifier
+
+    notifier = Notifier("BENCH/USDT", {"enable_console": False, "enable_file": False})
+    order = {"type": "buy", "quantity": 0.001, "price": 10_000.0}
+    status = {"holdings": 0.5, "avg_price": 9_900.0, "profit": 50.0, "profit_rate": 1.01}
+    return [
+        bench("notifier._format_trade_message", lambda: notifier._format_trade_message(order, status), number=20000),
+        bench("notifier._format_status_message", lambda: notifier._format_status_message(status, 10_000.0), number=20000),
+    ]
+
+
+def bench_simulator() -> List[Dict]:
+    from core.orderbook import OrderBook
+    from core.simulator import FillSimulator
+
+    simulator = FillSimulator("KRW-BENCH", latency_ms=50, slippage_bps=5, min_order_amount=0)
+    book = OrderBook("KRW-BENCH", 15)
+    book.update([{"ask_price": 10_010 + i * 10, "ask_size": 1.0, "bid_price": 9_990 - i * 10, "bid_size": 1.0}
+                 for i in range(15)])
+
+    def fill_no_book():
+        simulator.execute("buy", 0.5, 10_000.0)
+
+    book_simulator = FillSimulator("KRW-BENCH", latency_ms=50, min_order_amount=0)
+    book_simulator.update_book(book.snapshot())
+
+    def fill_book():
+        book_simulator.execute("buy", 3.5, 10_000.0)
+
+    return [
+        bench("simulator.execute", fill_no_book, number=50000),
+        bench("simulator.execute[book]", fill_book, number=20000),
+        bench("orderbook.vwap_for_notional", lambda: book.vwap_for_notional("buy", 50_000), number=20000),
+    ]
+
+
+def run_all(api_url: str) -> List[Dict]:
+    """모든 마이크로벤치마크 실행"""
+    results: List[Dict] = []
+    for suite in (bench_trigger, bench_portfolio, bench_jwt, bench_notifier, bench_simulator):
+        results.extend(suite())
+    results.extend(bench_data_collector(api_url))
+    return results
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+ATS v2 벤치마크 실행기
+
+사용법:
+    python -m benchmarks.run                      # 전체 실행, benchmarks/results/<커밋>.json 저장
+    python -m benchmarks.run --suite micro        # 마이크로벤치마크만
+    python -m benchmarks.run --suite scale --assets 10 100 500 --duration 10
+    python -m benchmarks.run --compare benchmarks/results/a.json benchmarks/results/b.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def _prepare_environment(api_url: str):
+    """벤치마크용 환경변수 (실제 거래/외부 호출 방지)"""
+    os.environ["DRY_RUN"] = "true"
+    os.environ["UPBIT_API_URL"] = api_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("SIM_LATENCY_MS", "0")
+
+
+def run(args) -> Dict:
+    from benchmarks.stub_server import StubUpbitServer
+
+    server = StubUpbitServer(delay=args.stub_delay).start()
+    _prepare_environment(server.url)
+    try:
+        result = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            }
+        }
+        if args.suite in ("all", "micro"):
+            from benchmarks import micro
+            result["micro"] = micro.run_all(server.url)
+        if args.suite in ("all", "scale"):
+            from benchmarks import scale
+            result["scale"] = scale.run_all(args.assets, args.duration, args.interval)
+        result["meta"]["stub_requests"] = server.requests_served
+        return result
+    finally:
+        server.stop()
+
+
+def save(result: Dict, output: Optional[str]) -> str:
+    path = output or os.path.join(RESULTS_DIR, f"{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare(base_path: str, head_path: str, threshold: float) -> int:
+    """두 결과 비교. 임계값 이상 느려진 항목이 있으면 1 반환"""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(head_path, encoding="utf-8") as f:
+        head = json.load(f)
+
+    regressions = 0
+    base_micro = {r["name"]: r for r in base.get("micro", [])}
+    print(f"{'benchmark':48} {'base(us)':>12} {'head(us)':>12} {'change':>8}")
+    for row in head.get("micro", []):
+        old = base_micro.get(row["name"])
+        if not old:
+            continue
+        change = row["median_us"] / old["median_us"] - 1 if old["median_us"] else 0.0
+        flag = " !" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{row['name']:48} {old['median_us']:12.2f} {row['median_us']:12.2f} {change:+8.1%}{flag}")
+
+    base_scale = {r["assets"]: r for r in base.get("scale", [])}
+    for row in head.get("scale", []):
+        old = base_scale.get(row["assets"])
+        if not old:
+            continue
+        change = row["ticks_per_sec"] / old["ticks_per_sec"] - 1 if old["ticks_per_sec"] else 0.0
+        flag = " !" if change < -threshold else ""
+        regressions += bool(flag)
+        print(f"{'scale[' + str(row['assets']) + '] ticks/s':48} {old['ticks_per_sec']:12.1f} "
+              f"{row['ticks_per_sec']:12.1f} {change:+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ATS v2 벤치마크")
+    parser.add_argument("--suite", choices=("all", "micro", "scale"), default="all")
+    parser.add_argument("--assets", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--duration", type=float, default=10.0, help="자산 수별 실행 시간(초)")
+    parser.add_argument("--interval", type=float, default=1.0, help="엔진 폴링 간격(초)")
+    parser.add_argument("--stub-delay", type=float, default=0.0, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="두 결과 파일 비교")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 판단할 변화율")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(args.compare[0], args.compare[1], args.threshold))
+
+    result = run(args)
+    path = save(result, args.output)
+    for row in result.get("micro", []):
+        print(f"{row['name']:48} {row['median_us']:10.2f} us  ({row['ops_per_sec']:,.0f} ops/s)")
+    for row in result.get("scale", []):
+        lag = row["loop_lag"]
+        lag_text = f"lag mean {lag['mean_ms']:.1f}ms p95<={lag['p95_ms']}ms" if lag["samples"] else "lag n/a"
+        print(f"scale[{row['assets']}]: {row['ticks_per_sec']:.1f} ticks/s "
+              f"(기대 {row['expected_ticks_per_sec']:.1f}), CPU {row['cpu_percent']:.0f}%, "
+              f"RSS {row['rss_mb']:.0f}MB, {lag_text}")
+    print(f"결과 저장: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+TraderManager 다중 엔진 확장성 테스트
+"""
+
+import json
+import os
+import resource
+import tempfile
+import time
+from typing import Dict, List
+
+
+def _rss_mb() -> float:
+    """현재 RSS (MB)"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # /proc 이 없는 환경은 최대 RSS 로 대체
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _histogram_stats(metric, symbols: List[str]) -> Dict:
+    """엔진별 히스토그램을 합산해 평균과 근사 p95 (ms) 계산"""
+    buckets = metric.buckets + (float("inf"),)
+    cumulative = [0.0] * len(buckets)
+    count = total = 0.0
+    for symbol in symbols:
+        child_cum, child_count, child_sum = metric.labels(symbol).snapshot()
+        cumulative = [a + b for a, b in zip(cumulative, child_cum)]
+        count += child_count
+        total += child_sum
+    if not count:
+        return {"mean_ms": None, "p95_ms": None, "samples": 0}
+    target = count * 0.95
+    p95 = next((b for b, c in zip(buckets, cumulative) if c >= target), buckets[-1])
+    return {
+        "mean_ms": total / count * 1000,
+        "p95_ms": p95 * 1000 if p95 != float("inf") else None,
+        "samples": int(count),
+    }
+
+
+def _write_assets(count: int, directory: str) -> str:
+    assets = [{
+        "symbol": f"SYN{i:04d}/USDT",
+        "market": f"KRW-SYN{i:04d}",
+        "base_currency": f"SYN{i:04d}",
+        "quote_currency": "KRW",
+        "trade_amount": 1.0
+    } for i in range(count)]
+    path = os.path.join(directory, f"assets_{count}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(assets, f)
+    return path
+
+
+def run_scale(asset_count: int, duration: float, interval: float) -> Dict:
+    """자산 asset_count 개로 duration 초 동안 모의거래 실행"""
+    from core.engine.manager import TraderManager
+    from core.metrics import LOOP_LAG_SECONDS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assets_file = _write_assets(asset_count, tmp)
+
+        rss_before = _rss_mb()
+        build_start = time.perf_counter()
+        # 이전 실행의 체크포인트가 결과에 섞이지 않도록 사용 안 함
+        manager = TraderManager(config_file=assets_file, dry_run=True, checkpoint_path="")
+        build_seconds = time.perf_counter() - build_start
+        # 고정 간격으로 비교하기 위해 적응형 폴링 비활성화
+        manager.run_interval = interval
+        manager.scheduler = None
+        for engine in manager.engines.values():
+            engine.notifier.config["enable_console"] = False
+            engine.executor.min_order_interval = 0
+
+        symbols = list(manager.engines)
+        runs_before = sum(e.run_count for e in manager.engines.values())
+        cpu_before = _cpu_seconds()
+        wall_start = time.perf_counter()
+
+        manager.start()
+        time.sleep(duration)
+        runs_after = sum(e.run_count for e in manager.engines.values())
+        cpu_after = _cpu_seconds()
+        wall = time.perf_counter() - wall_start
+        rss_after = _rss_mb()
+        lag = _histogram_stats(LOOP_LAG_SECONDS, symbols)
+
+        stop_start = time.perf_counter()
+        manager.stop()
+        stop_seconds = time.perf_counter() - stop_start
+
+    ticks = runs_after - runs_before
+    return {
+        "assets": asset_count,
+        "duration_s": wall,
+        "interval_s": interval,
+        "ticks": ticks,
+        "ticks_per_sec": ticks / wall,
+        "expected_ticks_per_sec": asset_count / interval,
+        "cpu_percent": (cpu_after - cpu_before) / wall * 100,
+        "rss_mb": rss_after,
+        "rss_delta_mb": rss_after - rss_before,
+        "build_s": build_seconds,
+        "stop_s": stop_seconds,
+        "loop_lag": lag,
+    }
+
+
+def run_all(asset_counts=(10, 100, 500), duration: float = 10.0, interval: float = 1.0) -> List[Dict]:
+    """자산 수별 확장성 테스트 실행"""
+    return [run_scale(count, duration, interval) for count in asset_counts]
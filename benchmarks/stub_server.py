@@ -0,0 +1,107 @@
+"""
+벤치마크용 로컬 업비트 시세 API 스텁 서버
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class _PriceBook:
+    """마켓별 랜덤 워크 가격"""
+
+    def __init__(self, start: float = 10_000.0, volatility: float = 0.003, seed: int = 42):
+        self._prices: Dict[str, float] = {}
+        self._start = start
+        self._volatility = volatility
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_price(self, market: str) -> float:
+        with self._lock:
+            price = self._prices.get(market, self._start)
+            price *= 1 + self._random.gauss(0, self._volatility)
+            price = max(round(price), 1)
+            self._prices[market] = price
+            return float(price)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    prices: _PriceBook = None
+    delay: float = 0.0
+    requests_served = 0
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        markets = query.get("markets", [""])[0].split(",") if "markets" in query else []
+        if self.delay:
+            time.sleep(self.delay)
+
+        if parsed.path == "/v1/ticker":
+            body = [{"market": m, "trade_price": self.prices.next_price(m),
+                     "timestamp": int(time.time() * 1000)} for m in markets if m]
+        elif parsed.path == "/v1/orderbook":
+            body = []
+            for m in markets:
+                if not m:
+                    continue
+                mid = self.prices.next_price(m)
+                units = [{"ask_price": mid + (i + 1) * 10, "ask_size": 1.0 + i,
+                          "bid_price": mid - (i + 1) * 10, "bid_size": 1.0 + i} for i in range(15)]
+                body.append({"market": m, "timestamp": int(time.time() * 1000), "orderbook_units": units})
+        elif parsed.path == "/v1/market/all":
+            body = []
+        else:
+            self.send_error(404)
+            return
+
+        _StubHandler.requests_served += 1
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubHttpServer(ThreadingHTTPServer):
+    # 기본 listen 백로그(5)로는 엔진 수백 개의 동시 접속이 밀려 시세 조회 제한 시간과
+    # 차단기에 걸리므로, 엔진이 아니라 스텁을 측정하게 됨
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubUpbitServer:
+    """/v1/ticker, /v1/orderbook 을 흉내내는 로컬 서버"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, seed: int = 42):
+        handler = type("Handler", (_StubHandler,), {"prices": _PriceBook(seed=seed), "delay": delay})
+        self._handler = handler
+        self._server = _StubHttpServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests_served(self) -> int:
+        return self._handler.requests_served
+
+    def start(self) -> "StubUpbitServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="StubUpbitServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,83 @@
+import threading
+from typing import Dict, Optional
+from core.config import config
+from core.risk import RiskManager, get_risk_manager
+from core.settings import ConfigError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Account:
+    """거래소 계정 하나의 API 키, 주문 클라이언트, 리스크 관리자
+
+    name 이 None 이면 기본 계정(UPBIT_*_KEY, RISK_*)이며 공용 클라이언트와 공용 리스크
+    관리자를 그대로 쓴다. 주문 클라이언트는 실거래 주문을 처음 낼 때 만든다.
+    """
+
+    __slots__ = ("name", "access_key", "secret_key", "risk", "_client", "_lock")
+
+    def __init__(self, name: Optional[str], access_key: Optional[str], secret_key: Optional[str],
+                 risk: RiskManager):
+        self.name = name
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.risk = risk
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def has_api_keys(self) -> bool:
+        return self.access_key is not None and self.secret_key is not None
+
+    def client(self):
+        """계정 전용 업비트 클라이언트 (요청 한도/차단기가 계정별, API 키가 없으면 ValueError)"""
+        if self._client is None:
+            from core.upbit_client import UpbitClient, get_upbit_client
+            with self._lock:
+                if self._client is None:
+                    if self.name is None:
+                        self._client = get_upbit_client()
+                    else:
+                        if not self.has_api_keys:
+                            raise ValueError(f"계정 {self.name} 의 API 키가 설정되지 않았습니다")
+                        self._client = UpbitClient(self.access_key, self.secret_key, account=self.name)
+        return self._client
+
+    def fetch_balances(self) -> Dict[str, float]:
+        """계좌 잔고 (통화 -> 수량)"""
+        return {account["currency"]: float(account["balance"]) for account in self.client().get_accounts()}
+
+
+_accounts: Dict[Optional[str], Account] = {}
+_accounts_lock = threading.Lock()
+
+
+def get_account(name: Optional[str] = None) -> Account:
+    """계정 조회 (None: 기본 계정, ACCOUNTS 에 없는 이름이면 ConfigError)
+
+    계정 목록과 키는 처음 조회할 때의 설정 기준이다 (바꾸면 재시작 필요).
+    """
+    account = _accounts.get(name)
+    if account is None:
+        with _accounts_lock:
+            account = _accounts.get(name)
+            if account is None:
+                settings = config.settings
+                if name is None:
+                    account = Account(None, settings.upbit_access_key, settings.upbit_secret_key,
+                                      get_risk_manager())
+                else:
+                    found = next((item for item in settings.accounts if item.name == name), None)
+                    if found is None:
+                        raise ConfigError(f"알 수 없는 계정: {name} (ACCOUNTS 에 없음)")
+                    account = Account(name, found.access_key, found.secret_key,
+                                      RiskManager(found.risk_max_exposure, found.risk_max_daily_loss))
+                    logger.info(f"계정 등록: {name}")
+                _accounts[name] = account
+    return account
+
+
+def get_accounts() -> Dict[Optional[str], Account]:
+    """지금까지 사용한 계정 (이름 -> 계정)"""
+    return dict(_accounts)
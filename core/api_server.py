@@ -0,0 +1,170 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from core.events import event_bus
+from core.accounts import get_account, get_accounts
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """상태 조회 API
+
+    GET /api/status               전체 상태 (엔진 스냅샷 기준)
+    GET /api/portfolio/<symbol>   자산별 상태/포트폴리오 (symbol: 엔진 식별자, 예: BTC/USDT, BTC/USDT@sub)
+    GET /api/trades/<symbol>      최근 주문 (?count=N)
+    GET /api/risk                 리스크 합계 (노출, 대기 주문 금액, 당일 손실, 사용 가능 현금,
+                                  accounts: 추가 계정별 합계)
+    GET /api/events               SSE 스트림 (price/signal/trade, Last-Event-ID 지원)
+
+    모든 응답은 메모리 스냅샷과 이벤트 링에서만 만들어지며 거래소를 호출하지 않는다.
+    """
+
+    server: "_ApiHttpServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path.split("/") if s]
+        query = parse_qs(parts.query)
+        try:
+            if segments == ["api", "status"]:
+                self._send_body(200, self.server.api.status_body())
+            elif len(segments) >= 3 and segments[:2] == ["api", "portfolio"]:
+                self._send_json(*self.server.api.portfolio(self._symbol(segments)))
+            elif len(segments) >= 3 and segments[:2] == ["api", "trades"]:
+                count = int(query.get("count", ["50"])[0])
+                self._send_json(*self.server.api.trades(self._symbol(segments), count))
+            elif segments == ["api", "risk"]:
+                self._send_json(200, self._risk())
+            elif segments == ["api", "events"]:
+                self._stream_events()
+            else:
+                self._send_json(404, {"error": "not found"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+
+    @staticmethod
+    def _symbol(segments) -> str:
+        """경로 뒤쪽 세그먼트 -> 엔진 식별자 (BTC/USDT 처럼 '/' 가 든 심볼, %2F 인코딩 모두 허용)"""
+        return unquote("/".join(segments[2:]))
+
+    @staticmethod
+    def _risk() -> Dict:
+        accounts = {name: account.risk.snapshot().to_dict()
+                    for name, account in get_accounts().items() if name is not None}
+        return dict(get_account().risk.snapshot().to_dict(), accounts=accounts)
+
+    def _send_json(self, status: int, data):
+        self._send_body(status, json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def _send_body(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self):
+        last_id = self.headers.get("Last-Event-ID")
+        last_seq = int(last_id) if last_id and last_id.isdigit() else event_bus.last_seq
+        wanted = set(parse_qs(urlsplit(self.path).query).get("symbol", []))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        self.wfile.write(b"retry: 3000\n\n")
+        self.wfile.flush()
+
+        while self.server.running:
+            events = event_bus.events_since(last_seq, SSE_KEEPALIVE_SECONDS)
+            if not events:
+                self.wfile.write(b": keepalive\n\n")
+            for event in events:
+                last_seq = event.seq
+                if wanted and event.symbol not in wanted:
+                    continue
+                self.wfile.write(
+                    f"id: {event.seq}\nevent: {event.type}\ndata: {event.payload}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+    def log_message(self, format, *args):
+        logger.debug("api %s - %s", self.address_string(), format % args)
+
+
+class _ApiHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+    running = True
+    api: "ApiServer"
+
+
+class ApiServer:
+    """로컬 상태 API / SSE 서버"""
+
+    def __init__(self, manager, host: str = "127.0.0.1", port: int = 8080):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self._server: Optional[_ApiHttpServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._status_lock = threading.Lock()
+        self._status_cache: Tuple[Optional[tuple], bytes] = (None, b"")
+
+    def status_body(self) -> bytes:
+        """전체 상태 JSON (스냅샷이 바뀐 경우에만 다시 인코딩)"""
+        status = self.manager.get_overall_status()
+        key = (status.updated_at, status.is_running, status.active_threads, status.total_engines)
+        cached_key, body = self._status_cache
+        if cached_key == key:
+            return body
+        with self._status_lock:
+            body = json.dumps(status.to_dict(), ensure_ascii=False, default=str).encode("utf-8")
+            self._status_cache = (key, body)
+        return body
+
+    def portfolio(self, symbol: str) -> Tuple[int, Dict]:
+        engine = self.manager.engines.get(symbol)
+        if engine is None:
+            return 404, {"error": f"unknown symbol: {symbol}"}
+        return 200, engine.get_status()
+
+    def trades(self, symbol: str, count: int) -> Tuple[int, Dict]:
+        engine = self.manager.engines.get(symbol)
+        if engine is None:
+            return 404, {"error": f"unknown symbol: {symbol}"}
+        orders = engine.executor.get_order_history(max(count, 0))
+        return 200, {"symbol": symbol, "orders": [order.to_dict() for order in reversed(orders)]}
+
+    def start(self):
+        """서버 스레드 시작"""
+        if self._server is not None:
+            return
+        event_bus.start()
+        self._server = _ApiHttpServer((self.host, self.port), _ApiHandler)
+        self._server.api = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ApiServer", daemon=True)
+        self._thread.start()
+        logger.info(f"상태 API 서버 시작: http://{self.host}:{self.port}/api/status")
+
+    def stop(self):
+        """서버 종료 (SSE 연결도 다음 대기에서 종료)"""
+        if self._server is None:
+            return
+        self._server.running = False
+        event_bus.stop()
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        logger.info("상태 API 서버 종료")
@@ -0,0 +1,129 @@
+import bisect
+import math
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 파일 형식 (리틀 엔디언)
+#   헤더:  magic(4s) version(H) saved_at(d) count(I)
+#   항목:  symbol_len(H) symbol(utf-8) action(B) last_action_price(d, 없으면 NaN)
+#          updated_at(d) n(I) price_history(n * d)
+#   끝:    앞부분 전체의 crc32(I)
+MAGIC = b"ATSK"
+VERSION = 1
+_HEADER = struct.Struct("<4sHdI")
+_RECORD = struct.Struct("<BddI")
+_LENGTH = struct.Struct("<H")
+_CRC = struct.Struct("<I")
+
+_ACTIONS = (None, "buy", "sell", "hold")
+_ACTION_CODES = {action: code for code, action in enumerate(_ACTIONS)}
+
+
+class CheckpointError(ValueError):
+    """손상되었거나 형식이 다른 체크포인트"""
+
+
+class TriggerState(NamedTuple):
+    """엔진 하나의 지표/전략 상태"""
+    symbol: str
+    price_history: Tuple[float, ...]
+    last_action: Optional[str]
+    last_action_price: Optional[float]
+    updated_at: float  # 마지막 가격 표본 시각 (epoch 초)
+
+
+def encode_checkpoint(states: Iterable[TriggerState], saved_at: float) -> bytes:
+    states = list(states)
+    parts = [_HEADER.pack(MAGIC, VERSION, saved_at, len(states))]
+    for state in states:
+        symbol = state.symbol.encode("utf-8")
+        history = state.price_history
+        price = state.last_action_price
+        parts.append(_LENGTH.pack(len(symbol)))
+        parts.append(symbol)
+        parts.append(_RECORD.pack(_ACTION_CODES.get(state.last_action, 0),
+                                  math.nan if price is None else price, state.updated_at, len(history)))
+        parts.append(struct.pack(f"<{len(history)}d", *history))
+    body = b"".join(parts)
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def decode_checkpoint(data: bytes) -> Tuple[float, Dict[str, TriggerState]]:
+    """(저장 시각, 심볼 -> 상태)"""
+    if len(data) < _HEADER.size + _CRC.size:
+        raise CheckpointError("체크포인트가 너무 짧음")
+    body, (crc,) = data[:-_CRC.size], _CRC.unpack(data[-_CRC.size:])
+    if zlib.crc32(body) != crc:
+        raise CheckpointError("체크포인트 crc 불일치")
+    magic, version, saved_at, count = _HEADER.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise CheckpointError(f"지원하지 않는 체크포인트 형식: {magic!r} v{version}")
+
+    states: Dict[str, TriggerState] = {}
+    offset = _HEADER.size
+    try:
+        for _ in range(count):
+            (length,) = _LENGTH.unpack_from(body, offset)
+            offset += _LENGTH.size
+            symbol = body[offset:offset + length].decode("utf-8")
+            offset += length
+            code, price, updated_at, n = _RECORD.unpack_from(body, offset)
+            offset += _RECORD.size
+            history = struct.unpack_from(f"<{n}d", body, offset)
+            offset += n * 8
+            states[symbol] = TriggerState(symbol, history, _ACTIONS[code] if code < len(_ACTIONS) else None,
+                                          None if math.isnan(price) else price, updated_at)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise CheckpointError(f"체크포인트 항목 해석 실패: {e}") from e
+    return saved_at, states
+
+
+def save_checkpoint(path: str, states: Iterable[TriggerState], saved_at: float):
+    """임시 파일에 쓴 뒤 이름 변경으로 교체 (중간에 죽어도 이전 체크포인트는 온전함)"""
+    data = encode_checkpoint(states, saved_at)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Optional[Tuple[float, Dict[str, TriggerState]]]:
+    """체크포인트 읽기 (없거나 손상되었으면 None)"""
+    try:
+        with open(path, "rb") as f:
+            return decode_checkpoint(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, CheckpointError) as e:
+        logger.warning(f"체크포인트 무시 ({path}): {e}")
+        return None
+
+
+def fill_gap(last_time: float, now: float, interval: float,
+             closes: Sequence[Tuple[float, float]], limit: int) -> List[float]:
+    """last_time 이후 interval 간격으로 빠진 표본을 분봉 종가(시작 시각, 종가)로 채움
+
+    각 표본 시각을 포함하는 분봉의 종가를 쓰며, 최대 limit 개(가장 최근 것)까지 만든다.
+    """
+    if interval <= 0 or not closes:
+        return []
+    steps = int((now - last_time) // interval)
+    if steps <= 0:
+        return []
+    starts = [start for start, _ in closes]
+    samples = []
+    for k in range(max(steps - limit, 0) + 1, steps + 1):
+        index = bisect.bisect_right(starts, last_time + k * interval) - 1
+        if index >= 0:
+            samples.append(closes[index][1])
+    return samples
@@ -0,0 +1,34 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Clock:
+    """매매 판단 경로용 시계
+
+    엔진 사이클 안에서는 사이클 시작 시각으로 고정되어, 같은 사이클의 모든 판단(주문 간격,
+    리스크 한도, 모의 체결 시각)이 같은 '지금'을 본다. 기록된 사이클 시각으로 고정해 다시
+    실행하면 실시간 실행과 같은 판단이 나온다. 고정은 스레드별이라 엔진끼리 섞이지 않는다.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def time(self) -> float:
+        """현재 시각 (epoch 초, 고정되어 있으면 고정 시각)"""
+        now = getattr(self._local, "now", None)
+        return now if now is not None else time.time()
+
+    @contextmanager
+    def frozen(self, now: float):
+        """이 스레드의 시각을 now 로 고정"""
+        previous = getattr(self._local, "now", None)
+        self._local.now = now
+        try:
+            yield now
+        finally:
+            self._local.now = previous
+
+
+# 전역 시계
+clock = Clock()
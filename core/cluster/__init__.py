@@ -0,0 +1 @@
+# ATS v2 Cluster Package 
\ No newline at end of file
@@ -0,0 +1,329 @@
+import hashlib
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from core.config import config
+from core.data_collector import DataCollector
+from core.accounts import get_account
+from core.settings import AssetConfig, load_assets
+from core.cluster.protocol import (
+    Connection, ProtocolError, parse_address, encode_prices,
+    HELLO, ASSIGN, PRICES, ORDER, ORDER_RESULT, HEARTBEAT, BYE
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Upbit 시세 API 한 번에 조회할 최대 마켓 수
+COLLECT_BATCH_SIZE = 100
+
+
+def _score(worker_id: str, key: str) -> int:
+    digest = hashlib.blake2b(f"{worker_id}|{key}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def assign_assets(worker_ids: List[str], keys: List[str]) -> Dict[str, Set[str]]:
+    """랑데부 해싱으로 자산(엔진 식별자)을 워커에 배정
+
+    각 자산은 (워커, 자산) 해시 점수가 가장 높은 워커에게 간다. 워커가 추가/제거될 때
+    그 워커와 관련된 자산만 옮겨지므로 나머지 엔진의 상태는 유지된다.
+    """
+    assignment: Dict[str, Set[str]] = {worker_id: set() for worker_id in worker_ids}
+    if not worker_ids:
+        return assignment
+    for key in keys:
+        owner = max(worker_ids, key=lambda worker_id: _score(worker_id, key))
+        assignment[owner].add(key)
+    return assignment
+
+
+class _WorkerSession:
+    __slots__ = ("worker_id", "conn", "keys", "symbols", "last_seen")
+
+    def __init__(self, worker_id: str, conn: Connection):
+        self.worker_id = worker_id
+        self.conn = conn
+        # 첫 재배정에서 (빈 배정이라도) 반드시 ASSIGN 을 보내도록 None 으로 시작
+        self.keys: Optional[Set[str]] = None
+        # 배정된 자산의 시세 심볼 (여러 계정이 같은 심볼을 거래하면 하나로 합침)
+        self.symbols: Set[str] = set()
+        self.last_seen = time.monotonic()
+
+
+class Coordinator:
+    """멀티노드 코디네이터
+
+    거래소와 통신하는 유일한 노드로 다음을 담당한다.
+    - 시세 수집: 전체 자산 시세를 요청 예산 안에서 배치 조회해 워커별로 바이너리 프레임 전송
+    - 자산 배정: 워커 접속/이탈 시 랑데부 해싱으로 재배정 (ASSIGN)
+    - 주문 중계: 워커의 실거래 주문을 주문 계정의 업비트 클라이언트로 실행
+
+    자산은 엔진 식별자(기본 계정은 심볼, 그 외는 '심볼@계정') 단위로 배정하고, 시세는
+    심볼 단위로 한 번만 수집한다.
+
+    워커는 TCP(host:port) 또는 Unix 소켓(unix:/path)으로 접속한다.
+    """
+
+    def __init__(self, address: str, config_file: str = "config/assets.json",
+                 collect_interval: float = None, request_budget: float = None,
+                 heartbeat_timeout: float = 10.0):
+        self.address = address
+        assets = load_assets(config_file)
+        self.assets: Dict[str, AssetConfig] = {asset.key: asset for asset in assets}
+        self.keys = sorted(self.assets)
+        self.symbols = sorted({asset.symbol for asset in assets})
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        for asset in assets:
+            if asset.market:
+                config.register_market(asset.symbol, asset.market)
+
+        self.collect_interval = collect_interval or config.min_polling_interval
+        self.request_budget = request_budget or config.request_budget
+        self.heartbeat_timeout = heartbeat_timeout
+        self.collector = DataCollector()
+        self.order_client = None
+        if not config.dry_run and config.has_api_keys:
+            from core.upbit_client import get_upbit_client
+            self.order_client = get_upbit_client()
+
+        self._workers: Dict[str, _WorkerSession] = {}
+        # 마지막 수집 가격 (새로 배정된 워커가 다음 수집 주기까지 기다리지 않도록 즉시 전송)
+        self._last_prices: Dict[str, float] = {}
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+        # 재배정은 계산과 ASSIGN 전송을 한 번에 하나씩 (동시 재배정의 전송 순서가 뒤바뀌지 않도록)
+        self._rebalance_lock = threading.Lock()
+        self._generations = itertools.count(1)
+        self._stop = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+        self._order_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ClusterOrder")
+
+    # ----- 연결 관리 -----
+
+    def start(self):
+        """소켓 리스너와 시세 수집 스레드 시작"""
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.unlink(target)
+        listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(target)
+        listener.listen(64)
+        self._listener = listener
+        if family == socket.AF_INET and target[1] == 0:
+            self.address = f"{target[0]}:{listener.getsockname()[1]}"
+
+        self._stop.clear()
+        for name, func in (("ClusterAccept", self._accept_loop), ("ClusterFeed", self._feed_loop),
+                           ("ClusterReaper", self._reap_loop)):
+            thread = threading.Thread(target=func, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"코디네이터 시작: {self.address} ({len(self.keys)}개 자산, 시세 {len(self.symbols)}개)")
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                break
+            if sock.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(Connection(sock),),
+                             name="ClusterSession", daemon=True).start()
+
+    def _serve(self, conn: Connection):
+        session = None
+        try:
+            frame = conn.recv()
+            if frame is None or frame[0] != HELLO:
+                raise ProtocolError("HELLO 가 아닌 첫 프레임")
+            worker_id = json.loads(frame[1])["worker_id"]
+            session = _WorkerSession(worker_id, conn)
+            with self._lock:
+                previous = self._workers.get(worker_id)
+                self._workers[worker_id] = session
+            if previous is not None:
+                previous.conn.close()
+            logger.info(f"워커 접속: {worker_id}")
+            self._rebalance()
+
+            while not self._stop.is_set():
+                frame = conn.recv()
+                if frame is None or frame[0] == BYE:
+                    break
+                session.last_seen = time.monotonic()
+                if frame[0] == ORDER:
+                    self._order_pool.submit(self._route_order, session, frame[1])
+        except (OSError, ValueError, KeyError, ProtocolError) as e:
+            logger.warning(f"워커 세션 오류: {e}")
+        finally:
+            conn.close()
+            if session is not None:
+                self._drop(session)
+
+    def _drop(self, session: _WorkerSession):
+        with self._lock:
+            if self._workers.get(session.worker_id) is not session:
+                return
+            del self._workers[session.worker_id]
+        session.conn.close()
+        logger.info(f"워커 이탈: {session.worker_id}")
+        if not self._stop.is_set():
+            self._rebalance()
+
+    def _reap_loop(self):
+        """하트비트가 끊긴 워커 정리"""
+        while not self._stop.wait(self.heartbeat_timeout / 2):
+            deadline = time.monotonic() - self.heartbeat_timeout
+            for session in list(self._workers.values()):
+                if session.last_seen < deadline:
+                    logger.warning(f"워커 하트비트 시간 초과: {session.worker_id}")
+                    self._drop(session)
+
+    def _rebalance(self):
+        """현재 워커 목록 기준으로 재배정 후 배정이 바뀐 워커에만 ASSIGN 전송
+
+        ASSIGN 에는 증가하는 세대 번호를 붙여 워커가 늦게 도착한 이전 배정을 버리게 한다.
+        """
+        with self._rebalance_lock:
+            with self._lock:
+                sessions = dict(self._workers)
+                assignment = assign_assets(sorted(sessions), self.keys)
+                changed = []
+                for worker_id, keys in assignment.items():
+                    session = sessions[worker_id]
+                    if keys != session.keys:
+                        session.keys = keys
+                        session.symbols = {self.assets[key].symbol for key in keys}
+                        changed.append(session)
+            generation = next(self._generations)
+            for session in changed:
+                symbols = sorted(session.symbols)
+                entries = [(self.index[symbol], self._last_prices[symbol], self._last_fetch)
+                           for symbol in symbols if symbol in self._last_prices]
+                try:
+                    session.conn.send_json(ASSIGN, {
+                        "generation": generation,
+                        "assets": [self.assets[key].to_dict() for key in sorted(session.keys)],
+                        "index": {symbol: self.index[symbol] for symbol in symbols},
+                    })
+                    if entries:
+                        session.conn.send(PRICES, encode_prices(entries))
+                except OSError:
+                    session.conn.close()
+        if changed:
+            summary = ", ".join(f"{s.worker_id}={len(s.keys or ())}" for s in sessions.values())
+            logger.info(f"자산 재배정: {summary}")
+
+    # ----- 시세 수집 -----
+
+    def _fetch_prices(self) -> Dict[str, Optional[float]]:
+        prices: Dict[str, Optional[float]] = {}
+        for start in range(0, len(self.symbols), COLLECT_BATCH_SIZE):
+            prices.update(self.collector._get_upbit_prices(self.symbols[start:start + COLLECT_BATCH_SIZE]))
+        return prices
+
+    def _feed_loop(self):
+        batches = max((len(self.symbols) + COLLECT_BATCH_SIZE - 1) // COLLECT_BATCH_SIZE, 1)
+        # 배치 요청 수가 요청 예산을 넘지 않도록 수집 간격 보정
+        interval = max(self.collect_interval, batches / self.request_budget if self.request_budget > 0 else 0)
+        while not self._stop.is_set():
+            sessions = list(self._workers.values())
+            if sessions:
+                prices = self._fetch_prices()
+                now = time.time()
+                self._last_prices.update((symbol, price) for symbol, price in prices.items() if price is not None)
+                self._last_fetch = now
+                for session in sessions:
+                    entries = [(self.index[symbol], prices[symbol], now)
+                               for symbol in session.symbols if prices.get(symbol) is not None]
+                    try:
+                        if entries:
+                            session.conn.send(PRICES, encode_prices(entries))
+                        else:
+                            session.conn.send(HEARTBEAT)
+                    except OSError:
+                        session.conn.close()
+            self._stop.wait(interval)
+
+    # ----- 주문 중계 -----
+
+    def _order_client(self, account: Optional[str]):
+        """주문 계정의 업비트 클라이언트 (없으면 None, 알 수 없는 계정/키 누락은 ValueError)"""
+        if account is None or config.dry_run:
+            return self.order_client
+        return get_account(account).client()
+
+    def _route_order(self, session: _WorkerSession, payload: bytes):
+        request = json.loads(payload)
+        params = request["params"]
+        op = request.get("op", "place_order")
+        response = {"req_id": request["req_id"]}
+        try:
+            client = self._order_client(params.pop("account", None))
+        except ValueError as e:
+            # ConfigError 도 ValueError
+            client = None
+            response["error"] = str(e)
+        if client is None:
+            response.setdefault("error", "코디네이터에 실거래 클라이언트가 없습니다")
+        elif op == "get_order":
+            # 결과를 모르는 주문 확정용 조회 (주문 없음은 result=None, 조회 실패는 오류)
+            try:
+                response["result"] = client.get_order(**params)
+            except Exception as e:
+                response["error"] = f"주문 조회 실패: {e}"
+        elif op != "place_order":
+            response["error"] = f"알 수 없는 주문 요청: {op}"
+        else:
+            result = client.place_order(**params)
+            if result is None:
+                response["error"] = "주문 실행 실패"
+            else:
+                response["result"] = result
+        try:
+            session.conn.send_json(ORDER_RESULT, response)
+        except OSError:
+            session.conn.close()
+
+    # ----- 상태/종료 -----
+
+    def status(self) -> Dict[str, int]:
+        """워커별 배정 자산 수"""
+        return {worker_id: len(session.keys or ()) for worker_id, session in list(self._workers.items())}
+
+    def stop(self):
+        """워커에 종료를 알리고 리스너 종료"""
+        self._stop.set()
+        if self._listener is not None:
+            try:
+                # accept() 대기 중인 스레드를 깨움
+                self._listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._listener.close()
+            self._listener = None
+        for session in list(self._workers.values()):
+            try:
+                session.conn.send(BYE)
+            except OSError:
+                pass
+            session.conn.close()
+        self._workers.clear()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads.clear()
+        self._order_pool.shutdown(wait=False)
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.unlink(target)
+        logger.info("코디네이터 종료")
@@ -0,0 +1,97 @@
+import json
+import socket
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 프레임: [유형 1바이트][길이 4바이트][페이로드]
+HEADER = struct.Struct("!BI")
+# 가격 항목: [심볼 인덱스 4바이트][가격 8바이트][시각 8바이트]
+PRICE_ENTRY = struct.Struct("!Idd")
+PRICE_COUNT = struct.Struct("!H")
+
+MAX_FRAME = 16 * 1024 * 1024
+
+HELLO = 1          # 워커 -> 코디네이터 (JSON: worker_id)
+ASSIGN = 2         # 코디네이터 -> 워커 (JSON: assets, index)
+PRICES = 3         # 코디네이터 -> 워커 (바이너리 가격 묶음)
+ORDER = 4          # 워커 -> 코디네이터 (JSON: req_id, op(place_order | get_order), params)
+ORDER_RESULT = 5   # 코디네이터 -> 워커 (JSON: req_id, result | error)
+HEARTBEAT = 6      # 양방향 (빈 페이로드)
+BYE = 7            # 양방향 (정상 종료)
+
+
+class ProtocolError(Exception):
+    """잘못된 프레임"""
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """'unix:/path' 또는 'host:port' -> (소켓 family, 주소)"""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def encode_prices(entries: Iterable[Tuple[int, float, float]]) -> bytes:
+    """(인덱스, 가격, 시각) 목록을 바이너리로 인코딩 (항목당 20바이트)"""
+    entries = list(entries)
+    return PRICE_COUNT.pack(len(entries)) + b"".join(PRICE_ENTRY.pack(*entry) for entry in entries)
+
+
+def decode_prices(payload: bytes) -> List[Tuple[int, float, float]]:
+    (count,) = PRICE_COUNT.unpack_from(payload)
+    body = memoryview(payload)[PRICE_COUNT.size:PRICE_COUNT.size + count * PRICE_ENTRY.size]
+    return list(PRICE_ENTRY.iter_unpack(body))
+
+
+class Connection:
+    """프레임 단위 송수신 소켓 래퍼 (송신은 스레드 안전)"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, address: str, timeout: float = 5.0) -> "Connection":
+        family, target = parse_address(address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(target)
+        sock.settimeout(None)
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock)
+
+    def send(self, frame_type: int, payload: bytes = b""):
+        with self._send_lock:
+            self.sock.sendall(HEADER.pack(frame_type, len(payload)) + payload)
+
+    def send_json(self, frame_type: int, data: Dict):
+        self.send(frame_type, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def recv(self) -> Optional[Tuple[int, bytes]]:
+        """프레임 하나 수신 (연결 종료 시 None)"""
+        header = self._reader.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        frame_type, length = HEADER.unpack(header)
+        if length > MAX_FRAME:
+            raise ProtocolError(f"프레임이 너무 큼: {length}")
+        payload = self._reader.read(length) if length else b""
+        if len(payload) < length:
+            return None
+        return frame_type, payload
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.close()
+        self.sock.close()
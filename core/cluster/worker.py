@@ -0,0 +1,249 @@
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+from core.config import config
+from core.engine.manager import TraderManager
+from core.resilience import OrderOutcomeUnknown
+from core.settings import ConfigError, parse_assets
+from core.cluster.protocol import (
+    Connection, decode_prices,
+    HELLO, ASSIGN, PRICES, ORDER, ORDER_RESULT, HEARTBEAT, BYE
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RemotePriceFeed:
+    """코디네이터가 보내는 가격을 보관하는 가격 소스 (TraderEngine 가격 조회 인터페이스)"""
+
+    def __init__(self, stale_after: float = 30.0):
+        self.stale_after = stale_after
+        self._symbols: Dict[int, str] = {}
+        self._prices: Dict[str, tuple] = {}
+
+    def set_index(self, index: Dict[str, int]):
+        self._symbols = {i: symbol for symbol, i in index.items()}
+
+    def update(self, entries):
+        symbols = self._symbols
+        for i, price, ts in entries:
+            symbol = symbols.get(i)
+            if symbol is not None:
+                self._prices[symbol] = (price, ts)
+
+    def get_price(self, symbol: str, max_age: float = None) -> Optional[float]:
+        """최신가 (stale_after 초보다 오래됐으면 None)"""
+        entry = self._prices.get(symbol)
+        if entry is None or time.time() - entry[1] > self.stale_after:
+            return None
+        return entry[0]
+
+    def get_orderbook(self, symbol: str):
+        """호가는 전달받지 않음 (모의 체결은 슬리피지 모델 사용)"""
+        return None
+
+
+class RemoteOrderClient:
+    """코디네이터를 통해 주문하는 UpbitClient 대체 (place_order/get_order 만 제공)
+
+    account 가 있으면 코디네이터가 그 계정의 클라이언트로 주문한다. 주문을 보낸 뒤 응답을
+    받지 못하면 실패로 단정하지 않고 OrderOutcomeUnknown 을 올린다 (identifier 로 조회해 확정).
+    """
+
+    def __init__(self, worker: "ClusterWorker", timeout: float = 10.0, account: str = None):
+        self._worker = worker
+        self.timeout = timeout
+        self.account = account
+
+    def for_account(self, account: str) -> "RemoteOrderClient":
+        """같은 연결로 다른 계정 주문을 보내는 클라이언트"""
+        return RemoteOrderClient(self._worker, self.timeout, account)
+
+    def place_order(self, market: str, side: str, ord_type: str,
+                    volume: float = None, price: float = None, identifier: str = None) -> Optional[Dict]:
+        params = {"market": market, "side": side, "ord_type": ord_type, "volume": volume, "price": price,
+                  "identifier": identifier}
+        try:
+            return self._request("place_order", params)
+        except OrderOutcomeUnknown:
+            raise
+        except Exception as e:
+            logger.error(f"주문 중계 실패: {e}")
+            return None
+
+    def get_order(self, order_uuid: str = None, identifier: str = None) -> Optional[Dict]:
+        """개별 주문 조회 (주문이 없으면 None, 조회 실패는 예외)"""
+        return self._request("get_order", {"order_uuid": order_uuid, "identifier": identifier})
+
+    def _request(self, op: str, params: Dict) -> Optional[Dict]:
+        if self.account is not None:
+            params["account"] = self.account
+        return self._worker.request_order(params, self.timeout, op)
+
+
+class ClusterWorker:
+    """멀티노드 워커
+
+    코디네이터에 접속해 배정받은 자산의 엔진만 실행한다. 배정이 바뀌면 추가/제거된
+    자산만 반영하고, 연결이 끊기면 엔진은 유지한 채(가격이 오래되면 자연히 대기) 재접속한다.
+    """
+
+    def __init__(self, address: str, worker_id: str = None, dry_run: bool = None,
+                 heartbeat_interval: float = 2.0, stale_after: float = 30.0):
+        self.address = address
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = heartbeat_interval
+        self.feed = RemotePriceFeed(stale_after)
+        checkpoint_path = f"{config.checkpoint_path}.{self.worker_id}" if config.checkpoint_path else ""
+        if config.record_path:
+            config.replace(record_path=f"{config.record_path}.{self.worker_id}")
+        self.manager = TraderManager(dry_run=dry_run, assets=[], price_source=self.feed,
+                                     order_client=RemoteOrderClient(self), checkpoint_path=checkpoint_path)
+        self._conn: Optional[Connection] = None
+        self._stop = threading.Event()
+        self._pending: Dict[int, Future] = {}
+        self._req_ids = itertools.count(1)
+        # 현재 연결에서 마지막으로 반영한 배정 세대 (접속할 때마다 초기화)
+        self._generation = 0
+        self._threads = []
+
+    def start(self):
+        """엔진 매니저와 접속/하트비트 스레드 시작"""
+        self._stop.clear()
+        self.manager.start()
+        for name, func in (("ClusterWorker", self._run), ("ClusterHeartbeat", self._heartbeat_loop)):
+            thread = threading.Thread(target=func, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"워커 시작: {self.worker_id} -> {self.address}")
+
+    def _run(self):
+        backoff = 0.5
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = Connection.connect(self.address)
+                conn.send_json(HELLO, {"worker_id": self.worker_id})
+                self._generation = 0
+                self._conn = conn
+                backoff = 0.5
+                logger.info(f"코디네이터 접속: {self.address}")
+                while not self._stop.is_set():
+                    frame = conn.recv()
+                    if frame is None or frame[0] == BYE:
+                        break
+                    self._handle(*frame)
+            except (OSError, ValueError) as e:
+                if not self._stop.is_set():
+                    logger.warning(f"코디네이터 연결 실패: {e}")
+            finally:
+                self._conn = None
+                if conn is not None:
+                    conn.close()
+                self._fail_pending("코디네이터 연결 끊김")
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, 10.0)
+
+    def _handle(self, frame_type: int, payload: bytes):
+        if frame_type == PRICES:
+            self.feed.update(decode_prices(payload))
+        elif frame_type == ASSIGN:
+            self._apply_assignment(json.loads(payload))
+        elif frame_type == ORDER_RESULT:
+            response = json.loads(payload)
+            future = self._pending.pop(response["req_id"], None)
+            if future is not None:
+                future.set_result(response)
+        elif frame_type != HEARTBEAT:
+            logger.warning(f"알 수 없는 프레임 유형: {frame_type}")
+
+    def _apply_assignment(self, data: Dict):
+        """배정 변경분만 반영 (유지되는 자산은 엔진 상태 그대로, 이전 세대 배정은 무시)"""
+        generation = data.get("generation", 0)
+        if generation and generation <= self._generation:
+            logger.warning(f"이전 세대 자산 배정 무시: {generation} <= {self._generation}")
+            return
+        try:
+            assets = {asset.key: asset for asset in parse_assets(data["assets"])}
+        except ConfigError as e:
+            logger.error(f"잘못된 자산 배정, 기존 엔진 유지: {e}")
+            return
+        self._generation = generation
+        self.feed.set_index(data["index"])
+        for key in [k for k in self.manager.engines if k not in assets]:
+            self.manager.remove_asset(key)
+        for key, asset in assets.items():
+            engine = self.manager.engines.get(key)
+            if engine is None:
+                self.manager.add_asset(asset)
+            elif not engine.apply_config(asset):
+                self.manager.remove_asset(key)
+                self.manager.add_asset(asset)
+        logger.info(f"자산 배정 반영: {len(assets)}개 ({', '.join(sorted(assets)[:10])}"
+                    f"{' ...' if len(assets) > 10 else ''})")
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            conn = self._conn
+            if conn is None:
+                continue
+            try:
+                conn.send(HEARTBEAT)
+            except OSError:
+                conn.close()
+
+    def request_order(self, params: Dict, timeout: float, op: str = "place_order") -> Optional[Dict]:
+        """코디네이터에 주문 요청(op: place_order/get_order) 후 결과 대기
+
+        요청을 보내지 못했거나 코디네이터가 오류를 돌려주면 Exception, 요청을 보낸 뒤
+        시간 초과나 연결 끊김으로 결과를 모르면 OrderOutcomeUnknown.
+        """
+        conn = self._conn
+        if conn is None:
+            raise Exception("코디네이터 미접속 상태")
+        req_id = next(self._req_ids)
+        future: Future = Future()
+        self._pending[req_id] = future
+        try:
+            # 전송 중 끊긴 프레임도 코디네이터에 도착했을 수 있음
+            conn.send_json(ORDER, {"req_id": req_id, "op": op, "params": params})
+            response = future.result(timeout)
+        except (OSError, FutureTimeout) as e:
+            raise OrderOutcomeUnknown(f"주문 중계 응답 없음: {str(e) or '시간 초과'}") from e
+        finally:
+            self._pending.pop(req_id, None)
+        if response.get("unknown"):
+            raise OrderOutcomeUnknown(f"주문 중계 응답 없음: {response['error']}")
+        if "error" in response:
+            raise Exception(response["error"])
+        return response["result"]
+
+    def _fail_pending(self, reason: str):
+        """응답을 기다리는 요청을 결과 미확인으로 종료 (코디네이터가 이미 처리했을 수 있음)"""
+        for req_id in list(self._pending):
+            future = self._pending.pop(req_id, None)
+            if future is not None and not future.done():
+                future.set_result({"req_id": req_id, "error": reason, "unknown": True})
+
+    def stop(self):
+        """코디네이터에 종료를 알리고 엔진 정리"""
+        self._stop.set()
+        conn = self._conn
+        if conn is not None:
+            try:
+                conn.send(BYE)
+            except OSError:
+                pass
+            conn.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads.clear()
+        self.manager.stop()
+        logger.info(f"워커 종료: {self.worker_id}")
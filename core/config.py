@@ -1,98 +1,116 @@
 import os
-from dotenv import load_dotenv
-from typing import Optional
-from utils.logger import get_logger
+import threading
+from operator import attrgetter
+from types import MappingProxyType
+from dotenv import dotenv_values, load_dotenv
+from core.settings import Settings, load_settings
+from utils.logger import apply_log_settings, get_logger
 
 logger = get_logger(__name__)
 
 class Config:
-    """환경변수 기반 설정 관리"""
+    """환경변수 기반 설정 관리
+
+    .env 와 환경변수는 처음 사용할 때(보통 main 의 load() 호출) 한 번만 읽어 불변 Settings
+    스냅샷으로 검증한다. 모듈 import 만으로는 파일을 읽거나 검증하지 않는다.
+    config.dry_run 처럼 항목 이름으로 읽으면 현재 스냅샷의 값을 돌려주며(문자열 파싱 없음),
+    reload() 는 새 스냅샷을 만든 뒤 참조 하나만 바꿔 끼운다. 여러 항목을 일관되게 읽어야
+    하면 config.settings 를 지역 변수로 잡아 사용한다.
+    """
     
     def __init__(self):
-        # .env 파일 로드
-        load_dotenv()
-        self._validate_required_env()
-        logger.info("환경변수 설정 로드 완료")
-    
-    def _validate_required_env(self):
-        """필수 환경변수 검증"""
-        required_vars = ['UPBIT_ACCESS_KEY', 'UPBIT_SECRET_KEY']
-        missing_vars = []
-        
-        for var in required_vars:
-            if not os.getenv(var) or os.getenv(var) == 'your_upbit_access_key_here' or os.getenv(var) == 'your_upbit_secret_key_here':
-                missing_vars.append(var)
-        
-        if missing_vars:
-            logger.warning(f"업비트 API 키가 설정되지 않음: {missing_vars}")
-            logger.warning("모의거래 모드로만 실행됩니다")
+        self._settings: Settings | None = None
+        self._load_lock = threading.Lock()
+        self._shell_env: frozenset = frozenset()
+        self._listeners = []
+        self._market_mapping = {
+            "BTC/USDT": "KRW-BTC",
+            "ETH/USDT": "KRW-ETH",
+            "ADA/USDT": "KRW-ADA"
+        }
     
     @property
-    def upbit_access_key(self) -> Optional[str]:
-        """업비트 Access Key"""
-        key = os.getenv('UPBIT_ACCESS_KEY')
-        if key and key != 'your_upbit_access_key_here':
-            return key
-        return None
+    def settings(self) -> Settings:
+        """현재 설정 스냅샷 (최초 접근 시 로드)"""
+        settings = self._settings
+        return settings if settings is not None else self.load()
     
-    @property
-    def upbit_secret_key(self) -> Optional[str]:
-        """업비트 Secret Key"""
-        key = os.getenv('UPBIT_SECRET_KEY')
-        if key and key != 'your_upbit_secret_key_here':
-            return key
-        return None
+    def load(self) -> Settings:
+        """.env 와 환경변수를 읽어 스냅샷 생성 (최초 1회, 검증 실패 시 ConfigError)"""
+        with self._load_lock:
+            if self._settings is None:
+                # 셸에서 지정한 변수는 .env 보다 우선 (다시 로드할 때도 유지)
+                self._shell_env = frozenset(os.environ)
+                load_dotenv()
+                settings = load_settings()
+                self._settings = settings
+                # 로그 설정부터 반영되도록 알림 먼저
+                self._notify(settings)
+                self._validate_required_env()
+                logger.info("환경변수 설정 로드 완료")
+            return self._settings
     
-    @property
-    def dry_run(self) -> bool:
-        """모의거래 모드 여부"""
-        return os.getenv('DRY_RUN', 'true').lower() == 'true'
+    def on_load(self, listener):
+        """설정이 로드/다시 로드될 때마다 listener(settings) 호출 (이미 로드됐으면 즉시 호출)
+
+        import 시점에 만들어지는 전역 객체가 설정 로드를 앞당기지 않도록 할 때 사용한다.
+        """
+        self._listeners.append(listener)
+        if self._settings is not None:
+            listener(self._settings)
     
-    @property
-    def log_level(self) -> str:
-        """로그 레벨"""
-        return os.getenv('LOG_LEVEL', 'INFO').upper()
+    def _notify(self, settings: Settings):
+        for listener in list(self._listeners):
+            try:
+                listener(settings)
+            except Exception as e:
+                logger.error(f"설정 반영 실패: {e}")
     
-    @property
-    def polling_interval(self) -> int:
-        """폴링 간격 (초)"""
-        return int(os.getenv('POLLING_INTERVAL', '10'))
+    def _validate_required_env(self):
+        """필수 환경변수 검증"""
+        missing_vars = [name for name, value in (("UPBIT_ACCESS_KEY", self._settings.upbit_access_key),
+                                                 ("UPBIT_SECRET_KEY", self._settings.upbit_secret_key))
+                        if value is None]
+        
+        if missing_vars:
+            logger.warning(f"업비트 API 키가 설정되지 않음: {missing_vars}")
+            logger.warning("기본 계정은 모의거래로만 실행됩니다" if self._settings.accounts
+                           else "모의거래 모드로만 실행됩니다")
     
-    @property
-    def status_update_interval(self) -> int:
-        """상태 업데이트 간격 (초)"""
-        return int(os.getenv('STATUS_UPDATE_INTERVAL', '300'))
+    def reload(self) -> Settings:
+        """.env 를 다시 읽어 스냅샷 교체 (검증 실패 시 ConfigError, 기존 스냅샷 유지)
 
-    @property
-    def max_workers(self) -> Optional[int]:
-        """병렬 실행 스레드 수"""
-        value = os.getenv('MAX_WORKERS')
-        return int(value) if value and value.isdigit() else None
+        포트, 샤드 수, 클러스터 역할처럼 시작 시점에만 쓰는 항목은 재시작해야 반영된다.
+        """
+        self.load()
+        for key, value in dotenv_values().items():
+            if key not in self._shell_env and value is not None:
+                os.environ[key] = value
+        settings = load_settings()
+        self._settings = settings
+        logger.info("환경변수 설정 다시 로드 완료")
+        self._notify(settings)
+        return settings
     
-    @property
-    def discord_webhook_url(self) -> Optional[str]:
-        """Discord 웹훅 URL"""
-        url = os.getenv('DISCORD_WEBHOOK_URL')
-        return url if url and url.strip() else None
-    
-    @property
-    def slack_webhook_url(self) -> Optional[str]:
-        """Slack 웹훅 URL"""
-        url = os.getenv('SLACK_WEBHOOK_URL')
-        return url if url and url.strip() else None
+    def replace(self, **changes) -> Settings:
+        """현재 스냅샷의 일부 항목만 바꾼 새 스냅샷으로 교체 (프로세스별 경로, 기록 재실행 등)"""
+        settings = self.settings._replace(**changes)
+        self._settings = settings
+        self._notify(settings)
+        return settings
     
     @property
     def has_api_keys(self) -> bool:
         """API 키가 올바르게 설정되었는지 확인"""
-        return self.upbit_access_key is not None and self.upbit_secret_key is not None
+        return self.settings.has_api_keys
     
-    def get_market_mapping(self) -> dict:
-        """심볼-마켓 매핑"""
-        return {
-            "BTC/USDT": "KRW-BTC",
-            "ETH/USDT": "KRW-ETH",
-            "ADA/USDT": "KRW-ADA"
-        }
+    def get_market_mapping(self):
+        """심볼-마켓 매핑 (읽기 전용, register_market 결과가 바로 보이는 공유 뷰)"""
+        return MappingProxyType(self._market_mapping)
+    
+    def register_market(self, symbol: str, market: str):
+        """자산 설정의 market 항목으로 심볼-마켓 매핑 추가"""
+        self._market_mapping[symbol] = market
     
     def get_min_order_amounts(self) -> dict:
         """최소 주문 금액"""
@@ -102,5 +120,13 @@ class Config:
             "KRW-ADA": 5000
         }
 
+# 스냅샷 항목을 같은 이름의 읽기 전용 속성으로 노출 (config.polling_interval 등)
+for _name in Settings._fields:
+    setattr(Config, _name, property(attrgetter(f"settings.{_name}"), doc=f"현재 스냅샷의 {_name}"))
+del _name
+
 # 전역 설정 인스턴스
-config = Config() 
\ No newline at end of file
+config = Config()
+# .env 의 LOG_* 는 로거가 만들어진 뒤에 읽히므로 스냅샷이 로드될 때마다 반영
+config.on_load(lambda settings: apply_log_settings(settings.log_level, settings.log_format,
+                                                   settings.log_backup_days)) 
\ No newline at end of file
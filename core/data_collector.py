@@ -1,27 +1,102 @@
+import logging
+import threading
 import time
-import requests
-from typing import Dict, Optional, List
+from datetime import datetime, timezone
+from typing import Dict, Optional, List, Tuple
 from utils.logger import get_logger
 from core.config import config
+from core.orderbook import OrderBook
+from core.metrics import record_http
+from core.tracing import traced
+from core.resilience import (
+    CircuitOpenError, endpoint_timeout, get_breaker, get_latency_window, hedged_call
+)
 
 logger = get_logger(__name__)
 
+# 호가 한 번 조회로 모든 관심 마켓을 갱신하는 주기(초)와 요청당 최대 마켓 수
+ORDERBOOK_MAX_AGE = 1.0
+ORDERBOOK_BATCH_SIZE = 100
+
 class DataCollector:
-    """업비트 전용 가격 데이터 수집기"""
+    """업비트 전용 가격 데이터 수집기
+
+    캐시가 심볼별이라 한 프로세스의 모든 엔진이 인스턴스 하나를 공유할 수 있다.
+    """
     
     def __init__(self):
         self.price_cache = {}
         self.last_update = {}
+        # 조회 실패로 마지막 가격을 대신 돌려준 심볼
+        self.stale_symbols = set()
+        # 심볼별 호가 (배열은 재사용, _book_lock 안에서만 갱신/복사)
+        self.orderbooks: Dict[str, OrderBook] = {}
+        self._book_lock = threading.Lock()
+        # 호가 관심 심볼과 심볼별 마지막 수신 시각 (한 번의 배치 조회로 함께 갱신)
+        self._book_symbols: set = set()
+        self._book_received: Dict[str, float] = {}
+        self._book_refresh_lock = threading.Lock()
+        # 마켓 목록 (load_markets 전에는 None)
+        self.markets: Optional[Dict[str, Dict]] = None
+        # register_market 결과가 바로 반영되는 공유 뷰
         self.market_mapping = config.get_market_mapping()
-        logger.info("업비트 데이터 수집기 초기화 완료")
+        self.base_url = config.upbit_api_url
+        logger.debug("업비트 데이터 수집기 초기화 완료")
     
-    def get_price(self, symbol: str) -> Optional[float]:
-        """업비트에서 현재 가격 조회"""
+    @traced("quotation.http")
+    def _http_get(self, endpoint: str, params: Dict = None):
+        """업비트 공개 API GET (응답 상태 메트릭 기록)
+
+        엔드포인트별 제한 시간과 공용 차단기를 적용한다. HEDGE_REQUESTS 가 켜져 있으면
+        최근 p95 응답 시간을 넘긴 요청에 한해 같은 GET 을 한 번 더 보내 먼저 온 응답을 쓴다.
+        """
+        breaker = get_breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{endpoint} 차단기 열림")
+        # import 비용이 커서 첫 요청 때 로드 (공유 가격 테이블을 쓰는 샤드 워커는 로드하지 않음)
+        import requests
+        url = f"{self.base_url}{endpoint}"
+        timeout = endpoint_timeout(endpoint)
+        window = get_latency_window(endpoint)
+
+        def fetch():
+            started = time.perf_counter()
+            try:
+                response = requests.get(url, params=params, timeout=timeout)
+            except Exception:
+                record_http(endpoint, "error")
+                raise
+            record_http(endpoint, response.status_code)
+            response.raise_for_status()
+            window.add(time.perf_counter() - started)
+            return response.json()
+
+        started = time.perf_counter()
         try:
-            # 캐시된 가격이 5초 이내인 경우 캐시 사용
+            hedge_after = window.percentile(0.95) if config.hedge_requests else None
+            data = hedged_call(endpoint, fetch, hedge_after, timeout) if hedge_after else fetch()
+        except requests.HTTPError as e:
+            # 4xx(잘못된 마켓 등 요청 자체의 문제)는 거래소 장애로 보지 않음 (429 제외)
+            status = e.response.status_code if e.response is not None else 500
+            breaker.record(None if status >= 500 or status == 429 else time.perf_counter() - started)
+            raise
+        except Exception:
+            breaker.record(None)
+            raise
+        breaker.record(time.perf_counter() - started)
+        return data
+    
+    def get_price(self, symbol: str, max_age: float = 5) -> Optional[float]:
+        """업비트에서 현재 가격 조회
+
+        조회에 실패하면 STALE_PRICE_MAX_AGE 초 이내의 마지막 가격을 대신 돌려주고
+        is_stale() 로 표시한다 (상태 표시는 유지하되 매매 판단에는 쓰지 않도록).
+        """
+        try:
+            # 캐시된 가격이 max_age 초 이내인 경우 캐시 사용
             if (symbol in self.price_cache and 
                 symbol in self.last_update and 
-                time.time() - self.last_update[symbol] < 5):
+                time.time() - self.last_update[symbol] < max_age):
                 return self.price_cache[symbol]
             
             price = self._get_upbit_price(symbol)
@@ -30,13 +105,28 @@ class DataCollector:
                 # 캐시 업데이트
                 self.price_cache[symbol] = price
                 self.last_update[symbol] = time.time()
-                logger.debug(f"[{symbol}] 가격 조회: {price:,.0f} KRW")
+                self.stale_symbols.discard(symbol)
+                logger.debug("[%s] 가격 조회: %.0f KRW", symbol, price)
+                return price
             
-            return price
+            return self._stale_price(symbol)
             
         except Exception as e:
             logger.error(f"[{symbol}] 가격 조회 실패: {e}")
+            return self._stale_price(symbol)
+    
+    def _stale_price(self, symbol: str) -> Optional[float]:
+        """허용 기간 안의 마지막 가격 (없으면 None)"""
+        updated = self.last_update.get(symbol)
+        if updated is None or time.time() - updated > config.stale_price_max_age:
+            self.stale_symbols.discard(symbol)
             return None
+        self.stale_symbols.add(symbol)
+        return self.price_cache.get(symbol)
+    
+    def is_stale(self, symbol: str) -> bool:
+        """마지막 get_price 결과가 조회 실패로 대신 돌려준 이전 가격인지"""
+        return symbol in self.stale_symbols
     
     def _get_upbit_price(self, symbol: str) -> Optional[float]:
         """업비트에서 가격 조회"""
@@ -48,19 +138,17 @@ class DataCollector:
                 return None
             
             # 업비트 공개 API로 현재가 조회
-            url = "https://api.upbit.com/v1/ticker"
             params = {'markets': upbit_market}
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._http_get("/v1/ticker", params)
             if data and len(data) > 0:
                 price = float(data[0]['trade_price'])
                 return price
             
             return None
             
+        except CircuitOpenError:
+            logger.debug("[%s] 차단기 열림으로 가격 조회 생략", symbol)
+            return None
         except Exception as e:
             logger.error(f"[{symbol}] 업비트 가격 조회 실패: {e}")
             return None
@@ -83,13 +171,10 @@ class DataCollector:
             if not markets:
                 return results
 
-            url = "https://api.upbit.com/v1/ticker"
             params = {"markets": ",".join(markets)}
-            logger.debug(f"업비트 배치 가격 조회: {params['markets']}")
+            logger.debug("업비트 배치 가격 조회: %s", params['markets'])
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._http_get("/v1/ticker", params)
 
             for item in data:
                 market = item.get("market")
@@ -102,6 +187,10 @@ class DataCollector:
             for symbol in symbols:
                 results.setdefault(symbol, None)
 
+        except CircuitOpenError:
+            logger.debug("차단기 열림으로 배치 가격 조회 생략")
+            for symbol in symbols:
+                results.setdefault(symbol, None)
         except Exception as e:
             logger.error(f"배치 가격 조회 실패: {e}")
             for symbol in symbols:
@@ -127,9 +216,8 @@ class DataCollector:
 
         if fetch_symbols:
             fetched = self._get_upbit_prices(fetch_symbols)
-            logger.debug(
-                f"배치 조회 사용: {', '.join(fetch_symbols)}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("배치 조회 사용: %s", ", ".join(fetch_symbols))
             for sym, price in fetched.items():
                 if price is not None:
                     self.price_cache[sym] = price
@@ -138,24 +226,116 @@ class DataCollector:
 
         return prices
     
-    def get_market_info(self, symbol: str) -> Optional[Dict]:
-        """업비트 마켓 정보 조회"""
+    def get_orderbooks(self, symbols: List[str]) -> Dict[str, Optional[OrderBook]]:
+        """여러 심볼의 호가를 한 번의 요청으로 조회
+
+        심볼별 OrderBook 배열은 재사용되며 조회 결과로 제자리 갱신된다(락 안에서).
+        돌려주는 값은 갱신 직후의 독립 사본이라 다른 스레드의 갱신과 겹치지 않는다.
+        """
+        results: Dict[str, Optional[OrderBook]] = {}
         try:
-            upbit_market = self.market_mapping.get(symbol)
-            if not upbit_market:
+            market_to_symbol = {}
+            for symbol in symbols:
+                market = self.market_mapping.get(symbol)
+                if not market:
+                    logger.warning(f"[{symbol}] 업비트 마켓 매핑 없음")
+                    results[symbol] = None
+                    continue
+                market_to_symbol[market] = symbol
+
+            if not market_to_symbol:
+                return results
+
+            params = {"markets": ",".join(market_to_symbol)}
+            data = self._http_get("/v1/orderbook", params)
+            received = time.time()
+
+            for item in data:
+                symbol = market_to_symbol.get(item.get("market"))
+                if not symbol:
+                    continue
+                ts = item.get("timestamp")
+                with self._book_lock:
+                    book = self.orderbooks.get(symbol)
+                    if book is None:
+                        book = self.orderbooks[symbol] = OrderBook(item["market"])
+                    book.update(item.get("orderbook_units", []), ts / 1000 if ts else received)
+                    self._book_received[symbol] = received
+                    results[symbol] = book.snapshot()
+
+        except Exception as e:
+            logger.error(f"배치 호가 조회 실패: {e}")
+
+        for symbol in symbols:
+            results.setdefault(symbol, None)
+        return results
+    
+    def watch_orderbooks(self, symbols: List[str]):
+        """배치 호가 조회 대상 심볼 지정 (기존 목록 교체, get_orderbook 한 심볼은 자동 추가)"""
+        with self._book_refresh_lock:
+            self._book_symbols = set(symbols)
+
+    def get_orderbook(self, symbol: str, max_age: float = ORDERBOOK_MAX_AGE) -> Optional[OrderBook]:
+        """단일 심볼 호가 (독립 사본)
+
+        max_age 초 이내에 받은 호가가 있으면 그대로 쓰고, 없으면 관심 심볼 전체를 한 번의
+        배치 조회로 갱신한다. 여러 엔진이 동시에 요청해도 조회는 한 번만 나간다.
+        """
+        book = self._cached_orderbook(symbol, max_age)
+        if book is not None:
+            return book
+        with self._book_refresh_lock:
+            # 기다리는 동안 다른 엔진이 갱신했으면 그 결과 사용
+            book = self._cached_orderbook(symbol, max_age)
+            if book is not None:
+                return book
+            self._book_symbols.add(symbol)
+            symbols = sorted(self._book_symbols)
+            results: Dict[str, Optional[OrderBook]] = {}
+            for start in range(0, len(symbols), ORDERBOOK_BATCH_SIZE):
+                results.update(self.get_orderbooks(symbols[start:start + ORDERBOOK_BATCH_SIZE]))
+            logger.debug("배치 호가 갱신: %d개 마켓", len(symbols))
+        return results.get(symbol)
+
+    def _cached_orderbook(self, symbol: str, max_age: float) -> Optional[OrderBook]:
+        with self._book_lock:
+            received = self._book_received.get(symbol)
+            if received is None or time.time() - received >= max_age:
                 return None
-            
-            url = "https://api.upbit.com/v1/market/all"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            markets = response.json()
-            for market in markets:
-                if market['market'] == upbit_market:
-                    return market
-            
-            return None
-            
+            return self.orderbooks[symbol].snapshot()
+    
+    def get_minute_closes(self, symbol: str, count: int = 200) -> List[Tuple[float, float]]:
+        """최근 1분봉 (시작 시각 epoch 초, 종가) 목록, 오래된 순 (실패 시 빈 목록)"""
+        upbit_market = self.market_mapping.get(symbol)
+        if not upbit_market:
+            return []
+        try:
+            candles = self._http_get("/v1/candles/minutes/1",
+                                     {"market": upbit_market, "count": min(max(count, 1), 200)})
+        except Exception as e:
+            logger.warning(f"[{symbol}] 분봉 조회 실패: {e}")
+            return []
+        closes = []
+        for candle in candles:
+            started = datetime.fromisoformat(candle["candle_date_time_utc"]).replace(tzinfo=timezone.utc)
+            closes.append((started.timestamp(), float(candle["trade_price"])))
+        closes.sort()
+        return closes
+    
+    def load_markets(self) -> Dict[str, Dict]:
+        """업비트 전체 마켓 목록 조회 후 캐시 (실패 시 빈 목록)"""
+        try:
+            markets = self._http_get("/v1/market/all")
         except Exception as e:
-            logger.error(f"[{symbol}] 마켓 정보 조회 실패: {e}")
-            return None 
\ No newline at end of file
+            logger.warning(f"마켓 목록 조회 실패: {e}")
+            return self.markets or {}
+        self.markets = {market["market"]: market for market in markets if market.get("market")}
+        return self.markets
+    
+    def get_market_info(self, symbol: str) -> Optional[Dict]:
+        """업비트 마켓 정보 조회 (마켓 목록은 한 번만 조회)"""
+        upbit_market = self.market_mapping.get(symbol)
+        if not upbit_market:
+            return None
+        markets = self.markets if self.markets is not None else self.load_markets()
+        return markets.get(upbit_market)
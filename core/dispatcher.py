@@ -0,0 +1,366 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from utils.logger import get_logger
+from core.config import config
+from core.trade_log import get_trade_log_writer
+from core.metrics import QUEUE_DEPTH
+
+logger = get_logger(__name__)
+
+# 큐가 가득 찼을 때 버려도 되는 알림 유형
+DROPPABLE_TYPES = ("STATUS", "SIGNAL")
+
+
+def _chunk_text(text: str, limit: int) -> List[str]:
+    """줄 단위로 메시지를 최대 길이 이하로 분할"""
+    chunks, current = [], ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class WebhookAdapter:
+    """웹훅 전송 어댑터 기본 클래스"""
+
+    name = "webhook"
+    max_length = 4000
+
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+        self._session = None
+
+    def _post(self, payload: Dict):
+        """웹훅 POST (전송 스레드에서만 호출)"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        response = self._session.post(self.url, json=payload, timeout=self.timeout)
+        if response.status_code == 429:
+            # 레이트 리밋: 한 번만 대기 후 재시도
+            retry_after = float(response.headers.get("Retry-After", 1) or 1)
+            time.sleep(min(retry_after, 5))
+            response = self._session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+    def _payload(self, text: str) -> Dict:
+        return {"text": text}
+
+    def send_text(self, text: str):
+        """텍스트 메시지 전송 (길이 제한에 맞춰 분할)"""
+        for chunk in _chunk_text(text, self.max_length):
+            self._post(self._payload(chunk))
+
+    def send_batch(self, notifications: List[Dict], digest: Optional[str]):
+        """알림 묶음 전송"""
+        lines = [f"[{n['type']}] {n['message']}" for n in notifications]
+        if digest:
+            lines.append(digest)
+        if lines:
+            self.send_text("\n\n".join(lines))
+
+
+class DiscordWebhook(WebhookAdapter):
+    """Discord 웹훅 어댑터"""
+
+    name = "discord"
+    max_length = 2000
+
+    def _payload(self, text: str) -> Dict:
+        return {"content": text, "username": "ATS v2"}
+
+
+class SlackWebhook(WebhookAdapter):
+    """Slack Incoming Webhook 어댑터"""
+
+    name = "slack"
+    max_length = 3000
+
+    def _payload(self, text: str) -> Dict:
+        return {"text": text}
+
+
+class JsonWebhook(WebhookAdapter):
+    """범용 JSON 웹훅 어댑터 (알림 원본 목록 전송)"""
+
+    name = "json"
+
+    def send_batch(self, notifications: List[Dict], digest: Optional[str]):
+        payload = {"notifications": notifications}
+        if digest:
+            payload["digest"] = digest
+        self._post(payload)
+
+
+class NotificationDispatcher:
+    """백그라운드 알림 전송 파이프라인
+
+    거래 스레드는 submit() 으로 큐에 넣기만 하고 즉시 반환한다.
+    콘솔 출력, 파일 기록, 웹훅 전송은 전용 스레드가 처리한다.
+
+    - 큐가 가득 차면 STATUS/SIGNAL 알림은 버리고, TRADE/ERROR 알림은
+      가장 오래된 알림을 밀어내고 넣는다.
+    - 아직 처리되지 않은 같은 심볼의 STATUS 알림은 최신 값으로 합쳐진다.
+    - 웹훅은 batch_interval 마다 묶어서 전송하며, STATUS 알림들은
+      하나의 다이제스트 메시지로 합쳐진다.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_interval: float = 2.0,
+                 batch_size: int = 50, webhooks: List[WebhookAdapter] = None):
+        self.max_queue = max_queue
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.webhooks: List[WebhookAdapter] = list(webhooks or [])
+
+        self._queue = deque()
+        self._pending_status: Dict[str, list] = {}
+        self._cond = threading.Condition(threading.Lock())
+        self._flush_requested = False
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # 전송 스레드 전용 상태
+        self._outbox: List[Dict] = []
+        self._outbox_status: Dict[str, Dict] = {}
+        self._digest_console = False
+        self._custom_outbox: Dict[str, List[Dict]] = {}
+        self._custom_adapters: Dict[str, WebhookAdapter] = {}
+        self._last_flush = time.time()
+
+        self.dropped = 0
+        self.coalesced = 0
+        self.delivered = 0
+
+    def start(self):
+        """전송 스레드 시작"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="NotificationDispatcher", daemon=True)
+        self._thread.start()
+        logger.info("알림 전송 스레드 시작")
+
+    def stop(self, timeout: float = 5.0):
+        """남은 알림을 처리한 뒤 전송 스레드 종료"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._flush_requested = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info("알림 전송 스레드 종료")
+
+    def submit(self, notification: Dict, options: Dict) -> bool:
+        """알림 등록 (절대 블로킹하지 않음). 버려진 경우 False"""
+        kind = notification["type"]
+        with self._cond:
+            if kind == "STATUS":
+                pending = self._pending_status.get(notification["symbol"])
+                if pending is not None:
+                    # 아직 처리되지 않은 상태 알림을 최신 값으로 교체
+                    pending[0] = notification
+                    pending[1] = options
+                    self.coalesced += 1
+                    return True
+
+            if len(self._queue) >= self.max_queue:
+                if kind in DROPPABLE_TYPES:
+                    self.dropped += 1
+                    return False
+                self._evict()
+
+            item = [notification, options]
+            self._queue.append(item)
+            if kind == "STATUS":
+                self._pending_status[notification["symbol"]] = item
+            self._cond.notify()
+        return True
+
+    def request_flush(self):
+        """다음 처리 주기에 웹훅 배치를 즉시 전송하도록 요청"""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify()
+
+    def queue_depth(self) -> int:
+        """대기 중인 알림 수"""
+        return len(self._queue)
+
+    def _evict(self):
+        """가득 찬 대기열에서 한 건 버림 (가장 오래된 상태/시그널 알림, 없으면 가장 오래된 알림)"""
+        index = next((i for i, item in enumerate(self._queue) if item[0]["type"] in DROPPABLE_TYPES), None)
+        if index is None:
+            evicted = self._queue.popleft()
+            logger.warning(f"알림 대기열이 가득 차 {evicted[0]['type']} 알림을 버림 "
+                           f"({evicted[0].get('symbol')}, 대기열 {self.max_queue})")
+        else:
+            evicted = self._queue[index]
+            del self._queue[index]
+        self._forget_status(evicted)
+        self.dropped += 1
+
+    def _forget_status(self, item: list):
+        notification = item[0]
+        if notification["type"] == "STATUS" and self._pending_status.get(notification["symbol"]) is item:
+            del self._pending_status[notification["symbol"]]
+
+    def _take_batch(self) -> List[list]:
+        """큐에서 처리할 알림을 꺼냄 (배치 주기까지 대기)"""
+        with self._cond:
+            if not self._queue and self._running and not self._flush_requested:
+                wait = self.batch_interval - (time.time() - self._last_flush)
+                self._cond.wait(max(wait, 0.05))
+            batch = []
+            while self._queue and len(batch) < self.batch_size * 10:
+                item = self._queue.popleft()
+                self._forget_status(item)
+                batch.append(item)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            for notification, options in batch:
+                try:
+                    self._handle(notification, options)
+                except Exception as e:
+                    logger.error(f"알림 처리 실패: {e}")
+
+            with self._cond:
+                flush_now = self._flush_requested
+                self._flush_requested = False
+                running = self._running or bool(self._queue)
+
+            if (flush_now or not running
+                    or len(self._outbox) >= self.batch_size
+                    or time.time() - self._last_flush >= self.batch_interval):
+                self._flush_webhooks()
+
+            if not running:
+                break
+
+    def _handle(self, notification: Dict, options: Dict):
+        """알림 1건 처리 (전송 스레드)"""
+        kind = notification["type"]
+
+        if options.get("enable_console", True) and kind != "STATUS":
+            print(f"[{notification['timestamp']}] {kind}: {notification['message']}")
+
+        if options.get("enable_file", True):
+            self._write_to_file(options.get("log_file"), notification)
+
+        if kind == "STATUS":
+            # 상태 알림은 다이제스트로 합쳐 콘솔/웹훅에 한 번만 출력
+            self._outbox_status[notification["symbol"]] = notification
+            self._digest_console = self._digest_console or options.get("enable_console", True)
+        elif self.webhooks:
+            self._outbox.append(notification)
+
+        if options.get("enable_webhook", False) and options.get("webhook_url"):
+            url = options["webhook_url"]
+            if url not in self._custom_adapters:
+                self._custom_adapters[url] = JsonWebhook(url)
+            self._custom_outbox.setdefault(url, []).append(notification)
+
+    def _write_to_file(self, log_file: Optional[str], notification: Dict):
+        """공용 거래 로그 작성기에 기록 요청"""
+        if log_file:
+            get_trade_log_writer().write(log_file, notification)
+
+    def _build_digest(self, statuses: List[Dict]) -> Optional[str]:
+        """STATUS 알림들을 하나의 다이제스트로 병합"""
+        if not statuses:
+            return None
+        timestamp = statuses[-1]["timestamp"]
+        header = f"📊 포트폴리오 다이제스트 ({timestamp}, {len(statuses)}개 자산)"
+        lines = [header]
+        for status in sorted(statuses, key=lambda n: n["symbol"]):
+            lines.append(status["message"].replace("\n", " | "))
+        return "\n".join(lines)
+
+    def _flush_webhooks(self):
+        """웹훅 배치 전송"""
+        self._last_flush = time.time()
+        notifications, self._outbox = self._outbox, []
+        statuses = list(self._outbox_status.values())
+        self._outbox_status = {}
+        custom, self._custom_outbox = self._custom_outbox, {}
+        console, self._digest_console = self._digest_console, False
+
+        digest = self._build_digest(statuses)
+        if digest and console:
+            print(digest)
+
+        if notifications or digest:
+            for adapter in self.webhooks:
+                try:
+                    adapter.send_batch(notifications, digest)
+                    self.delivered += len(notifications) + (1 if digest else 0)
+                except Exception as e:
+                    logger.error(f"{adapter.name} 웹훅 전송 실패: {e}")
+
+        for url, items in custom.items():
+            try:
+                self._custom_adapters[url].send_batch(items, None)
+                self.delivered += len(items)
+            except Exception as e:
+                logger.error(f"웹훅 전송 실패: {e}")
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def _configured_webhooks() -> List[WebhookAdapter]:
+    """환경변수에 설정된 Discord/Slack 웹훅 어댑터"""
+    webhooks: List[WebhookAdapter] = []
+    if config.discord_webhook_url:
+        webhooks.append(DiscordWebhook(config.discord_webhook_url))
+    if config.slack_webhook_url:
+        webhooks.append(SlackWebhook(config.slack_webhook_url))
+    return webhooks
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """프로세스 공용 알림 전송기 (최초 호출 시 시작)"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                dispatcher = NotificationDispatcher(
+                    max_queue=config.notify_queue_size,
+                    batch_interval=config.notify_batch_interval,
+                    webhooks=_configured_webhooks()
+                )
+                dispatcher.start()
+                QUEUE_DEPTH.labels("notifications").set_function(dispatcher.queue_depth)
+                _dispatcher = dispatcher
+    return _dispatcher
+
+
+def shutdown_dispatcher(timeout: float = 5.0):
+    """공용 알림 전송기 종료"""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.stop(timeout)
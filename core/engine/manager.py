@@ -1,51 +1,178 @@
-import json
 import time
 import threading
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, Future
+from types import MappingProxyType
+from typing import List, Dict, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from core.engine.trader import TraderEngine
+from core.data_collector import DataCollector
+from core.dispatcher import get_dispatcher, shutdown_dispatcher
+from core.trade_log import shutdown_trade_log_writer
+from core.ledger import shutdown_ledger
+from core.recorder import get_recorder, shutdown_recorder
 from core.config import config
+from core.settings import AssetConfig, as_asset_config, load_assets, parse_assets
+from core.metrics import LOOP_LAG_SECONDS, POOL_WORKERS
+from core.tracing import tracer
+from core.profiling import profiler
+from core.status import SystemStatus, status_board
+from core.file_watcher import FileWatcher
+from core.shutdown import ShutdownCoordinator
+from core.scheduler import PollScheduler
+from core.accounts import get_account
+from core.checkpoint import TriggerState, fill_gap, load_checkpoint, save_checkpoint
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 시작 시 시세 사전 조회 한 번에 묶을 최대 마켓 수
+PREFETCH_BATCH_SIZE = 100
+
 class TraderManager:
     """멀티자산 트레이딩 매니저
 
-    각 자산별 엔진을 ThreadPoolExecutor에서 병렬로 실행한다.
+    각 자산별 엔진을 ThreadPoolExecutor에서 병렬로 실행한다. 엔진은 계정이 달라도 가격
+    소스 하나를 공유하므로, 여러 계정이 같은 심볼을 거래해도 시세 조회는 늘지 않는다.
+    엔진 목록은 엔진 식별자(기본 계정은 심볼, 그 외는 '심볼@계정') 기준이다.
     """
     
-    def __init__(self, config_file: str = "config/assets.json", dry_run: bool = None):
+    def __init__(self, config_file: str = "config/assets.json", dry_run: bool = None,
+                 assets: List[Dict] = None, price_source=None, order_client=None,
+                 checkpoint_path: str = None):
         self.config_file = config_file
+        # 샤드/클러스터 워커는 자산 목록과 가격 소스(및 주문 중계)를 직접 받는다 (파일 감시 안 함)
+        self._assets = assets
+        # 가격 소스를 따로 받지 않으면 모든 엔진이 수집기 하나를 공유 (캐시/연결 재사용)
+        self._owns_collector = price_source is None
+        self.price_source = price_source if price_source is not None else DataCollector()
+        # 세션 기록 (RECORD_PATH, 엔진 입력은 엔진마다 기록)
+        self.recorder = get_recorder()
+        self.order_client = order_client
         # 환경변수에서 설정 가져오기
         self.dry_run = dry_run if dry_run is not None else config.dry_run
         self.engines = {}
         self.is_running = False
         self.engine_futures: Dict[str, Future] = {}
         self.executor: ThreadPoolExecutor | None = None
+        # 현재 풀의 크기와 그 풀에 제출한 엔진 루프 (풀을 키우면 기존 풀은 _retired_executors 로)
+        self._pool_size = 0
+        self._pool_futures: List[Future] = []
+        self._retired_executors: List[ThreadPoolExecutor] = []
         self.status_update_interval = config.status_update_interval
         self.run_interval = config.polling_interval
+        # 적응형 폴링 (None 이면 모든 자산이 run_interval 고정)
+        self.scheduler: PollScheduler | None = None
+        if config.adaptive_polling:
+            self.scheduler = PollScheduler(config.min_polling_interval, config.max_polling_interval,
+                                           config.request_budget)
+        self.config_watcher: FileWatcher | None = None
+        self._stop_event = threading.Event()
+        self._reload_lock = threading.Lock()
+        # 시작 단계별 소요 시간(초)과 사전 조회한 잔고(계정 -> 통화 -> 수량, 기본 계정은 None)
+        self.startup_timings: Dict[str, float] = {}
+        self.balances: Dict[Optional[str], Dict[str, float]] = {}
+        self._prefetch_thread: threading.Thread | None = None
+        self._start_time = 0.0
+        self._first_cycle_pending = 0
+        self._first_cycle_lock = threading.Lock()
+        # 지표/전략 상태 체크포인트 (프로세스마다 다른 파일, 빈 문자열이면 사용 안 함)
+        self.checkpoint_path = config.checkpoint_path if checkpoint_path is None else (checkpoint_path or None)
+        self._checkpoint: Dict[str, TriggerState] = {}
+        self._checkpoint_lock = threading.Lock()
 
         self._load_assets()
-        self.max_workers = config.max_workers or len(self.engines)
+        self.max_workers = config.max_workers or max(len(self.engines), 1)
+        self._register_pool_metrics()
         logger.info(f"트레이딩 매니저 초기화 완료: {len(self.engines)}개 자산")
     
+    def _register_pool_metrics(self):
+        """스레드 풀 포화도 게이지 등록 (수집 시점에 계산)"""
+        def count(predicate):
+            return lambda: sum(1 for f in list(self.engine_futures.values()) if predicate(f))
+        POOL_WORKERS.labels("max").set_function(lambda: self.max_workers)
+        POOL_WORKERS.labels("running").set_function(count(lambda f: f.running()))
+        POOL_WORKERS.labels("pending").set_function(count(lambda f: not f.running() and not f.done()))
+    
+    def _read_assets(self) -> Tuple[AssetConfig, ...]:
+        """자산 설정 파일 읽기 및 스키마 검증 (오류 시 ConfigError)"""
+        if self._assets is not None:
+            return parse_assets(self._assets)
+        return load_assets(self.config_file)
+    
     def _load_assets(self):
-        """자산 설정 로드 및 엔진 초기화"""
+        """자산 설정 로드 및 엔진 초기화 (시세/마켓/잔고 사전 조회는 엔진 생성과 병행)"""
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                assets = json.load(f)
+            started = time.perf_counter()
+            assets = self._read_assets()
+            for asset in assets:
+                if asset.market:
+                    config.register_market(asset.symbol, asset.market)
+            loaded = time.perf_counter()
+            self.startup_timings["load_assets"] = loaded - started
             
+            # 여러 계정이 같은 심볼을 거래해도 시세는 한 번만 조회
+            self._start_prefetch(list(dict.fromkeys(asset.symbol for asset in assets)),
+                                 list(dict.fromkeys(asset.account for asset in assets)))
             for asset in assets:
-                symbol = asset["symbol"]
-                engine = TraderEngine(asset, self.dry_run)
-                self.engines[symbol] = engine
-                logger.info(f"[{symbol}] 엔진 로드 완료")
+                self.engines[asset.key] = TraderEngine(asset, self.dry_run, self.price_source,
+                                                       self.order_client)
+            built = time.perf_counter()
+            self.startup_timings["build_engines"] = built - loaded
+            self._watch_orderbooks()
+            if self.checkpoint_path:
+                self._restore_checkpoint(list(self.engines.values()))
+                self.startup_timings["restore"] = time.perf_counter() - built
+            self._record_engines(list(self.engines.values()))
                 
         except Exception as e:
             logger.error(f"자산 설정 로드 실패: {e}")
             raise
     
+    def _watch_orderbooks(self):
+        """모의거래 체결용 호가를 실행 중인 자산 전체에 대해 한 번의 배치 조회로 받도록 지정"""
+        if self._owns_collector and self.dry_run:
+            self.price_source.watch_orderbooks(list({engine.symbol for engine in self.engines.values()}))
+    
+    def _start_prefetch(self, symbols: List[str], accounts: List[Optional[str]] = (None,)):
+        """첫 사이클이 캐시된 가격을 쓰도록 백그라운드에서 사전 조회 시작"""
+        if not self._owns_collector or not symbols:
+            return
+        self._prefetch_thread = threading.Thread(target=self._prefetch, args=(symbols, accounts),
+                                                 name="Prefetch", daemon=True)
+        self._prefetch_thread.start()
+    
+    def _prefetch(self, symbols: List[str], accounts: List[Optional[str]] = (None,)):
+        """마켓 목록, 전체 시세(배치), 계정별 잔고를 동시에 한 번씩 조회"""
+        started = time.perf_counter()
+        collector = self.price_source
+        batches = [symbols[i:i + PREFETCH_BATCH_SIZE] for i in range(0, len(symbols), PREFETCH_BATCH_SIZE)]
+        with_balances = not self.dry_run and self.order_client is None
+        try:
+            accounts = [get_account(name) for name in accounts] if with_balances else []
+            accounts = [account for account in accounts if account.has_api_keys]
+            with ThreadPoolExecutor(max_workers=len(batches) + len(accounts) + 1,
+                                    thread_name_prefix="Prefetch") as pool:
+                markets_job = pool.submit(collector.load_markets)
+                balance_jobs = {account: pool.submit(account.fetch_balances) for account in accounts}
+                price_jobs = [pool.submit(collector.get_multiple_prices, batch) for batch in batches]
+                fetched = sum(1 for job in price_jobs for price in job.result().values() if price is not None)
+                markets = markets_job.result()
+                for account, job in balance_jobs.items():
+                    balances = self.balances[account.name] = job.result()
+                    # 이후 현금 증감은 계정별 리스크 관리자가 체결로 추적
+                    account.risk.set_cash(balances.get("KRW"))
+        except Exception as e:
+            logger.warning(f"사전 조회 실패 (각 엔진이 직접 조회): {e}")
+            return
+        finally:
+            self.startup_timings["prefetch"] = time.perf_counter() - started
+        
+        if markets:
+            unknown = [symbol for symbol in symbols if collector.market_mapping.get(symbol) not in markets]
+            if unknown:
+                logger.warning(f"업비트 마켓 목록에 없는 자산 {len(unknown)}개: {', '.join(unknown[:10])}")
+        logger.debug("사전 조회 완료: 시세 %d/%d, 마켓 %d, 잔고 계정 %d", fetched, len(symbols),
+                     len(markets), len(self.balances))
+    
     def start(self):
         """전체 매니저 시작"""
         if self.is_running:
@@ -53,8 +180,17 @@ class TraderManager:
             return
         
         self.is_running = True
+        self._stop_event.clear()
         logger.info("트레이딩 매니저 시작")
         
+        # 사전 조회가 끝나야 첫 사이클이 캐시를 사용 (제한 시간 안에 끝나지 않으면 그대로 진행)
+        self._start_time = time.perf_counter()
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join(config.quotation_timeout)
+            self._prefetch_thread = None
+        self.startup_timings["prefetch_wait"] = time.perf_counter() - self._start_time
+        self._first_cycle_pending = len(self.engines)
+        
         # 각 엔진 시작
         for symbol, engine in self.engines.items():
             engine.start()
@@ -64,63 +200,231 @@ class TraderManager:
         
         # 상태 업데이트 쓰레드 시작
         self._start_status_thread()
+        self._start_checkpoint_thread()
+        
+        # 자산 설정 파일 변경 감시 (ASSETS_RELOAD_INTERVAL > 0)
+        if config.assets_reload_interval > 0 and self._assets is None:
+            self.config_watcher = FileWatcher(self.config_file, self.reload_config,
+                                              config.assets_reload_interval)
+            self.config_watcher.start()
     
-    def stop(self):
-        """전체 매니저 중지"""
+    def stop(self, timeout: float = None):
+        """전체 매니저 중지 (단계별, 전체 timeout 초 이내)"""
         if not self.is_running:
             return
         
-        self.is_running = False
         logger.info("트레이딩 매니저 중지 중...")
-        
-        # 각 엔진 중지
-        for symbol, engine in self.engines.items():
-            engine.stop()
-        
-        # 풀 종료 대기
-        if self.executor:
-            self.executor.shutdown(wait=True)
-            self.executor = None
-            self.engine_futures.clear()
-
+        coordinator = ShutdownCoordinator(timeout if timeout is not None else config.shutdown_timeout)
+        coordinator.add_phase("stop_signals", lambda budget: self._signal_stop())
+        coordinator.add_phase("drain_loops", self._drain_loops)
+        # 루프가 멈춘 뒤의 최종 상태 저장
+        if self.checkpoint_path:
+            coordinator.add_phase("checkpoint", lambda budget: self.save_checkpoint())
+        coordinator.add_phase("cancel_orders", lambda budget: self._cancel_all_orders())
+        # 알림 전송기가 거래 로그에 쓰므로 알림 -> 거래 로그 순서로 비움
+        coordinator.add_phase("flush_notifier", lambda budget: shutdown_dispatcher(budget))
+        coordinator.add_phase("flush_journal", lambda budget: shutdown_trade_log_writer(budget))
+        coordinator.add_phase("flush_ledger", lambda budget: shutdown_ledger(budget))
+        coordinator.add_phase("flush_recorder", lambda budget: shutdown_recorder(budget))
+        coordinator.run()
         logger.info("트레이딩 매니저 중지 완료")
+    
+    def _signal_stop(self):
+        """모든 루프에 중지 신호 (대기 중인 루프와 상태 스레드를 즉시 깨움)"""
+        self.is_running = False
+        self._stop_event.set()
+        if self.config_watcher:
+            self.config_watcher.stop()
+            self.config_watcher = None
+        for engine in list(self.engines.values()):
+            engine.request_stop()
+    
+    def _drain_loops(self, budget: float):
+        """진행 중인 사이클이 끝나길 기다린 뒤 풀 정리"""
+        futures = list(self.engine_futures.values())
+        _, pending = wait(futures, timeout=budget)
+        if pending:
+            logger.warning(f"엔진 루프 {len(pending)}개가 제한 시간 내에 종료되지 않음")
+        for executor in self._retired_executors + [self.executor]:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = None
+        self._retired_executors.clear()
+        self._pool_futures = []
+        self.engine_futures.clear()
+    
+    def _cancel_all_orders(self):
+        for symbol, engine in list(self.engines.items()):
+            try:
+                engine.cancel_orders()
+            except Exception as e:
+                logger.error(f"[{symbol}] 주문 취소 실패: {e}")
+        logger.info("전체 엔진 중지 및 주문 취소 완료")
 
     def _start_parallel_execution(self):
         """병렬 실행 시작 (ThreadPoolExecutor 사용)"""
-        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._new_pool(self.max_workers)
         for symbol, engine in self.engines.items():
-            future = self.executor.submit(self._run_engine_loop, symbol, engine)
-            self.engine_futures[symbol] = future
-            logger.info(f"[{symbol}] 엔진 작업 제출")
+            self._submit_loop(symbol, engine)
+            logger.debug("[%s] 엔진 작업 제출", symbol)
+    
+    def _new_pool(self, size: int):
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="Engine")
+        self._pool_size = size
+        self._pool_futures = []
     
-    def _run_engine_loop(self, symbol: str, engine: TraderEngine):
+    def _submit_loop(self, symbol: str, engine: TraderEngine):
+        future = self.executor.submit(self._run_engine_loop, symbol, engine, time.perf_counter())
+        self.engine_futures[symbol] = future
+        self._pool_futures.append(future)
+    
+    def _run_engine_loop(self, symbol: str, engine: TraderEngine, submitted: float = None):
         """개별 엔진 실행 루프"""
-        logger.info(f"[{symbol}] 엔진 루프 시작")
+        if submitted is not None:
+            # 스레드 풀 대기 시간 (작업 제출 ~ 워커 시작)
+            tracer.record("pool.wait", submitted, time.perf_counter(), symbol=symbol)
+        logger.debug("[%s] 엔진 루프 시작", symbol)
+        lag_metric = LOOP_LAG_SECONDS.labels(symbol)
+        last_start = None
+        interval = self.run_interval
+        first_cycle = True
         
         while self.is_running and engine.is_running:
             try:
-                success = engine.run_once()
+                # 이전 사이클 시작 이후 경과 시간 중 폴링 간격을 넘은 부분
+                cycle_start = time.monotonic()
+                if last_start is not None:
+                    lag_metric.observe(max(cycle_start - last_start - interval, 0.0))
+                last_start = cycle_start
+                
+                with profiler.profile_cycle():
+                    success = engine.run_once()
+                if first_cycle:
+                    first_cycle = False
+                    self._first_cycle_done()
                 if not success:
                     logger.warning(f"[{symbol}] 실행 실패, 대기 후 재시도")
                 
-                time.sleep(self.run_interval)
+                # 시그널 근접도에 따라 다음 폴링 간격 결정
+                scheduler = self.scheduler
+                interval = scheduler.update(symbol, engine.urgency) if scheduler else self.run_interval
+                engine.poll_interval = interval
+                
+                # 중지 요청 시 즉시 깨어남
+                if engine.wait(interval):
+                    break
                 
             except Exception as e:
                 logger.error(f"[{symbol}] 루프 오류: {e}")
-                time.sleep(self.run_interval * 2)  # 오류시 더 긴 대기
+                if engine.wait(interval * 2):  # 오류시 더 긴 대기
+                    break
         
         logger.info(f"[{symbol}] 엔진 루프 종료")
     
+    def _first_cycle_done(self):
+        """시작 시 엔진들의 첫 매매 판단이 모두 끝나면 단계별 시작 시간 기록"""
+        with self._first_cycle_lock:
+            if self._first_cycle_pending <= 0:
+                return
+            self._first_cycle_pending -= 1
+            if self._first_cycle_pending:
+                return
+        self.startup_timings["first_decisions"] = time.perf_counter() - self._start_time
+        logger.info("시작 시간: " + ", ".join(f"{name} {seconds * 1000:.0f}ms"
+                                            for name, seconds in self.startup_timings.items()))
+    
+    def _restore_checkpoint(self, engines: List[TraderEngine]):
+        """체크포인트의 지표/전략 상태 복원 (CHECKPOINT_MAX_AGE 이내만, 빈 구간은 분봉으로 보충)"""
+        if not self._checkpoint:
+            loaded = load_checkpoint(self.checkpoint_path)
+            if loaded is None:
+                return
+            self._checkpoint = loaded[1]
+        now = time.time()
+        interval = self.run_interval
+        restored = []
+        for engine in engines:
+            state = self._checkpoint.get(engine.key)
+            if state is not None and now - state.updated_at <= config.checkpoint_max_age:
+                restored.append((engine, state))
+        if not restored:
+            return
+        
+        # 폴링 간격 2회 이상 비었으면 분봉 종가로 빈 구간 보충
+        get_closes = getattr(self.price_source, "get_minute_closes", None)
+        gaps = [(engine, state) for engine, state in restored if now - state.updated_at >= interval * 2]
+        backfills: Dict[str, List[float]] = {}
+        if config.checkpoint_backfill and get_closes is not None and gaps:
+            def backfill(engine, state):
+                minutes = int((now - state.updated_at) // 60) + 2
+                return fill_gap(state.updated_at, now, interval, get_closes(engine.symbol, minutes),
+                                engine.trigger.HISTORY_SIZE)
+            with ThreadPoolExecutor(max_workers=min(len(gaps), 4), thread_name_prefix="Backfill") as pool:
+                jobs = {engine.key: pool.submit(backfill, engine, state) for engine, state in gaps}
+                for symbol, job in jobs.items():
+                    try:
+                        backfills[symbol] = job.result()
+                    except Exception as e:
+                        logger.warning(f"[{symbol}] 빈 구간 보충 실패: {e}")
+        
+        for engine, state in restored:
+            samples = backfills.get(engine.key, ())
+            engine.trigger.restore_state(state, samples)
+            engine.last_price_time = state.updated_at + len(samples) * interval
+        logger.info(f"체크포인트 복원: {len(restored)}/{len(engines)}개 엔진 "
+                    f"(빈 구간 보충 {sum(1 for samples in backfills.values() if samples)}개)")
+    
+    def _record_engines(self, engines: List[TraderEngine]):
+        """세션 기록에 엔진 구성과 시작 시점의 지표/전략 상태 기록 (재실행 시 같은 상태에서 시작)"""
+        if self.recorder is None:
+            return
+        for engine in engines:
+            trigger = engine.trigger
+            self.recorder.record("engine", engine.key, {
+                "asset": engine.asset_config.to_dict(),
+                "dry_run": engine.dry_run,
+                "state": [list(trigger.price_history), trigger.last_action, trigger.last_action_price],
+                "last_price_time": engine.last_price_time,
+            })
+    
+    def save_checkpoint(self):
+        """모든 엔진의 지표/전략 상태를 체크포인트 파일에 기록"""
+        if not self.checkpoint_path:
+            return
+        states = [engine.trigger.get_state(engine.last_price_time)._replace(symbol=engine.key)
+                  for engine in list(self.engines.values())
+                  if engine.last_price_time and engine.trigger.price_history]
+        with self._checkpoint_lock:
+            try:
+                save_checkpoint(self.checkpoint_path, states, time.time())
+            except OSError as e:
+                logger.error(f"체크포인트 저장 실패: {e}")
+                return
+        logger.debug("체크포인트 저장: %d개 엔진", len(states))
+    
+    def _start_checkpoint_thread(self):
+        """주기적 체크포인트 쓰레드 시작 (CHECKPOINT_INTERVAL > 0)"""
+        interval = config.checkpoint_interval
+        if not self.checkpoint_path or interval <= 0:
+            return
+        def checkpoint_loop():
+            while not self._stop_event.wait(interval):
+                self.save_checkpoint()
+        threading.Thread(target=checkpoint_loop, name="Checkpoint", daemon=True).start()
+    
     def _start_status_thread(self):
         """상태 업데이트 쓰레드 시작"""
         def status_loop():
+            interval = self.status_update_interval
             while self.is_running:
                 try:
                     self._send_status_updates()
-                    time.sleep(self.status_update_interval)
+                    interval = self.status_update_interval
                 except Exception as e:
                     logger.error(f"상태 업데이트 오류: {e}")
-                    time.sleep(60)
+                    interval = 60
+                if self._stop_event.wait(interval):
+                    break
         
         status_thread = threading.Thread(
             target=status_loop,
@@ -131,77 +435,101 @@ class TraderManager:
         logger.info("상태 업데이트 쓰레드 시작")
     
     def _send_status_updates(self):
-        """모든 엔진의 상태 알림 전송"""
+        """모든 엔진의 상태 알림 전송 (전송기에서 하나의 다이제스트로 병합)"""
         for symbol, engine in self.engines.items():
             try:
                 engine.send_status_notification()
             except Exception as e:
                 logger.error(f"[{symbol}] 상태 알림 실패: {e}")
+        get_dispatcher().request_flush()
     
-    def get_overall_status(self) -> Dict:
-        """전체 시스템 상태 반환"""
-        status = {
-            "manager": {
-                "is_running": self.is_running,
-                "total_engines": len(self.engines),
-                "active_threads": sum(1 for f in self.engine_futures.values() if not f.done()),
-                "dry_run": self.dry_run
-            },
-            "engines": {}
-        }
-        
-        total_value = 0
-        total_profit = 0
+    def get_overall_status(self) -> SystemStatus:
+        """전체 시스템 상태 반환 (엔진이 게시한 스냅샷만 읽음, 네트워크 호출 없음)"""
+        aggregate = status_board.aggregate()
+        engines = aggregate.engines
+        if len(engines) != len(self.engines) or any(symbol not in engines for symbol in self.engines):
+            engines = MappingProxyType({symbol: snapshot for symbol, snapshot in engines.items()
+                                        if symbol in self.engines})
         
-        for symbol, engine in self.engines.items():
-            engine_status = engine.get_status()
-            status["engines"][symbol] = engine_status
-            
-            # 전체 수익 계산
-            portfolio = engine_status.get("portfolio", {})
-            if portfolio.get("current_value"):
-                total_value += portfolio["current_value"]
-            if portfolio.get("profit"):
-                total_profit += portfolio["profit"]
-        
-        status["manager"]["total_value"] = total_value
-        status["manager"]["total_profit"] = total_profit
-        status["manager"]["total_profit_rate"] = (total_profit / total_value * 100) if total_value > 0 else 0
-        
-        return status
+        return SystemStatus(
+            is_running=self.is_running,
+            total_engines=len(self.engines),
+            active_threads=sum(1 for f in list(self.engine_futures.values()) if not f.done()),
+            dry_run=self.dry_run,
+            engines=engines,
+            total_value=aggregate.total_value,
+            total_profit=aggregate.total_profit,
+            total_profit_rate=aggregate.total_profit_rate,
+            updated_at=aggregate.updated_at
+        )
     
     def reload_config(self):
-        """설정 다시 로드"""
-        logger.info("설정 다시 로드 시작")
-        
-        # 기존 엔진 중지
-        for engine in self.engines.values():
-            engine.stop()
-        if self.executor:
-            self.executor.shutdown(wait=True)
-            self.executor = None
-            self.engine_futures.clear()
-        
-        # 새 설정 로드
-        self.engines.clear()
-        self._load_assets()
-        
-        # 실행 중이면 다시 시작
-        if self.is_running:
-            for engine in self.engines.values():
-                engine.start()
-            self._start_parallel_execution()
-        
-        logger.info("설정 다시 로드 완료")
+        """설정 다시 로드 (변경된 자산만 반영)
+
+        - 추가된 자산: 새 엔진 시작
+        - 삭제된 자산: 해당 엔진만 중지
+        - 파라미터 변경: 실행 중인 엔진에 즉시 반영 (트리거 히스토리/포트폴리오 유지)
+        - 종목 자체가 바뀐 경우(base/quote/market): 해당 엔진만 교체
+        """
+        with self._reload_lock:
+            try:
+                assets = {asset.key: asset for asset in self._read_assets()}
+            except Exception as e:
+                logger.error(f"설정 다시 로드 실패, 기존 설정 유지: {e}")
+                return
+            
+            removed = [symbol for symbol in self.engines if symbol not in assets]
+            added = [symbol for symbol in assets if symbol not in self.engines]
+            changed = [symbol for symbol in assets
+                       if symbol in self.engines and self.engines[symbol].asset_config != assets[symbol]]
+            if not (removed or added or changed):
+                logger.info("설정 다시 로드: 변경 없음")
+                return
+            
+            for symbol in removed:
+                self._drain_asset(symbol)
+            
+            for symbol in changed:
+                if self.engines[symbol].apply_config(assets[symbol]):
+                    if self.recorder is not None:
+                        self.recorder.record("config", symbol, assets[symbol].to_dict())
+                else:
+                    logger.info(f"[{symbol}] 종목 설정 변경으로 엔진 교체")
+                    self._drain_asset(symbol)
+                    added.append(symbol)
+            
+            for symbol in added:
+                try:
+                    self.add_asset(assets[symbol])
+                except Exception as e:
+                    logger.error(f"[{symbol}] 자산 추가 실패: {e}")
+            
+            self._watch_orderbooks()
+            logger.info(f"설정 다시 로드 완료: 추가 {len(added)}, 삭제 {len(removed)}, 변경 {len(changed)}")
     
-    def add_asset(self, asset_config: Dict):
+    def _drain_asset(self, symbol: str):
+        """엔진을 중지하고 목록에서 제외 (루프는 현재 사이클을 마치고 스스로 종료)"""
+        engine = self.engines.pop(symbol)
+        engine.stop()
+        if self.recorder is not None:
+            self.recorder.record("remove", symbol)
+        self.engine_futures.pop(symbol, None)
+        status_board.remove(symbol)
+        if self.scheduler:
+            self.scheduler.remove(symbol)
+    
+    def add_asset(self, asset_config: Union[AssetConfig, Dict]):
         """새 자산 추가"""
-        symbol = asset_config["symbol"]
+        asset_config = as_asset_config(asset_config)
+        symbol = asset_config.key
         if symbol in self.engines:
             logger.warning(f"[{symbol}] 이미 존재하는 자산")
             return
         
-        engine = TraderEngine(asset_config, self.dry_run)
+        engine = TraderEngine(asset_config, self.dry_run, self.price_source, self.order_client)
+        if self.checkpoint_path:
+            self._restore_checkpoint([engine])
+        self._record_engines([engine])
         self.engines[symbol] = engine
         
         if self.is_running:
@@ -209,28 +537,36 @@ class TraderManager:
             if self.executor is None:
                 self._start_parallel_execution()
             else:
-                future = self.executor.submit(self._run_engine_loop, symbol, engine)
-                self.engine_futures[symbol] = future
+                self._ensure_pool_capacity()
+                self._submit_loop(symbol, engine)
         
         logger.info(f"[{symbol}] 새 자산 추가 완료")
     
+    def _ensure_pool_capacity(self):
+        """엔진 루프는 워커를 계속 점유하므로 자동 크기 풀은 엔진 수만큼 늘림
+
+        ThreadPoolExecutor 는 크기를 바꿀 수 없으므로 현재 풀이 가득 차면 두 배 크기의 새 풀을
+        만들고 기존 풀은 닫는다. 닫힌 풀도 실행 중인 엔진 루프는 끝날 때까지 계속 돌린다
+        (워커 스레드는 필요할 때만 만들어지므로 여유 크기는 비용이 없음).
+        """
+        if config.max_workers or self.executor is None:
+            return
+        self.max_workers = max(self.max_workers,
+                               sum(1 for f in list(self.engine_futures.values()) if not f.done()) + 1)
+        self._pool_futures = [f for f in self._pool_futures if not f.done()]
+        if len(self._pool_futures) < self._pool_size:
+            return
+        self.executor.shutdown(wait=False)
+        self._retired_executors.append(self.executor)
+        self._new_pool(max(self._pool_size * 2, 1))
+        logger.debug("엔진 풀 확장: %d", self._pool_size)
+    
     def remove_asset(self, symbol: str):
-        """자산 제거"""
+        """자산 제거 (symbol: 엔진 식별자, 기본 계정이 아니면 '심볼@계정')"""
         if symbol not in self.engines:
             logger.warning(f"[{symbol}] 존재하지 않는 자산")
             return
         
-        # 엔진 중지
-        self.engines[symbol].stop()
-        
-        # 실행 중인 Future 종료 대기
-        if symbol in self.engine_futures:
-            future = self.engine_futures.pop(symbol)
-            try:
-                future.result(timeout=5)
-            except Exception:
-                pass
-        
-        # 엔진 제거
-        del self.engines[symbol]
+        # 엔진 중지 및 제거 (루프는 중지 신호로 즉시 깨어나 종료)
+        self._drain_asset(symbol)
         logger.info(f"[{symbol}] 자산 제거 완료") 
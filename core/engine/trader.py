@@ -1,151 +1,326 @@
+import threading
 import time
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Optional, Union
 from core.data_collector import DataCollector
 from core.portfolio import Portfolio
 from core.trigger import Trigger
 from core.executor import Executor
 from core.notifier import Notifier
 from core.config import config
+from core.clock import clock
+from core.recorder import RecordingPriceSource, get_recorder
+from core.settings import AssetConfig, as_asset_config
+from core.metrics import PRICE_FETCH_SECONDS, TRIGGER_CHECK_SECONDS, ENGINE_CYCLES, ENGINE_ERRORS
+from core.tracing import tracer
+from core.status import EngineSnapshot, status_board
+from core.events import event_bus
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 class TraderEngine:
-    """자산별 독립 트레이딩 엔진"""
+    """자산별 독립 트레이딩 엔진
     
-    def __init__(self, asset_config: Dict, dry_run: bool = None):
-        self.symbol = asset_config["symbol"]
-        self.base_currency = asset_config["base_currency"]
-        self.quote_currency = asset_config["quote_currency"]
-        self.trade_amount = asset_config["trade_amount"]
+    엔진은 계정 하나에 묶인다 (주문 클라이언트, 리스크 한도). 같은 심볼을 여러 계정에서
+    거래하면 엔진은 계정마다 따로 있고 가격 소스는 공유하며, 엔진 식별자(key)는 '심볼@계정'이다.
+    """
+    
+    # 바뀌면 다른 종목(또는 다른 계정)이 되므로 엔진을 새로 만들어야 하는 설정 항목
+    IDENTITY_KEYS = ("symbol", "base_currency", "quote_currency", "market", "account")
+    
+    def __init__(self, asset_config: Union[AssetConfig, Dict], dry_run: bool = None, data_collector=None,
+                 order_client=None):
+        # dict 로 받으면 스키마 검증 (잘못된 설정은 엔진 생성 시점에 ConfigError)
+        self.asset_config = as_asset_config(asset_config)
+        settings = self.asset_config
+        self.symbol = settings.symbol
+        self.account = settings.account
+        self.key = settings.key
+        self.base_currency = settings.base_currency
+        self.quote_currency = settings.quote_currency
+        self.trade_amount = settings.trade_amount
         # 환경변수에서 dry_run 설정 가져오기
         self.dry_run = dry_run if dry_run is not None else config.dry_run
+        if settings.market:
+            config.register_market(self.symbol, settings.market)
         
-        # 모듈 인스턴스 초기화 (업비트 전용)
-        self.data_collector = DataCollector()
+        # 모듈 인스턴스 초기화 (업비트 전용, 샤드 모드에서는 공유 가격 테이블)
+        self.data_collector = data_collector if data_collector is not None else DataCollector()
+        # 세션 기록 (RECORD_PATH) 과 마지막 사이클의 판단 [action, 체결 수량, 체결가]
+        self.recorder = get_recorder()
+        self.last_decision = None
+        if self.recorder is not None:
+            self.data_collector = RecordingPriceSource(self.data_collector, self.recorder, self.key)
         self.portfolio = Portfolio(self.symbol)
-        self.trigger = Trigger(self.symbol)
-        self.executor = Executor(self.symbol, self.trade_amount, self.dry_run, use_upbit=True)
-        self.notifier = Notifier(self.symbol)
+        self.trigger = Trigger(self.symbol, settings.strategy)
+        self.executor = Executor(self.symbol, self.trade_amount, self.dry_run, use_upbit=True,
+                                 order_client=order_client, settings=settings.executor,
+                                 limits=settings.strategy, account=self.account)
+        self.notifier = Notifier(self.key)
+        self.notifier.config.update(settings.notifier._asdict())
         
         # 상태 변수
         self.is_running = False
+        self._stop_event = threading.Event()
         self.last_run_time = 0
         self.run_count = 0
         self.error_count = 0
+        self.last_price: Optional[float] = None
+        self.last_price_time = 0.0
+        # 적응형 폴링용 (매니저가 poll_interval 을 갱신)
+        self.urgency = 0.0
+        self.poll_interval = config.polling_interval
+        self.status_board = status_board
         
-        logger.info(f"[{self.symbol}] 트레이딩 엔진 초기화 완료")
+        # 메트릭 (라벨 조회 비용을 없애기 위해 자식 캐시)
+        self._price_fetch_metric = PRICE_FETCH_SECONDS.labels(self.key)
+        self._trigger_metric = TRIGGER_CHECK_SECONDS.labels(self.key)
+        self._cycle_metric = ENGINE_CYCLES.labels(self.key)
+        self._error_metric = ENGINE_ERRORS.labels(self.key)
+        
+        logger.debug("[%s] 트레이딩 엔진 초기화 완료", self.key)
+    
+    def apply_config(self, asset_config: Union[AssetConfig, Dict]) -> bool:
+        """실행 중인 엔진에 변경된 설정 반영 (종목이 바뀌는 변경이면 False)"""
+        settings = as_asset_config(asset_config)
+        if any(getattr(settings, key) != getattr(self.asset_config, key) for key in self.IDENTITY_KEYS):
+            return False
+        
+        self.trade_amount = settings.trade_amount
+        self.executor.trade_amount = self.trade_amount
+        self.executor.min_order_interval = settings.executor.min_order_interval
+        # 불변 스냅샷 참조만 교체 (가격 히스토리는 유지)
+        self.trigger.config = settings.strategy
+        self.executor.limits = settings.strategy
+        notifier_config = self.notifier._default_config()
+        notifier_config.update(settings.notifier._asdict())
+        self.notifier.config = notifier_config
+        self.asset_config = settings
+        logger.info(f"[{self.key}] 설정 변경 반영: 거래금액={self.trade_amount}, 전략={settings.strategy}")
+        return True
     
     def get_current_price(self) -> Optional[float]:
-        """현재 가격 조회"""
-        return self.data_collector.get_price(self.symbol)
+        """현재 가격 조회 (캐시는 폴링 간격의 절반까지만 사용)"""
+        return self.data_collector.get_price(self.symbol, max_age=min(5, self.poll_interval / 2))
+    
+    def _is_price_stale(self) -> bool:
+        """가격 소스가 마지막 가격을 대신 돌려줬는지 (공유 테이블 등은 오래된 가격을 None 으로 처리)"""
+        is_stale = getattr(self.data_collector, "is_stale", None)
+        return is_stale is not None and is_stale(self.symbol)
     
-    def run_once(self) -> bool:
-        """한번의 트레이딩 사이클 실행"""
+    def run_once(self, now: float = None) -> bool:
+        """한번의 트레이딩 사이클 실행 (가격 관측마다 새 트레이스)
+        
+        사이클 동안 시계는 now(기본: 현재 시각)로 고정된다. 기록된 사이클 시각과 입력으로
+        다시 실행하면 같은 판단이 나온다 (core.replay).
+        """
+        now = time.time() if now is None else now
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record("cycle", self.key, None, now)
+        self.last_decision = None
+        try:
+            with tracer.start_trace("engine.cycle", symbol=self.key), clock.frozen(now):
+                return self._run_cycle()
+        finally:
+            if recorder is not None:
+                recorder.record("decision", self.key, self.last_decision, now)
+            self._publish_status()
+    
+    def _run_cycle(self) -> bool:
+        """트레이딩 사이클 본문"""
         try:
             self.run_count += 1
-            current_time = time.time()
+            self._cycle_metric.inc()
+            current_time = clock.time()
             
             # 현재 가격 조회
-            current_price = self.get_current_price()
+            started = time.perf_counter()
+            with tracer.span("price.fetch"):
+                current_price = self.get_current_price()
+            self._price_fetch_metric.observe(time.perf_counter() - started)
             if current_price is None:
-                logger.warning(f"[{self.symbol}] 가격 조회 실패")
+                logger.warning(f"[{self.key}] 가격 조회 실패")
+                return False
+            self.last_price = current_price
+            if self._is_price_stale():
+                # 조회 실패로 받은 이전 가격은 상태 표시에만 쓰고 매매 판단은 건너뜀
+                logger.debug("[%s] 이전 가격 사용 중, 매매 판단 생략", self.key)
                 return False
+            self.last_price_time = current_time
+            event_bus.publish("price", self.key, price=current_price)
+            
+            # 응답을 못 받은 실거래 주문이 체결로 확인되면 포트폴리오에 반영
+            for order in self.executor.reconcile_orders():
+                self._apply_reconciled(order, current_price)
             
             # 매매 시그널 판단
-            action = self.trigger.check(current_price, self.portfolio)
+            started = time.perf_counter()
+            with tracer.span("trigger.check") as span:
+                action = self.trigger.check(current_price, self.portfolio)
+                self.urgency = self.trigger.get_urgency(current_price, self.portfolio)
+                span.set("action", action)
+            self._trigger_metric.observe(time.perf_counter() - started)
+            self.last_decision = [action, None, None]
+            
+            if action in ("buy", "sell"):
+                event_bus.publish("signal", self.key, action=action, price=current_price)
             
             if action == "buy":
                 self._execute_buy(current_price)
             elif action == "sell":
                 self._execute_sell(current_price)
             else:
-                logger.debug(f"[{self.symbol}] 대기: ${current_price:.4f}")
+                logger.debug("[%s] 대기: $%.4f", self.key, current_price)
             
             self.last_run_time = current_time
             return True
             
         except Exception as e:
             self.error_count += 1
-            logger.error(f"[{self.symbol}] 실행 오류: {e}")
+            self._error_metric.inc()
+            logger.error(f"[{self.key}] 실행 오류: {e}")
             self.notifier.send_error_notification(str(e))
             return False
     
+    def _refresh_simulator_book(self):
+        """모의거래 시 최신 호가를 체결 엔진에 반영"""
+        if not self.executor.dry_run:
+            return
+        with tracer.span("orderbook.fetch"):
+            book = self.data_collector.get_orderbook(self.symbol)
+        if book is not None and book.levels:
+            snapshot = book.snapshot()
+            # 사이클 시각이 고정되므로 이번 사이클에 받은 호가는 사이클 시각부터 유효한 것으로 봄
+            snapshot.timestamp = min(snapshot.timestamp, clock.time())
+            self.executor.simulator.update_book(snapshot)
+    
     def _execute_buy(self, price: float):
         """매수 실행"""
         try:
+            self._refresh_simulator_book()
             order = self.executor.buy(price)
             if order:
-                # 포트폴리오 업데이트
+                # 포트폴리오 업데이트 (실제 체결가와 수수료 반영)
                 quantity = order["quantity"]
-                self.portfolio.add_buy(quantity, price)
+                fill_price = order.get("price", price)
+                self.portfolio.add_buy(quantity, fill_price, order.get("fee", 0.0))
+                self.last_decision = ["buy", quantity, fill_price]
+                self._publish_trade(order)
                 
                 # 알림 전송
                 portfolio_status = self.portfolio.get_status(price)
                 self.notifier.send_trade_notification(order, portfolio_status)
                 
-                logger.info(f"[{self.symbol}] 매수 완료: {quantity:.6f} @ ${price:.4f}")
+                logger.info(f"[{self.key}] 매수 완료: {quantity:.6f} @ ${fill_price:.4f}")
                 
         except Exception as e:
-            logger.error(f"[{self.symbol}] 매수 실행 실패: {e}")
+            logger.error(f"[{self.key}] 매수 실행 실패: {e}")
             self.notifier.send_error_notification(f"매수 실행 실패: {e}")
     
     def _execute_sell(self, price: float):
         """매도 실행"""
         try:
             # 보유량의 일부만 매도
-            sell_ratio = self.trigger.config.get("sell_ratio", 1.0)
+            sell_ratio = self.trigger.config.sell_ratio
             quantity = self.portfolio.holdings * sell_ratio
             if quantity > 0:
+                self._refresh_simulator_book()
                 order = self.executor.sell(quantity, price)
                 if order:
-                    # 포트폴리오 업데이트
-                    success = self.portfolio.add_sell(quantity, price)
+                    # 포트폴리오 업데이트 (부분 체결 수량과 수수료 반영)
+                    filled = order.get("quantity", quantity)
+                    fill_price = order.get("price", price)
+                    success = self.portfolio.add_sell(filled, fill_price, order.get("fee", 0.0))
+                    self.last_decision = ["sell", filled, fill_price]
                     if success:
+                        self._publish_trade(order)
                         # 알림 전송
                         portfolio_status = self.portfolio.get_status(price)
                         self.notifier.send_trade_notification(order, portfolio_status)
                         
-                        logger.info(f"[{self.symbol}] 매도 완료: {quantity:.6f} @ ${price:.4f}")
+                        logger.info(f"[{self.key}] 매도 완료: {filled:.6f} @ ${fill_price:.4f}")
                     
         except Exception as e:
-            logger.error(f"[{self.symbol}] 매도 실행 실패: {e}")
+            logger.error(f"[{self.key}] 매도 실행 실패: {e}")
             self.notifier.send_error_notification(f"매도 실행 실패: {e}")
     
+    def _apply_reconciled(self, order: Dict, price: float):
+        """뒤늦게 체결이 확인된 주문을 포트폴리오에 반영"""
+        quantity, fill_price, fee = order["quantity"], order["price"], order.get("fee", 0.0)
+        if order["type"] == "buy":
+            self.portfolio.add_buy(quantity, fill_price, fee)
+        elif not self.portfolio.add_sell(quantity, fill_price, fee):
+            return
+        self._publish_trade(order)
+        self.notifier.send_trade_notification(order, self.portfolio.get_status(price))
+        logger.info(f"[{self.key}] 결과 미확인 주문 반영: {order['type']} {quantity:.6f} @ ${fill_price:.4f}")
+    
+    def _publish_trade(self, order: Dict):
+        """체결 이벤트 발행"""
+        event_bus.publish("trade", self.key, id=order.get("id"), side=order.get("type"),
+                          quantity=order.get("quantity"), price=order.get("price"),
+                          fee=order.get("fee", 0.0), status=order.get("status"))
+    
+    def _publish_status(self):
+        """마지막 관측 가격 기준 상태 스냅샷 게시 (네트워크 호출 없음)"""
+        price = self.last_price
+        self.status_board.publish(EngineSnapshot(
+            symbol=self.key,
+            is_running=self.is_running,
+            run_count=self.run_count,
+            error_count=self.error_count,
+            last_run_time=self.last_run_time,
+            current_price=price,
+            price_time=self.last_price_time,
+            portfolio=MappingProxyType(self.portfolio.get_status(price)),
+            last_action=self.trigger.last_action,
+            signal_strength=self.trigger.get_signal_strength(price) if price else 0,
+            updated_at=time.time()
+        ))
+    
+    def get_snapshot(self) -> EngineSnapshot:
+        """최근 게시된 상태 스냅샷"""
+        snapshot = self.status_board.get(self.key)
+        if snapshot is None:
+            self._publish_status()
+            snapshot = self.status_board.get(self.key)
+        return snapshot
+    
     def get_status(self) -> Dict:
-        """엔진 상태 정보 반환"""
-        current_price = self.get_current_price()
-        portfolio_status = self.portfolio.get_status(current_price)
-        
-        status = {
-            "symbol": self.symbol,
-            "is_running": self.is_running,
-            "run_count": self.run_count,
-            "error_count": self.error_count,
-            "last_run_time": self.last_run_time,
-            "current_price": current_price,
-            "portfolio": portfolio_status,
-            "last_action": self.trigger.last_action,
-            "signal_strength": self.trigger.get_signal_strength(current_price) if current_price else 0
-        }
-        
-        return status
+        """엔진 상태 정보 반환 (최근 스냅샷 기준)"""
+        return self.get_snapshot().to_dict()
     
     def start(self):
         """엔진 시작"""
+        self._stop_event.clear()
         self.is_running = True
-        logger.info(f"[{self.symbol}] 트레이딩 엔진 시작")
+        self._publish_status()
+        logger.info(f"[{self.key}] 트레이딩 엔진 시작")
     
-    def stop(self):
-        """엔진 중지"""
+    def wait(self, timeout: float) -> bool:
+        """timeout 초 대기 (중지 요청 시 즉시 깨어나 True 반환)"""
+        return self._stop_event.wait(timeout)
+    
+    def request_stop(self):
+        """중지 요청 (대기 중인 엔진 루프를 즉시 깨움)"""
         self.is_running = False
-        # 미체결 주문 취소
+        self._stop_event.set()
+    
+    def cancel_orders(self):
+        """미체결 주문 취소 후 상태 게시"""
         self.executor.cancel_all_orders()
-        logger.info(f"[{self.symbol}] 트레이딩 엔진 중지")
+        self._publish_status()
+    
+    def stop(self):
+        """엔진 중지"""
+        self.request_stop()
+        self.cancel_orders()
+        logger.info(f"[{self.key}] 트레이딩 엔진 중지")
     
     def send_status_notification(self):
-        """상태 알림 전송"""
-        current_price = self.get_current_price()
-        if current_price:
-            portfolio_status = self.portfolio.get_status(current_price)
-            self.notifier.send_status_notification(portfolio_status, current_price) 
\ No newline at end of file
+        """상태 알림 전송 (마지막 관측 가격 기준)"""
+        snapshot = self.get_snapshot()
+        if snapshot.current_price:
+            self.notifier.send_status_notification(dict(snapshot.portfolio), snapshot.current_price) 
\ No newline at end of file
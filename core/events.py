@@ -0,0 +1,101 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Event(NamedTuple):
+    """엔진 이벤트 (payload 는 구독자 수와 무관하게 한 번만 JSON 인코딩)"""
+
+    seq: int
+    type: str
+    symbol: str
+    timestamp: float
+    payload: str
+
+
+class EventBus:
+    """엔진 이벤트 브로드캐스터
+
+    발행(publish)은 SimpleQueue 에 넣기만 하므로 거래 스레드는 구독자 수와 무관하게
+    O(1) 비용만 부담한다. 전용 스레드가 이벤트에 순번을 붙여 고정 크기 링에 쌓고
+    대기 중인 구독자를 깨운다. 구독자는 마지막으로 받은 순번 이후 이벤트를 읽으며,
+    링보다 뒤처진 구독자는 밀려난 이벤트를 건너뛴다.
+
+    start() 전에는 발행이 무시된다 (API 서버를 켜지 않으면 비용 없음).
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._ring: deque = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._active = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    def start(self):
+        """브로드캐스트 스레드 시작"""
+        if self._thread is not None:
+            return
+        self._active = True
+        self._thread = threading.Thread(target=self._run, name="EventBus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """브로드캐스트 스레드 종료 (대기 중인 구독자도 깨움)"""
+        if self._thread is None:
+            return
+        self._active = False
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def publish(self, event_type: str, symbol: str, **data):
+        """이벤트 발행 (비활성 상태면 무시)"""
+        if self._active:
+            self._queue.put((event_type, symbol, time.time(), data))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            event_type, symbol, timestamp, data = item
+            try:
+                data["symbol"] = symbol
+                data["timestamp"] = timestamp
+                payload = json.dumps(data, ensure_ascii=False, default=str)
+            except Exception as e:
+                logger.error(f"이벤트 인코딩 실패 ({event_type}): {e}")
+                continue
+            with self._cond:
+                seq = next(self._seq)
+                self._ring.append(Event(seq, event_type, symbol, timestamp, payload))
+                self._last_seq = seq
+                self._cond.notify_all()
+
+    def events_since(self, seq: int, timeout: float = 15.0) -> List[Event]:
+        """seq 이후 이벤트 반환 (없으면 최대 timeout 초 대기)"""
+        with self._cond:
+            if self._last_seq <= seq and self._active:
+                self._cond.wait(timeout)
+            if self._last_seq <= seq or not self._ring:
+                return []
+            first = self._ring[0].seq
+            return list(itertools.islice(self._ring, max(seq + 1 - first, 0), None))
+
+
+event_bus = EventBus()
@@ -1,31 +1,65 @@
+import os
 import time
-from typing import Optional, Dict
+import uuid
+from typing import Optional, Dict, List, NamedTuple
 from utils.logger import get_logger
-from core.upbit_client import UpbitClient
+from core.simulator import FillSimulator
+from core.clock import clock
 from core.config import config
+from core.metrics import ORDER_ROUNDTRIP_SECONDS
+from core.tracing import tracer, traced
+from core.history import RingBuffer, RingView, OrderRecord
+from core.trade_log import get_trade_log_writer
+from core.ledger import get_ledger
+from core.settings import ExecutorConfig, StrategyConfig, engine_key
+from core.risk import RiskManager
+from core.accounts import get_account
+from core.recorder import RecordingOrderClient, RecordingRiskGate, get_recorder
+from core.resilience import OrderOutcomeUnknown
 
 logger = get_logger(__name__)
 
+
+class _UnresolvedOrder(NamedTuple):
+    """거래소 결과를 확인하지 못한 실거래 주문 (reserved: 잡아둔 매수 리스크 예약 금액)"""
+    order_type: str
+    quantity: float
+    price: float
+    reserved: float
+
 class Executor:
     """자산별 주문 실행기"""
     
-    def __init__(self, symbol: str, trade_amount: float, dry_run: bool = None, use_upbit: bool = True):
+    def __init__(self, symbol: str, trade_amount: float, dry_run: bool = None, use_upbit: bool = True,
+                 order_client=None, settings: ExecutorConfig = None, limits: StrategyConfig = None,
+                 risk: RiskManager = None, account: str = None):
         self.symbol = symbol
+        # 거래 계정 (None: 기본 계정), 원장/메트릭에는 계정을 붙인 식별자 사용
+        self.account = get_account(account)
+        self.key = engine_key(symbol, account)
         self.trade_amount = trade_amount
         # 환경변수에서 dry_run 설정 가져오기
         self.dry_run = dry_run if dry_run is not None else config.dry_run
         self.use_upbit = use_upbit
-        self.order_history = []
+        self.order_history = RingBuffer(config.order_history_size, spill=self._spill_order)
         self.last_order_time = 0
-        self.min_order_interval = 30  # 최소 주문 간격 (초)
+        self.min_order_interval = (settings or ExecutorConfig()).min_order_interval  # 최소 주문 간격 (초)
+        # 포지션 한도 (max_position_ratio, min_interval_minutes)와 계정별 리스크 관리자
+        self.limits = limits or StrategyConfig()
+        self.risk = risk if risk is not None else self.account.risk
         self.market_mapping = config.get_market_mapping()
         self.min_order_amounts = config.get_min_order_amounts()
+        # 결과 미확인 주문 (식별자 -> 주문), 확정될 때까지 새 주문을 내지 않음
+        self._unresolved: Dict[str, _UnresolvedOrder] = {}
         
-        # 업비트 클라이언트 초기화
-        if use_upbit and not self.dry_run and config.has_api_keys:
+        # 업비트 클라이언트 초기화 (클러스터 워커는 코디네이터 중계 클라이언트 사용)
+        if order_client is not None and not self.dry_run:
+            self.upbit_client = order_client if account is None else order_client.for_account(account)
+            logger.debug("[%s] 주문 중계 실거래 모드 활성화", self.symbol)
+        elif use_upbit and not self.dry_run and self.account.has_api_keys:
             try:
-                self.upbit_client = UpbitClient()
-                logger.info(f"[{self.symbol}] 업비트 실제 거래 모드 활성화")
+                self.upbit_client = self.account.client()
+                logger.debug("[%s] 업비트 실제 거래 모드 활성화", self.symbol)
             except Exception as e:
                 logger.error(f"[{self.symbol}] 업비트 클라이언트 초기화 실패: {e}")
                 logger.warning(f"[{self.symbol}] 모의거래 모드로 전환")
@@ -33,79 +67,149 @@ class Executor:
                 self.dry_run = True
         else:
             self.upbit_client = None
-            logger.info(f"[{self.symbol}] 모의거래 모드")
-    
-
+            logger.debug("[%s] 모의거래 모드", self.symbol)
+        # 세션 기록 시 거래소 응답과 리스크 판정을 기록
+        recorder = get_recorder()
+        if recorder is not None:
+            self.risk = RecordingRiskGate(self.risk, recorder, self.key)
+            if self.upbit_client is not None:
+                self.upbit_client = RecordingOrderClient(self.upbit_client, recorder, self.key)
+        
+        # 모의 체결 엔진
+        upbit_market = self.market_mapping.get(self.symbol, self.symbol)
+        self.simulator = FillSimulator(
+            upbit_market,
+            fee_rate=config.sim_fee_rate,
+            latency_ms=config.sim_latency_ms,
+            slippage_bps=config.sim_slippage_bps,
+            min_order_amount=self.min_order_amounts.get(upbit_market, 5000)
+        )
+        
+        mode = "dry" if self.dry_run else "live"
+        self._roundtrip_metrics = {
+            side: ORDER_ROUNDTRIP_SECONDS.labels(self.key, side, mode) for side in ("buy", "sell")
+        }
     
     def _can_place_order(self) -> bool:
         """주문 가능 여부 체크"""
-        current_time = time.time()
+        if self._unresolved:
+            logger.warning(f"[{self.symbol}] 결과 미확인 주문 {len(self._unresolved)}건 확정 전까지 주문 보류")
+            return False
+        current_time = clock.time()
         if current_time - self.last_order_time < self.min_order_interval:
             logger.warning(f"[{self.symbol}] 주문 간격 부족: {self.min_order_interval}초 대기 필요")
             return False
         return True
     
-    def _simulate_order(self, order_type: str, quantity: float, price: float) -> Dict:
-        """시뮬레이션 주문 (실제 거래소 연동시 이 부분을 실제 API 호출로 교체)"""
+    def _simulate_order(self, order_type: str, quantity: float, price: float) -> Optional[Dict]:
+        """모의 체결 엔진을 통한 시뮬레이션 주문"""
+        fill = self.simulator.execute(order_type, quantity, price)
+        if fill.status == "rejected":
+            logger.warning(f"[{self.symbol}] 모의 주문 거부: {quantity:.6f} @ ${price:.4f}")
+            return None
+        
         order = {
-            "id": f"sim_{int(time.time())}",
-            "symbol": self.symbol,
+            "id": fill.order_id,
+            "symbol": self.key,
             "type": order_type,
-            "quantity": quantity,
-            "price": price,
-            "status": "filled",
-            "timestamp": time.time()
+            "quantity": fill.quantity,
+            "price": fill.avg_price,
+            "fee": fill.fee,
+            "requested_quantity": quantity,
+            "reference_price": price,
+            "status": fill.status,
+            "timestamp": fill.timestamp
         }
         return order
     
+    @traced("executor.buy")
     def buy(self, price: float) -> Optional[Dict]:
-        """매수 주문 실행"""
+        """매수 주문 실행 (리스크 한도 확인 후 체결 시 노출 반영)"""
         if not self._can_place_order():
             return None
         
+        quantity = self.trade_amount
+        reserved = quantity * price
+        if not self.risk.reserve_buy(self.key, reserved, self.limits):
+            return None
+        
+        order = None
+        held = False
         try:
-            quantity = self.trade_amount
+            started = time.perf_counter()
             
             if self.dry_run:
                 order = self._simulate_order("buy", quantity, price)
-                logger.info(f"[{self.symbol}] 모의 매수: {quantity:.6f} @ ${price:.4f}")
+                if not order:
+                    return None
+                logger.info(f"[{self.symbol}] 모의 매수: {order['quantity']:.6f} @ ${order['price']:.4f}")
             else:
                 # 실제 거래소 API 호출
-                order = self._place_real_order("buy", quantity, price)
+                order = self._place_real_order("buy", quantity, price, reserved)
                 logger.info(f"[{self.symbol}] 실제 매수: {quantity:.6f} @ ${price:.4f}")
             
-            self.order_history.append(order)
-            self.last_order_time = time.time()
+            self._roundtrip_metrics["buy"].observe(time.perf_counter() - started)
+            order["trace_id"] = tracer.current_trace_id()
+            self.order_history.append(OrderRecord.from_order(order))
+            self._record_fill(order)
+            self.last_order_time = clock.time()
             return order
             
+        except OrderOutcomeUnknown as e:
+            # 체결됐을 수 있으므로 예약을 유지하고 reconcile_orders 에서 확정
+            held = True
+            logger.error(f"[{self.symbol}] 매수 주문 결과 미확인: {e}")
+            return None
         except Exception as e:
             logger.error(f"[{self.symbol}] 매수 주문 실패: {e}")
             return None
+        finally:
+            if order:
+                self.risk.record_buy(self.key, reserved, order["quantity"],
+                                     order["quantity"] * order["price"] + order.get("fee", 0.0))
+            elif not held:
+                self.risk.release(self.key, reserved)
     
+    @traced("executor.sell")
     def sell(self, quantity: float, price: float) -> Optional[Dict]:
-        """매도 주문 실행"""
-        if not self._can_place_order():
+        """매도 주문 실행 (체결 시 노출 감소와 실현 손익 반영)"""
+        if not self._can_place_order() or not self.risk.check_sell(self.key):
             return None
         
         try:
+            started = time.perf_counter()
             if self.dry_run:
                 order = self._simulate_order("sell", quantity, price)
-                logger.info(f"[{self.symbol}] 모의 매도: {quantity:.6f} @ ${price:.4f}")
+                if not order:
+                    return None
+                logger.info(f"[{self.symbol}] 모의 매도: {order['quantity']:.6f} @ ${order['price']:.4f}")
             else:
                 # 실제 거래소 API 호출
                 order = self._place_real_order("sell", quantity, price)
                 logger.info(f"[{self.symbol}] 실제 매도: {quantity:.6f} @ ${price:.4f}")
             
-            self.order_history.append(order)
-            self.last_order_time = time.time()
+            self._roundtrip_metrics["sell"].observe(time.perf_counter() - started)
+            order["trace_id"] = tracer.current_trace_id()
+            self.order_history.append(OrderRecord.from_order(order))
+            self._record_fill(order)
+            self.last_order_time = clock.time()
+            self.risk.record_sell(self.key, order["quantity"],
+                                  order["quantity"] * order["price"] - order.get("fee", 0.0))
             return order
             
+        except OrderOutcomeUnknown as e:
+            logger.error(f"[{self.symbol}] 매도 주문 결과 미확인: {e}")
+            return None
         except Exception as e:
             logger.error(f"[{self.symbol}] 매도 주문 실패: {e}")
             return None
     
-    def _place_real_order(self, order_type: str, quantity: float, price: float) -> Dict:
-        """실제 거래소 주문"""
+    def _place_real_order(self, order_type: str, quantity: float, price: float, reserved: float = 0.0) -> Dict:
+        """실제 거래소 주문
+
+        주문마다 식별자를 붙여, 응답 없이 실패하면 식별자로 접수 여부를 조회한다. 조회도
+        실패하면 결과 미확인 주문으로 남기고 OrderOutcomeUnknown 을 올린다.
+        """
         if not self.upbit_client:
             raise Exception("업비트 클라이언트가 초기화되지 않음")
         
@@ -116,6 +220,7 @@ class Executor:
         
         # 업비트 주문 실행
         side = 'bid' if order_type == 'buy' else 'ask'
+        identifier = f"ats-{uuid.uuid4().hex}"
         
         if order_type == 'buy':
             # 매수: 금액 기준으로 주문 (시장가)
@@ -127,35 +232,86 @@ class Executor:
                 order_amount = min_amount
             
             # 원화 마켓에서는 주문 금액을 price 파라미터에 전달
-            result = self.upbit_client.place_order(
-                market=upbit_market,
-                side=side,
-                ord_type='price',  # 시장가 매수
-                price=order_amount
-            )
+            params = dict(ord_type='price', price=order_amount)  # 시장가 매수
         else:
             # 매도: 수량 기준으로 주문
-            result = self.upbit_client.place_order(
-                market=upbit_market,
-                side=side,
-                ord_type='market',  # 시장가 매도
-                volume=quantity
-            )
+            params = dict(ord_type='market', volume=quantity)  # 시장가 매도
         
+        try:
+            result = self.upbit_client.place_order(market=upbit_market, side=side, identifier=identifier, **params)
+        except OrderOutcomeUnknown as e:
+            logger.error(f"[{self.symbol}] 주문 응답 없음, 거래소 조회로 확인: {e}")
+            result = None
+        if not result:
+            # 응답 없이 실패한 주문도 거래소에는 접수됐을 수 있음
+            try:
+                result = self._lookup_order(identifier)
+            except OrderOutcomeUnknown:
+                self._unresolved[identifier] = _UnresolvedOrder(order_type, quantity, price, reserved)
+                raise
+            if result:
+                logger.warning(f"[{self.symbol}] 응답 없던 주문이 거래소에 접수됨: {identifier}")
+        return self._real_order(order_type, quantity, price, result)
+    
+    def _lookup_order(self, identifier: str) -> Optional[Dict]:
+        """식별자로 거래소 주문 조회 (미접수/체결 없이 취소: None, 조회 실패: OrderOutcomeUnknown)"""
+        try:
+            found = self.upbit_client.get_order(identifier=identifier)
+        except Exception as e:
+            raise OrderOutcomeUnknown(f"주문 {identifier} 조회 실패: {e}") from e
+        if not found or (found.get("state") == "cancel" and not float(found.get("executed_volume") or 0)):
+            return None
+        return found
+    
+    def _real_order(self, order_type: str, quantity: float, price: float, result: Optional[Dict]) -> Dict:
+        """거래소 응답으로 주문 기록 생성 (응답이 없으면 주문 실패)"""
         if result:
             return {
                 "id": result.get('uuid', ''),
-                "symbol": self.symbol,
+                "symbol": self.key,
                 "type": order_type,
                 "quantity": quantity,
                 "price": price,
                 "status": "filled",
-                "timestamp": time.time(),
+                "timestamp": clock.time(),
                 "exchange_result": result
             }
         else:
             raise Exception("주문 실행 실패")
     
+    def reconcile_orders(self) -> List[Dict]:
+        """결과 미확인 주문을 식별자로 다시 조회해 확정 (체결로 확인된 주문 목록 반환)
+
+        체결된 주문은 주문 이력/원장/리스크에 반영하고 포트폴리오 반영은 호출자가 한다.
+        접수되지 않은 매수는 예약을 풀고, 여전히 조회할 수 없으면 다음 호출에서 다시 확인한다.
+        """
+        filled = []
+        for identifier, pending in list(self._unresolved.items()):
+            try:
+                result = self._lookup_order(identifier)
+            except OrderOutcomeUnknown as e:
+                logger.warning(f"[{self.symbol}] 결과 미확인 주문 확인 실패: {e}")
+                continue
+            del self._unresolved[identifier]
+            if not result:
+                logger.info(f"[{self.symbol}] 결과 미확인 주문이 접수되지 않음 확인: {identifier}")
+                if pending.order_type == "buy":
+                    self.risk.release(self.key, pending.reserved)
+                continue
+            order = self._real_order(pending.order_type, pending.quantity, pending.price, result)
+            order["trace_id"] = tracer.current_trace_id()
+            self.order_history.append(OrderRecord.from_order(order))
+            self._record_fill(order)
+            if pending.order_type == "buy":
+                self.risk.record_buy(self.key, pending.reserved, order["quantity"],
+                                     order["quantity"] * order["price"] + order.get("fee", 0.0))
+            else:
+                self.risk.record_sell(self.key, order["quantity"],
+                                      order["quantity"] * order["price"] - order.get("fee", 0.0))
+            logger.warning(f"[{self.symbol}] 결과 미확인 주문 체결 확인: {identifier}")
+            filled.append(order)
+        return filled
+    
     def cancel_all_orders(self):
         """모든 미체결 주문 취소"""
         if self.dry_run:
@@ -164,10 +320,23 @@ class Executor:
             # 실제 주문 취소 로직
             pass
     
-    def get_order_history(self) -> list:
-        """주문 히스토리 반환"""
-        return self.order_history.copy()
+    def _record_fill(self, order: Dict):
+        """체결을 거래 원장에 기록 (원장 스레드가 모아서 기록하므로 블로킹하지 않음)"""
+        ledger = get_ledger()
+        if ledger is not None:
+            ledger.record(order, "dry" if self.dry_run else "live")
+    
+    def _spill_order(self, record: OrderRecord):
+        """메모리에서 밀려난 주문 이력을 디스크에 기록"""
+        spill_dir = config.history_spill_dir
+        if spill_dir:
+            path = os.path.join(spill_dir, f"{self.key.replace('/', '_')}_orders.jsonl")
+            get_trade_log_writer().write(path, record.to_dict())
+    
+    def get_order_history(self, count: int = None) -> RingView:
+        """최근 주문 이력 뷰 반환 (복사 없음, 오래된 순)"""
+        return self.order_history.view(count)
     
-    def get_last_order(self) -> Optional[Dict]:
+    def get_last_order(self) -> Optional[OrderRecord]:
         """마지막 주문 정보 반환"""
-        return self.order_history[-1] if self.order_history else None 
\ No newline at end of file
+        return self.order_history.last() 
\ No newline at end of file
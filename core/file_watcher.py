@@ -0,0 +1,64 @@
+import os
+import threading
+from typing import Callable, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FileWatcher:
+    """파일 변경 감시 (mtime/크기 폴링)
+
+    외부 의존성 없이 interval 초마다 os.stat 만 확인한다. 편집기가 파일을 쓰는 도중에
+    반응하지 않도록, 변경이 감지된 뒤 한 번 더 같은 상태가 확인되면 콜백을 호출한다.
+    """
+
+    def __init__(self, path: str, callback: Callable[[], None], interval: float = 2.0):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        """감시 스레드 시작"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FileWatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"설정 파일 감시 시작: {self.path} ({self.interval}초 간격)")
+
+    def stop(self):
+        """감시 스레드 종료"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _run(self):
+        current = self._signature()
+        pending = None
+        while not self._stop.wait(self.interval):
+            signature = self._signature()
+            if signature is None or signature == current:
+                pending = None
+                continue
+            if signature != pending:
+                # 쓰기가 끝났는지 다음 확인에서 판단
+                pending = signature
+                continue
+            current, pending = signature, None
+            logger.info(f"설정 파일 변경 감지: {self.path}")
+            try:
+                self.callback()
+            except Exception as e:
+                logger.error(f"설정 파일 변경 처리 실패: {e}")
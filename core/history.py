@@ -0,0 +1,155 @@
+import threading
+from typing import Callable, Dict, Iterator, Optional
+
+
+class _Record:
+    """__slots__ 기반 레코드 공통 기능 (기존 dict 접근 방식 호환)"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class OrderRecord(_Record):
+    """주문 이력 레코드"""
+
+    __slots__ = ("id", "symbol", "type", "quantity", "price", "fee", "status", "timestamp", "trace_id")
+
+    def __init__(self, id: str, symbol: str, type: str, quantity: float, price: float,
+                 fee: float, status: str, timestamp: float, trace_id: Optional[str] = None):
+        self.id = id
+        self.symbol = symbol
+        self.type = type
+        self.quantity = quantity
+        self.price = price
+        self.fee = fee
+        self.status = status
+        self.timestamp = timestamp
+        self.trace_id = trace_id
+
+    @classmethod
+    def from_order(cls, order: Dict) -> "OrderRecord":
+        return cls(order.get("id", ""), order.get("symbol", ""), order.get("type", ""),
+                   order.get("quantity", 0.0), order.get("price", 0.0), order.get("fee", 0.0),
+                   order.get("status", ""), order.get("timestamp", 0.0), order.get("trace_id"))
+
+
+class NotificationRecord(_Record):
+    """알림 이력 레코드"""
+
+    __slots__ = ("timestamp", "type", "symbol", "message")
+
+    def __init__(self, timestamp: str, type: str, symbol: str, message: str):
+        self.timestamp = timestamp
+        self.type = type
+        self.symbol = symbol
+        self.message = message
+
+
+class RingView:
+    """링 버퍼 최근 구간에 대한 복사 없는 읽기 뷰 (오래된 것 -> 최신 순)
+
+    뷰는 생성 시점의 위치를 기준으로 원본 버퍼를 직접 참조하므로,
+    순회 도중 새 항목이 추가되면 가장 오래된 항목 자리에 최신 항목이 보일 수 있다.
+    """
+
+    __slots__ = ("_items", "_capacity", "_start", "_length")
+
+    def __init__(self, items: list, capacity: int, start: int, length: int):
+        self._items = items
+        self._capacity = capacity
+        self._start = start
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self._capacity]
+
+    def __iter__(self) -> Iterator:
+        items, capacity, start = self._items, self._capacity, self._start
+        for offset in range(self._length):
+            yield items[(start + offset) % capacity]
+
+    def __reversed__(self) -> Iterator:
+        items, capacity, start = self._items, self._capacity, self._start
+        for offset in range(self._length - 1, -1, -1):
+            yield items[(start + offset) % capacity]
+
+
+class RingBuffer:
+    """고정 용량 링 버퍼
+
+    용량을 넘으면 가장 오래된 항목을 spill 콜백(예: 디스크 기록)에 넘기고 덮어쓴다.
+    메모리 사용량은 실행 시간과 무관하게 capacity 로 고정된다.
+    """
+
+    def __init__(self, capacity: int, spill: Optional[Callable[[object], None]] = None):
+        if capacity <= 0:
+            raise ValueError("capacity 는 1 이상이어야 합니다")
+        self.capacity = capacity
+        self.spill = spill
+        self._items = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def append(self, item):
+        """항목 추가 (가득 찬 경우 가장 오래된 항목 방출)"""
+        with self._lock:
+            evicted = self._items[self._next] if self._size == self.capacity else None
+            self._items[self._next] = item
+            self._next = (self._next + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+            self.total += 1
+        if evicted is not None and self.spill is not None:
+            self.spill(evicted)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator:
+        return iter(self.view())
+
+    def view(self, count: Optional[int] = None) -> RingView:
+        """최근 count 개(기본: 전체)에 대한 복사 없는 뷰"""
+        with self._lock:
+            length = self._size if count is None else max(0, min(count, self._size))
+            start = (self._next - length) % self.capacity
+            return RingView(self._items, self.capacity, start, length)
+
+    def last(self):
+        """가장 최근 항목"""
+        with self._lock:
+            if not self._size:
+                return None
+            return self._items[(self._next - 1) % self.capacity]
+
+    def clear(self):
+        with self._lock:
+            self._items = [None] * self.capacity
+            self._next = 0
+            self._size = 0
@@ -0,0 +1,395 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from utils.logger import get_logger
+from core.config import config
+from core.metrics import QUEUE_DEPTH
+
+logger = get_logger(__name__)
+
+# 한 트랜잭션에 넣을 최대 체결 수
+BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    seq INTEGER PRIMARY KEY,
+    order_id TEXT,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL,
+    fee REAL NOT NULL,
+    ts REAL NOT NULL,
+    realized_pnl REAL NOT NULL,
+    position REAL NOT NULL,
+    avg_cost REAL NOT NULL,
+    trace_id TEXT
+);
+CREATE INDEX IF NOT EXISTS fills_symbol_ts ON fills (mode, symbol, ts);
+CREATE INDEX IF NOT EXISTS fills_ts ON fills (mode, ts);
+CREATE TABLE IF NOT EXISTS daily (
+    mode TEXT NOT NULL,
+    day TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    fills INTEGER NOT NULL,
+    sells INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    realized_pnl REAL NOT NULL,
+    turnover REAL NOT NULL,
+    fees REAL NOT NULL,
+    cum_high REAL NOT NULL,
+    cum_low REAL NOT NULL,
+    max_drawdown REAL NOT NULL,
+    PRIMARY KEY (mode, day, symbol)
+) WITHOUT ROWID;
+"""
+
+_INSERT = ("INSERT INTO fills (order_id, symbol, side, mode, quantity, price, fee, ts, realized_pnl,"
+           " position, avg_cost, trace_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+_DAILY_COLUMNS = ("fills", "sells", "wins", "realized_pnl", "turnover", "fees", "cum_high", "cum_low",
+                  "max_drawdown")
+_UPSERT_DAILY = (f"INSERT OR REPLACE INTO daily (mode, day, symbol, {', '.join(_DAILY_COLUMNS)})"
+                 f" VALUES ({', '.join('?' * (len(_DAILY_COLUMNS) + 3))})")
+
+# 보고서 기간 구분 -> 일별 집계(day 열, 로컬 YYYY-MM-DD) 기준 SQL 식
+PERIODS = {
+    "day": "day",
+    "week": "strftime('%Y-W%W', day)",
+    "month": "substr(day, 1, 7)",
+    "all": "'all'",
+}
+
+
+class _DayStats:
+    """자산 하루치 집계 (기록 스레드 전용)
+
+    cum_high/cum_low 는 그날 시작 대비 누적 실현 손익의 최고/최저(0 포함), max_drawdown 은
+    그날 안에서의 최대 낙폭이다. 이 세 값만 있으면 여러 날을 이어 붙인 기간의 최대 낙폭을
+    체결 행을 다시 읽지 않고 정확히 계산할 수 있다.
+    """
+
+    __slots__ = ("day",) + _DAILY_COLUMNS
+
+    def __init__(self, day: str, values: Tuple = None):
+        self.day = day
+        self.fills, self.sells, self.wins, self.realized_pnl, self.turnover, self.fees, \
+            self.cum_high, self.cum_low, self.max_drawdown = values or (0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def add(self, side: str, quantity: float, price: float, fee: float, realized: float):
+        self.fills += 1
+        self.turnover += quantity * price
+        self.fees += fee
+        if side == "sell":
+            self.sells += 1
+            self.wins += realized > 0
+            self.realized_pnl += realized
+            self.cum_high = max(self.cum_high, self.realized_pnl)
+            self.cum_low = min(self.cum_low, self.realized_pnl)
+            self.max_drawdown = max(self.max_drawdown, self.cum_high - self.realized_pnl)
+
+    def values(self) -> Tuple:
+        return tuple(getattr(self, column) for column in _DAILY_COLUMNS)
+
+
+class TradeLedger:
+    """SQLite(WAL) 체결 원장
+
+    체결은 큐에 넣기만 하고(거래 스레드를 막지 않음) 전용 스레드가 모아서 한 트랜잭션으로
+    기록한다. 기록 시 자산별 이동평균 원가로 실현 손익과 체결 후 보유 수량/평단을 함께
+    저장하고, 같은 트랜잭션에서 자산별 일별 집계(daily)를 갱신한다. 보고서는 체결 행이
+    아니라 일별 집계만 읽으므로 몇 년치 체결이 쌓여도 자산 수 x 일수 행만 집계한다.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # (mode, symbol) -> [보유 수량, 보유 원가] (기록 스레드 전용)
+        self._positions: Dict[Tuple[str, str], List[float]] = {}
+        # (mode, symbol) -> 마지막으로 기록한 날의 집계 (기록 스레드 전용)
+        self._days: Dict[Tuple[str, str], _DayStats] = {}
+        self.written = 0
+
+    def start(self):
+        """기록 스레드 시작 (DB 연결은 기록 스레드에서 열고 사용)"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="TradeLedger", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """남은 체결을 기록하고 DB 를 닫음"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def record(self, order: Dict, mode: str):
+        """체결 기록 요청 (블로킹하지 않음)"""
+        self._queue.put((order, mode))
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as e:
+            logger.error(f"거래 원장 열기 실패 ({self.path}): {e}")
+            self._running = False
+            return
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                batch = []
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                stop = item is None
+                if batch:
+                    self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple[Dict, str]]):
+        try:
+            rows = []
+            for order, mode in batch:
+                try:
+                    rows.append(self._row(conn, order, mode))
+                except sqlite3.Error:
+                    raise
+                except Exception as e:
+                    # 형식이 잘못된 체결 하나 때문에 기록 스레드가 멈추지 않도록 그 건만 건너뜀
+                    order_id = order.get("id") if isinstance(order, dict) else None
+                    logger.error(f"거래 원장 기록 제외 (주문 {order_id}): {e!r}")
+            touched = {}
+            for row in rows:
+                _, symbol, side, mode, quantity, price, fee, ts, realized = row[:9]
+                stats = self._day_stats(conn, mode, symbol, time.strftime("%Y-%m-%d", time.localtime(ts)))
+                stats.add(side, quantity, price, fee, realized)
+                touched[(mode, stats.day, symbol)] = stats
+            with conn:
+                conn.executemany(_INSERT, rows)
+                conn.executemany(_UPSERT_DAILY, [key + stats.values() for key, stats in touched.items()])
+            self.written += len(rows)
+        except Exception as e:
+            # 원가/일별 캐시가 DB 와 어긋나지 않도록 다음 기록 때 DB 에서 다시 읽음
+            self._positions.clear()
+            self._days.clear()
+            logger.error(f"거래 원장 기록 실패 ({len(batch)}건): {e!r}")
+
+    def _row(self, conn: sqlite3.Connection, order: Dict, mode: str) -> Tuple:
+        symbol = order.get("symbol", "")
+        side = order.get("type", "")
+        quantity = float(order.get("quantity", 0.0))
+        price = float(order.get("price", 0.0))
+        fee = float(order.get("fee", 0.0) or 0.0)
+        ts = float(order.get("timestamp") or time.time())
+        # 값 확인이 끝난 뒤에만 보유 원가 캐시를 갱신
+        position = self._position(conn, mode, symbol)
+
+        realized = 0.0
+        if side == "buy":
+            # 매수 수수료는 원가에 포함 (Portfolio 와 같은 기준)
+            position[0] += quantity
+            position[1] += quantity * price + fee
+        elif position[0] > 0:
+            sold = min(quantity, position[0])
+            sold_cost = position[1] * sold / position[0]
+            # 원장 기록 전부터 보유하던 수량까지 판 경우 추적 중인 수량만 손익 계산
+            fee_share = fee * sold / quantity if quantity > 0 else fee
+            realized = sold * price - fee_share - sold_cost
+            position[0] -= sold
+            position[1] -= sold_cost
+        avg_cost = position[1] / position[0] if position[0] > 0 else 0.0
+        return (order.get("id"), symbol, side, mode, quantity, price, fee,
+                ts, realized, position[0], avg_cost,
+                order.get("trace_id"))
+
+    def _position(self, conn: sqlite3.Connection, mode: str, symbol: str) -> List[float]:
+        key = (mode, symbol)
+        position = self._positions.get(key)
+        if position is None:
+            row = conn.execute("SELECT position, avg_cost FROM fills WHERE mode = ? AND symbol = ?"
+                               " ORDER BY ts DESC, seq DESC LIMIT 1", key).fetchone()
+            position = self._positions[key] = [row[0], row[0] * row[1]] if row else [0.0, 0.0]
+        return position
+
+
+    def _day_stats(self, conn: sqlite3.Connection, mode: str, symbol: str, day: str) -> _DayStats:
+        stats = self._days.get((mode, symbol))
+        if stats is None or stats.day != day:
+            row = conn.execute(f"SELECT {', '.join(_DAILY_COLUMNS)} FROM daily"
+                               f" WHERE mode = ? AND day = ? AND symbol = ?", (mode, day, symbol)).fetchone()
+            stats = self._days[(mode, symbol)] = _DayStats(day, row)
+        return stats
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    """원장 DB 연결 (WAL 모드, 없으면 스키마 생성)"""
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# ----- 보고서 -----
+
+class ReportRow(NamedTuple):
+    """자산(또는 전체)·기간별 성과"""
+    symbol: str
+    period: str
+    fills: int
+    sells: int
+    wins: int
+    realized_pnl: float
+    turnover: float
+    fees: float
+    max_drawdown: float  # 기간 내 누적 실현 손익의 최고점 대비 최대 하락폭
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        return self.wins / self.sells if self.sells else None
+
+
+class Position(NamedTuple):
+    """기간 말 보유 현황"""
+    symbol: str
+    quantity: float
+    avg_cost: float
+
+    def unrealized_pnl(self, price: Optional[float]) -> Optional[float]:
+        return None if price is None else self.quantity * (price - self.avg_cost)
+
+
+def _filters(mode: str, since: Optional[str], until: Optional[str],
+             symbol: Optional[str]) -> Tuple[str, List]:
+    clauses, params = ["mode = ?"], [mode]
+    if symbol:
+        clauses.append("symbol = ?")
+        params.append(symbol)
+    if since:
+        clauses.append("day >= ?")
+        params.append(since)
+    if until:
+        clauses.append("day < ?")
+        params.append(until)
+    return " AND ".join(clauses), params
+
+
+def _drawdowns(segments) -> Dict[Tuple[str, str], float]:
+    """(키, 기간, 실현 손익, 최고, 최저, 낙폭) 일별 구간(날짜순)을 이어 붙여 기간별 최대 낙폭 계산
+
+    낙폭은 한 구간 안에서 생기거나, 앞 구간들의 최고점에서 이번 구간의 최저점까지 생긴다.
+    """
+    result: Dict[Tuple[str, str], float] = {}
+    current = None
+    cum = peak = drawdown = 0.0
+    for key, period, realized, high, low, day_drawdown in segments:
+        if (key, period) != current:
+            if current is not None:
+                result[current] = drawdown
+            current = (key, period)
+            cum = peak = drawdown = 0.0
+        drawdown = max(drawdown, day_drawdown, peak - (cum + low))
+        peak = max(peak, cum + high)
+        cum += realized
+    if current is not None:
+        result[current] = drawdown
+    return result
+
+
+def performance(conn: sqlite3.Connection, mode: str, period: str = "day", since: str = None,
+                until: str = None, symbol: str = None, total: bool = False) -> List[ReportRow]:
+    """자산·기간별 실현 손익, 승률, 거래대금, 최대 낙폭 (since/until: 로컬 날짜 YYYY-MM-DD)
+
+    total=True 면 전체 자산 합산이며, 이때 최대 낙폭은 일 단위 누적 손익 기준이다.
+    """
+    bucket = PERIODS[period]
+    key = "'TOTAL'" if total else "symbol"
+    where, params = _filters(mode, since, until, symbol)
+    summary = conn.execute(f"""
+        SELECT {key} AS k, {bucket} AS period, SUM(fills), SUM(sells), SUM(wins),
+               SUM(realized_pnl), SUM(turnover), SUM(fees)
+        FROM daily WHERE {where}
+        GROUP BY k, period ORDER BY k, period""", params).fetchall()
+    if total:
+        # 자산 간 체결 순서는 일별 집계로 알 수 없으므로 하루 합계를 한 구간으로 취급
+        segments = ((k, p, realized, max(realized, 0.0), min(realized, 0.0), 0.0)
+                    for k, p, realized in conn.execute(f"""
+                        SELECT 'TOTAL', {bucket}, SUM(realized_pnl) FROM daily WHERE {where}
+                        GROUP BY day ORDER BY day""", params))
+    else:
+        segments = conn.execute(f"""
+            SELECT symbol, {bucket}, realized_pnl, cum_high, cum_low, max_drawdown
+            FROM daily WHERE {where} ORDER BY symbol, day""", params)
+    drawdowns = _drawdowns(segments)
+    return [ReportRow(k, p, fills, sells, wins, realized, turnover, fees, drawdowns.get((k, p), 0.0))
+            for k, p, fills, sells, wins, realized, turnover, fees in summary]
+
+
+def positions(conn: sqlite3.Connection, mode: str, until: float = None, symbol: str = None) -> List[Position]:
+    """until(epoch 초) 시점의 자산별 보유 수량/평단 (자산마다 마지막 체결 한 건을 인덱스로 조회)"""
+    if symbol:
+        symbols = [symbol]
+    else:
+        symbols = [row[0] for row in conn.execute(
+            "SELECT DISTINCT symbol FROM daily WHERE mode = ? ORDER BY symbol", (mode,))]
+    result = []
+    for name in symbols:
+        row = conn.execute("SELECT position, avg_cost FROM fills WHERE mode = ? AND symbol = ? AND ts < ?"
+                           " ORDER BY ts DESC, seq DESC LIMIT 1",
+                           (mode, name, until if until is not None else float("inf"))).fetchone()
+        if row and row[0] > 0:
+            result.append(Position(name, *row))
+    return result
+
+
+_ledger: Optional[TradeLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> Optional[TradeLedger]:
+    """프로세스 공용 거래 원장 (LEDGER_PATH 가 비어 있으면 None, 최초 호출 시 시작)"""
+    global _ledger
+    if _ledger is None and config.ledger_path:
+        with _ledger_lock:
+            if _ledger is None:
+                ledger = TradeLedger(config.ledger_path)
+                ledger.start()
+                QUEUE_DEPTH.labels("ledger").set_function(ledger.queue_depth)
+                _ledger = ledger
+    return _ledger
+
+
+def shutdown_ledger(timeout: float = 5.0):
+    """공용 거래 원장 종료"""
+    global _ledger
+    with _ledger_lock:
+        ledger, _ledger = _ledger, None
+    if ledger is not None:
+        ledger.stop(timeout)
@@ -0,0 +1,369 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 지연 시간 히스토그램 기본 구간 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{v}"' for n, v in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _ShardedChild:
+    """스레드별 셀에 기록하는 메트릭 자식 (기록 경로에 락 없음)
+
+    각 스레드는 자기 셀만 갱신하고, 수집 시에만 모든 셀을 합산한다.
+    셀 생성(스레드당 1회)에만 락을 사용한다.
+    """
+
+    __slots__ = ("_cells", "_lock", "_size")
+
+    def __init__(self, size: int):
+        self._cells: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+        self._size = size
+
+    def _cell(self) -> List[float]:
+        ident = threading.get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            with self._lock:
+                cell = self._cells.setdefault(ident, [0.0] * self._size)
+        return cell
+
+    def _collect(self) -> List[float]:
+        total = [0.0] * self._size
+        for cell in list(self._cells.values()):
+            for i, v in enumerate(cell):
+                total[i] += v
+        return total
+
+
+class _CounterChild(_ShardedChild):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0):
+        self._cell()[0] += amount
+
+    def value(self) -> float:
+        return self._collect()[0]
+
+
+class _HistogramChild(_ShardedChild):
+    __slots__ = ("_bounds",)
+
+    def __init__(self, bounds: Sequence[float]):
+        # 셀 구성: [구간별 개수..., +Inf 개수, 합계]
+        super().__init__(len(bounds) + 2)
+        self._bounds = bounds
+
+    def observe(self, value: float):
+        cell = self._cell()
+        cell[bisect.bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> "_Timer":
+        """with 블록 실행 시간 기록"""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(누적 구간 개수, 전체 개수, 합계)"""
+        raw = self._collect()
+        cumulative, running = [], 0.0
+        for count in raw[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, raw[-1]
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_func")
+
+    def __init__(self):
+        self._value = 0.0
+        self._func: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, amount: float = 1.0):
+        self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self._value -= amount
+
+    def set_function(self, func: Callable[[], float]):
+        """수집 시점에 값을 계산하는 함수 지정"""
+        self._func = func
+
+    def value(self) -> float:
+        if self._func is not None:
+            try:
+                return float(self._func())
+            except Exception:
+                return float("nan")
+        return self._value
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Metric:
+    """라벨별 자식을 가지는 메트릭"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self._default = None if self.labelnames else self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """라벨 값에 해당하는 자식 반환 (호출부에서 캐시해 두면 조회 비용도 없음)"""
+        if kwargs:
+            values = tuple(str(kwargs[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def remove(self, *values):
+        """라벨 조합 제거"""
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def _items(self):
+        if self._default is not None:
+            return [((), self._default)]
+        return list(self._children.items())
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._items():
+            lines.extend(self._expose_child(values, child))
+        return lines
+
+    def _expose_child(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value())}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, func: Callable[[], float]):
+        self._default.set_function(func)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def _expose_child(self, values, child) -> List[str]:
+        cumulative, count, total = child.snapshot()
+        lines = []
+        for bound, running in zip(self.buckets + (float("inf"),), cumulative):
+            labels = _format_labels(self.labelnames, values, (("le", _format_value(bound)),))
+            lines.append(f"{self.name}_bucket{labels} {_format_value(running)}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+        return lines
+
+
+class Registry:
+    """메트릭 등록부"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def expose(self) -> str:
+        """Prometheus 텍스트 형식 출력"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# 파이프라인 단계별 메트릭
+PRICE_FETCH_SECONDS = registry.histogram(
+    "ats_price_fetch_seconds", "Ticker fetch latency", ["symbol"])
+TRIGGER_CHECK_SECONDS = registry.histogram(
+    "ats_trigger_check_seconds", "Trigger.check execution time", ["symbol"],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05))
+ORDER_ROUNDTRIP_SECONDS = registry.histogram(
+    "ats_order_roundtrip_seconds", "Order placement round-trip time", ["symbol", "side", "mode"])
+LOOP_LAG_SECONDS = registry.histogram(
+    "ats_loop_lag_seconds", "Engine cycle interval beyond POLLING_INTERVAL", ["symbol"])
+ENGINE_CYCLES = registry.counter(
+    "ats_engine_cycles_total", "Engine run_once cycles", ["symbol"])
+ENGINE_ERRORS = registry.counter(
+    "ats_engine_errors_total", "Engine run_once failures", ["symbol"])
+HTTP_RESPONSES = registry.counter(
+    "ats_http_responses_total", "Exchange HTTP responses by endpoint and status", ["endpoint", "status"])
+QUEUE_DEPTH = registry.gauge(
+    "ats_queue_depth", "Pending items in background queues", ["queue"])
+POLL_INTERVAL_SECONDS = registry.gauge(
+    "ats_poll_interval_seconds", "Scheduled polling interval per asset", ["symbol"])
+POOL_WORKERS = registry.gauge(
+    "ats_pool_workers", "Engine thread pool workers by state", ["state"])
+
+
+def record_http(endpoint: str, status) -> None:
+    """HTTP 응답 상태 기록 (예외는 'error')"""
+    HTTP_RESPONSES.labels(endpoint, status).inc()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    routes: Dict[str, Callable[[BaseHTTPRequestHandler], None]] = {}
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = registry.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path in self.routes:
+            self.routes[path](self)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics %s - %s", self.address_string(), format % args)
+
+
+def add_route(path: str, handler: Callable[[BaseHTTPRequestHandler], None]) -> None:
+    """메트릭 서버에 추가 GET 경로 등록"""
+    _MetricsHandler.routes[path] = handler
+
+
+class MetricsServer:
+    """로컬 /metrics HTTP 엔드포인트"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108):
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """서버 스레드 시작"""
+        if self._server is not None:
+            return
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        logger.info(f"메트릭 서버 시작: http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        """서버 종료"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        logger.info("메트릭 서버 종료")
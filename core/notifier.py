@@ -1,17 +1,25 @@
-import json
 import time
 from typing import Dict, Optional
 from utils.logger import get_logger
+from core.dispatcher import get_dispatcher
+from core.history import RingBuffer, NotificationRecord
+from core.config import config as app_config
 
 logger = get_logger(__name__)
 
 class Notifier:
-    """자산별 거래 알림 및 로그 관리"""
+    """자산별 거래 알림 및 로그 관리
+
+    실제 출력(콘솔, 파일, 웹훅)은 공용 NotificationDispatcher 가
+    백그라운드에서 처리하므로 알림 호출은 거래 스레드를 막지 않는다.
+    """
     
     def __init__(self, symbol: str, config: dict = None):
         self.symbol = symbol
         self.config = config or self._default_config()
-        self.notification_history = []
+        # 알림 원문은 거래 로그 파일에 남으므로 메모리에는 최근 것만 보관
+        self.notification_history = RingBuffer(app_config.notification_history_size)
+        self.dispatcher = get_dispatcher()
     
     def _default_config(self) -> dict:
         """기본 설정"""
@@ -90,49 +98,13 @@ class Notifier:
             "message": message
         }
         
-        self.notification_history.append(notification)
-        
-        # 콘솔 출력
-        if self.config.get("enable_console", True):
-            print(f"[{timestamp}] {notification_type}: {message}")
+        self.notification_history.append(
+            NotificationRecord(timestamp, notification_type, self.symbol, message)
+        )
         
-        # 파일 로그
-        if self.config.get("enable_file", True):
-            self._write_to_file(notification)
-        
-        # 웹훅 전송
-        if self.config.get("enable_webhook", False):
-            self._send_webhook(notification)
-    
-    def _write_to_file(self, notification: Dict):
-        """파일에 로그 작성"""
-        try:
-            import os
-            log_file = self.config.get("log_file")
-            
-            # 로그 디렉토리 생성
-            os.makedirs(os.path.dirname(log_file), exist_ok=True)
-            
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(notification, ensure_ascii=False) + "\n")
-                
-        except Exception as e:
-            logger.error(f"[{self.symbol}] 파일 로그 작성 실패: {e}")
-    
-    def _send_webhook(self, notification: Dict):
-        """웹훅으로 알림 전송"""
-        try:
-            import requests
-            webhook_url = self.config.get("webhook_url")
-            
-            if webhook_url:
-                response = requests.post(webhook_url, json=notification, timeout=5)
-                response.raise_for_status()
-                logger.info(f"[{self.symbol}] 웹훅 전송 완료")
-                
-        except Exception as e:
-            logger.error(f"[{self.symbol}] 웹훅 전송 실패: {e}")
+        # 콘솔/파일/웹훅 출력은 전송 스레드에 위임
+        self.dispatcher.submit(notification, self.config)
     
     def get_recent_notifications(self, count: int = 10) -> list:
         """최근 알림 내역 반환"""
-        return self.notification_history[-count:] if self.notification_history else [] 
\ No newline at end of file
+        return [record.to_dict() for record in self.notification_history.view(count)] 
\ No newline at end of file
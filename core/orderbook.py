@@ -0,0 +1,130 @@
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# 업비트 호가 조회 최대 단계
+MAX_DEPTH = 30
+
+
+class OrderBook:
+    """마켓별 호가 (사전 할당된 NumPy 배열 기반)
+
+    호가 단계는 매 갱신마다 같은 배열에 덮어써서 메모리 사용량이 고정된다.
+    매도 호가는 가격 오름차순, 매수 호가는 가격 내림차순으로 저장한다.
+    """
+
+    __slots__ = ("market", "depth", "levels", "timestamp",
+                 "ask_prices", "ask_sizes", "bid_prices", "bid_sizes")
+
+    def __init__(self, market: str, depth: int = MAX_DEPTH):
+        self.market = market
+        self.depth = depth
+        self.levels = 0
+        self.timestamp = 0.0
+        self.ask_prices = np.zeros(depth, dtype=np.float64)
+        self.ask_sizes = np.zeros(depth, dtype=np.float64)
+        self.bid_prices = np.zeros(depth, dtype=np.float64)
+        self.bid_sizes = np.zeros(depth, dtype=np.float64)
+
+    def update(self, units: List[Dict], timestamp: float = None):
+        """업비트 orderbook_units 로 호가 갱신"""
+        n = min(len(units), self.depth)
+        ask_prices, ask_sizes = self.ask_prices, self.ask_sizes
+        bid_prices, bid_sizes = self.bid_prices, self.bid_sizes
+        for i in range(n):
+            unit = units[i]
+            ask_prices[i] = unit["ask_price"]
+            ask_sizes[i] = unit["ask_size"]
+            bid_prices[i] = unit["bid_price"]
+            bid_sizes[i] = unit["bid_size"]
+        self.levels = n
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def best_ask(self) -> Optional[float]:
+        """최우선 매도 호가"""
+        return float(self.ask_prices[0]) if self.levels else None
+
+    def best_bid(self) -> Optional[float]:
+        """최우선 매수 호가"""
+        return float(self.bid_prices[0]) if self.levels else None
+
+    def mid(self) -> Optional[float]:
+        """중간 가격"""
+        if not self.levels:
+            return None
+        return float(self.ask_prices[0] + self.bid_prices[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        """매도-매수 호가 차이"""
+        if not self.levels:
+            return None
+        return float(self.ask_prices[0] - self.bid_prices[0])
+
+    def spread_bps(self) -> Optional[float]:
+        """중간 가격 대비 스프레드 (bp)"""
+        mid = self.mid()
+        if not mid:
+            return None
+        return self.spread() / mid * 10000
+
+    def imbalance(self, levels: int = None) -> Optional[float]:
+        """호가 잔량 불균형 (-1: 매도 우위 ~ 1: 매수 우위)"""
+        n = min(levels or self.levels, self.levels)
+        if not n:
+            return None
+        bid = float(self.bid_sizes[:n].sum())
+        ask = float(self.ask_sizes[:n].sum())
+        total = bid + ask
+        return (bid - ask) / total if total > 0 else 0.0
+
+    def _side(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        """주문 방향에 맞는 (가격, 잔량) 배열 (매수는 매도 호가를 소진)"""
+        n = self.levels
+        if side == "buy":
+            return self.ask_prices[:n], self.ask_sizes[:n]
+        return self.bid_prices[:n], self.bid_sizes[:n]
+
+    def vwap_for_notional(self, side: str, notional: float) -> Optional[float]:
+        """주어진 금액을 시장가로 체결할 때의 평균 체결가 (호가 부족시 None)"""
+        prices, sizes = self._side(side)
+        if not len(prices) or notional <= 0:
+            return None
+        cum_notional = np.cumsum(prices * sizes)
+        idx = int(np.searchsorted(cum_notional, notional))
+        if idx >= len(prices):
+            return None
+        prev_notional = cum_notional[idx - 1] if idx else 0.0
+        quantity = sizes[:idx].sum() + (notional - prev_notional) / prices[idx]
+        return float(notional / quantity)
+
+    def vwap_for_quantity(self, side: str, quantity: float) -> Optional[float]:
+        """주어진 수량을 시장가로 체결할 때의 평균 체결가 (호가 부족시 None)"""
+        filled, notional = self.walk(side, quantity)
+        if filled < quantity or filled <= 0:
+            return None
+        return notional / filled
+
+    def walk(self, side: str, quantity: float) -> Tuple[float, float]:
+        """호가를 따라 체결 (체결 수량, 체결 금액) 반환 - FillSimulator 호환"""
+        prices, sizes = self._side(side)
+        if not len(prices) or quantity <= 0:
+            return 0.0, 0.0
+        cum_sizes = np.cumsum(sizes)
+        idx = int(np.searchsorted(cum_sizes, quantity))
+        if idx >= len(prices):
+            return float(cum_sizes[-1]), float(np.dot(prices, sizes))
+        prev_size = cum_sizes[idx - 1] if idx else 0.0
+        notional = float(np.dot(prices[:idx], sizes[:idx])) + (quantity - prev_size) * prices[idx]
+        return quantity, float(notional)
+
+    def snapshot(self) -> "OrderBook":
+        """현재 호가의 독립 사본 (유효 단계만 복사)"""
+        copy = OrderBook(self.market, max(self.levels, 1))
+        n = self.levels
+        copy.levels = n
+        copy.timestamp = self.timestamp
+        copy.ask_prices[:n] = self.ask_prices[:n]
+        copy.ask_sizes[:n] = self.ask_sizes[:n]
+        copy.bid_prices[:n] = self.bid_prices[:n]
+        copy.bid_sizes[:n] = self.bid_sizes[:n]
+        return copy
@@ -14,16 +14,16 @@ class Portfolio:
         self.total_sold = 0.0  # 총 매도 금액
         self.trades_count = 0  # 거래 횟수
     
-    def add_buy(self, quantity: float, price: float):
-        """매수 거래 추가"""
-        cost = quantity * price
+    def add_buy(self, quantity: float, price: float, fee: float = 0.0):
+        """매수 거래 추가 (수수료는 매수 원가에 포함)"""
+        cost = quantity * price + fee
         
         # 평균 단가 계산
         if self.holdings > 0:
             self.total_cost += cost
             self.avg_price = self.total_cost / (self.holdings + quantity)
         else:
-            self.avg_price = price
+            self.avg_price = cost / quantity if quantity > 0 else price
             self.total_cost = cost
         
         self.holdings += quantity
@@ -31,13 +31,13 @@ class Portfolio:
         
         logger.info(f"[{self.symbol}] 매수: {quantity:.6f} @ ${price:.4f}, 평균단가: ${self.avg_price:.4f}")
     
-    def add_sell(self, quantity: float, price: float):
-        """매도 거래 추가"""
+    def add_sell(self, quantity: float, price: float, fee: float = 0.0):
+        """매도 거래 추가 (수수료는 매도 금액에서 차감)"""
         if self.holdings < quantity:
             logger.warning(f"[{self.symbol}] 매도 수량 부족: 보유 {self.holdings:.6f} < 매도 {quantity:.6f}")
             return False
         
-        sold_amount = quantity * price
+        sold_amount = quantity * price - fee
         sold_cost = quantity * self.avg_price
         
         self.holdings -= quantity
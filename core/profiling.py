@@ -0,0 +1,282 @@
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+from utils.logger import get_logger
+from core.metrics import add_route
+
+logger = get_logger(__name__)
+
+PROFILE_DIR = "logs"
+
+# 3.12 부터 cProfile 은 sys.monitoring 기반이라 프로세스에서 하나만 활성화할 수 있고,
+# 활성화하면 모든 스레드를 함께 프로파일링한다
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+
+def _output_path(prefix: str, ext: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}")
+    path, index = f"{base}.{ext}", 1
+    while os.path.exists(path):
+        path = f"{base}_{index}.{ext}"
+        index += 1
+    return path
+
+
+class ProfilingService:
+    """실행 중인 프로세스 진단 도구
+
+    - cProfile: capture_profile(N) 동안 엔진 루프의 run_once 구간을 스레드별로
+      프로파일링한 뒤 합쳐서 logs/profile_*.prof(.txt) 로 저장
+      (3.12+ 는 프로파일러 하나로 수집 기간 동안 프로세스 전체를 프로파일링)
+    - 스택 샘플링: 모든 스레드의 스택을 주기적으로 수집해
+      flamegraph 용 접힌 스택(logs/stacks_*.folded)으로 저장
+    - tracemalloc: 스냅샷을 찍어 직전/최초 스냅샷 대비 증가분을 logs/tracemalloc_*.txt 로 저장
+
+    모든 수집은 별도 스레드에서 진행되므로 거래는 멈추지 않는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiling = False
+        self._profiles: Dict[int, cProfile.Profile] = {}
+        self._in_cycle = 0
+        self._sampling = False
+        self._baseline_snapshot = None
+        self._last_snapshot = None
+
+    # ----- cProfile -----
+
+    @contextmanager
+    def profile_cycle(self):
+        """엔진 사이클 감싸기 (프로파일링 중일 때만 현재 스레드 프로파일러 활성화)
+
+        프로파일러를 켤 수 없어도 사이클은 그대로 실행한다.
+        """
+        if not self._profiling or PROCESS_WIDE_PROFILER:
+            yield
+            return
+        ident = threading.get_ident()
+        with self._lock:
+            profile = self._profiles.get(ident)
+            if profile is None:
+                profile = self._profiles[ident] = cProfile.Profile()
+            self._in_cycle += 1
+        try:
+            profile.enable()
+        except ValueError as e:
+            # 다른 프로파일링 도구가 이미 활성화됨
+            logger.debug(f"사이클 프로파일링 생략: {e}")
+            profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self._in_cycle -= 1
+
+    def capture_profile(self, seconds: float = 30) -> Optional[str]:
+        """seconds 동안 엔진 루프 프로파일링 시작 (저장 경로 반환, 진행 중이면 None)"""
+        with self._lock:
+            if self._profiling:
+                logger.warning("이미 프로파일링 중입니다")
+                return None
+            self._profiles = {}
+            if PROCESS_WIDE_PROFILER:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError as e:
+                    logger.warning(f"cProfile 을 시작할 수 없습니다: {e}")
+                    return None
+                self._profiles[0] = profile
+            self._profiling = True
+        path = _output_path("profile", "prof")
+        threading.Thread(target=self._finish_profile, args=(seconds, path),
+                         name="ProfileCapture", daemon=True).start()
+        logger.info(f"cProfile 수집 시작: {seconds}초 -> {path}")
+        return path
+
+    def _finish_profile(self, seconds: float, path: str):
+        time.sleep(seconds)
+        self._profiling = False
+        if PROCESS_WIDE_PROFILER:
+            with self._lock:
+                profile = self._profiles.get(0)
+            if profile is not None:
+                profile.disable()
+        # 진행 중인 사이클이 끝날 때까지 잠시 대기
+        deadline = time.time() + 5
+        while self._in_cycle and time.time() < deadline:
+            time.sleep(0.01)
+        with self._lock:
+            profiles = list(self._profiles.values())
+            self._profiles = {}
+
+        if not profiles:
+            logger.warning("프로파일 수집 결과 없음 (실행된 엔진 사이클 없음)")
+            return
+        try:
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(path)
+            summary = io.StringIO()
+            pstats.Stats(path, stream=summary).sort_stats("cumulative").print_stats(50)
+            with open(path[:-5] + ".txt", "w", encoding="utf-8") as f:
+                f.write(summary.getvalue())
+            scope = "프로세스 전체" if PROCESS_WIDE_PROFILER else f"{len(profiles)}개 스레드"
+            logger.info(f"cProfile 저장 완료: {path} ({scope})")
+        except Exception as e:
+            logger.error(f"cProfile 저장 실패: {e}")
+
+    # ----- 스택 샘플링 -----
+
+    def sample_stacks(self, seconds: float = 10, interval: float = 0.01) -> Optional[str]:
+        """seconds 동안 모든 스레드 스택 샘플링 시작 (저장 경로 반환)"""
+        with self._lock:
+            if self._sampling:
+                logger.warning("이미 스택 샘플링 중입니다")
+                return None
+            self._sampling = True
+        path = _output_path("stacks", "folded")
+        threading.Thread(target=self._run_sampler, args=(seconds, interval, path),
+                         name="StackSampler", daemon=True).start()
+        logger.info(f"스택 샘플링 시작: {seconds}초, {interval * 1000:.0f}ms 간격 -> {path}")
+        return path
+
+    def _run_sampler(self, seconds: float, interval: float, path: str):
+        own = threading.get_ident()
+        folded: Counter = Counter()
+        samples = 0
+        try:
+            deadline = time.time() + seconds
+            while time.time() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    stack.append(names.get(ident, str(ident)))
+                    folded[";".join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(interval)
+
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in folded.most_common():
+                    f.write(f"{stack} {count}\n")
+            logger.info(f"스택 샘플링 저장 완료: {path} ({samples}회 샘플)")
+        except Exception as e:
+            logger.error(f"스택 샘플링 실패: {e}")
+        finally:
+            self._sampling = False
+
+    def dump_stacks(self) -> str:
+        """현재 모든 스레드 스택을 즉시 기록"""
+        path = _output_path("threads", "txt")
+        names = {t.ident: t.name for t in threading.enumerate()}
+        with open(path, "w", encoding="utf-8") as f:
+            for ident, frame in sys._current_frames().items():
+                f.write(f"--- {names.get(ident, ident)} ({ident}) ---\n")
+                f.write("".join(traceback.format_stack(frame)))
+                f.write("\n")
+        logger.info(f"스레드 스택 저장: {path}")
+        return path
+
+    # ----- tracemalloc -----
+
+    def memory_snapshot(self, top: int = 30) -> str:
+        """메모리 스냅샷을 찍고 직전/최초 스냅샷 대비 증가분 기록"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(int(os.getenv("TRACEMALLOC_FRAMES", "10")))
+            logger.info("tracemalloc 추적 시작")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        path = _output_path("tracemalloc", "txt")
+        current, peak = tracemalloc.get_traced_memory()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"traced current={current / 1024 / 1024:.1f}MB peak={peak / 1024 / 1024:.1f}MB\n\n")
+            for title, base in (("직전 스냅샷 대비", self._last_snapshot),
+                                ("최초 스냅샷 대비", self._baseline_snapshot)):
+                if base is None:
+                    continue
+                f.write(f"== {title} 상위 {top} ==\n")
+                for stat in snapshot.compare_to(base, "lineno")[:top]:
+                    f.write(f"{stat}\n")
+                f.write("\n")
+            f.write(f"== 현재 할당 상위 {top} ==\n")
+            for stat in snapshot.statistics("lineno")[:top]:
+                f.write(f"{stat}\n")
+
+        if self._baseline_snapshot is None:
+            self._baseline_snapshot = snapshot
+        self._last_snapshot = snapshot
+        logger.info(f"tracemalloc 스냅샷 저장: {path}")
+        return path
+
+    # ----- 트리거 -----
+
+    def install_signal_handlers(self, profile_seconds: float = 30, sample_seconds: float = 10):
+        """SIGUSR1: cProfile 수집, SIGUSR2: 스택 샘플링 + 메모리 스냅샷"""
+        if not hasattr(signal, "SIGUSR1"):
+            logger.warning("이 플랫폼은 SIGUSR1/SIGUSR2 를 지원하지 않습니다")
+            return
+
+        def on_usr1(signum, frame):
+            self.capture_profile(profile_seconds)
+
+        def on_usr2(signum, frame):
+            self.sample_stacks(sample_seconds)
+            threading.Thread(target=self.memory_snapshot, name="MemorySnapshot", daemon=True).start()
+
+        signal.signal(signal.SIGUSR1, on_usr1)
+        signal.signal(signal.SIGUSR2, on_usr2)
+        logger.info("프로파일링 시그널 등록: SIGUSR1(cProfile), SIGUSR2(스택/메모리)")
+
+
+profiler = ProfilingService()
+
+
+def _query_seconds(handler, default: float) -> float:
+    query = handler.path.split("?", 1)[1] if "?" in handler.path else ""
+    for pair in query.split("&"):
+        key, _, value = pair.partition("=")
+        if key == "seconds":
+            try:
+                return max(float(value), 0.1)
+            except ValueError:
+                break
+    return default
+
+
+def _respond(handler, path: Optional[str], status: int = 202):
+    body = (path or "busy").encode("utf-8") + b"\n"
+    handler.send_response(status if path else 409)
+    handler.send_header("Content-Type", "text/plain; charset=utf-8")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+add_route("/debug/profile", lambda h: _respond(h, profiler.capture_profile(_query_seconds(h, 30))))
+add_route("/debug/stacks", lambda h: _respond(h, profiler.sample_stacks(_query_seconds(h, 10))))
+add_route("/debug/threads", lambda h: _respond(h, profiler.dump_stacks(), 200))
+add_route("/debug/memory", lambda h: _respond(h, profiler.memory_snapshot(), 200))
@@ -0,0 +1,230 @@
+import gzip
+import itertools
+import json
+import os
+import queue
+import threading
+from typing import Dict, Optional
+from core.config import config
+from core.clock import clock
+from core.metrics import QUEUE_DEPTH
+from core.resilience import OrderOutcomeUnknown
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 기록 파일에 남기지 않는 설정 항목 (비밀 값)
+SECRET_SETTINGS = ("upbit_access_key", "upbit_secret_key", "discord_webhook_url", "slack_webhook_url", "accounts")
+
+# 한 번에 모아서 쓰는 최대 기록 수
+BATCH_SIZE = 1000
+
+
+def encode_orderbook(book) -> Optional[list]:
+    """OrderBook -> [market, timestamp, [[ask_price, ask_size, bid_price, bid_size], ...]]"""
+    if book is None:
+        return None
+    n = book.levels
+    return [book.market, book.timestamp,
+            [[float(book.ask_prices[i]), float(book.ask_sizes[i]),
+              float(book.bid_prices[i]), float(book.bid_sizes[i])] for i in range(n)]]
+
+
+def decode_orderbook(data: Optional[list]):
+    """encode_orderbook 의 역변환"""
+    if data is None:
+        return None
+    from core.orderbook import OrderBook
+    market, timestamp, levels = data
+    book = OrderBook(market, max(len(levels), 1))
+    book.update([{"ask_price": a, "ask_size": asz, "bid_price": b, "bid_size": bsz}
+                 for a, asz, b, bsz in levels], timestamp)
+    return book
+
+
+class SessionRecorder:
+    """실행 세션 기록기 (gzip JSONL)
+
+    엔진 사이클 시각, 가격 소스/거래소 클라이언트 응답, 엔진 구성 변경, 매매 판단을
+    [seq, t, kind, symbol, payload] 한 줄씩 기록한다. seq 는 기록 요청 순서(전역 증가)이고
+    t 는 기록 시점의 시계 값이다(사이클 안에서는 사이클 시각). 기록 요청은 큐에 넣기만 하고
+    전용 스레드가 모아서 쓰므로 엔진 스레드를 막지 않는다. 재실행은 core.replay 참고.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._seq = itertools.count(1)
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.written = 0
+
+    def start(self):
+        """기록 스레드 시작 후 세션 헤더(비밀 값을 뺀 설정) 기록"""
+        if self._running:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(gzip.open(self.path, "wt", encoding="utf-8"),),
+                                        name="SessionRecorder", daemon=True)
+        self._thread.start()
+        settings = {key: value for key, value in config.settings._asdict().items() if key not in SECRET_SETTINGS}
+        self.record("session", None, {"pid": os.getpid(), "settings": settings})
+
+    def stop(self, timeout: float = 5.0):
+        """남은 기록을 쓰고 파일을 닫음"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def record(self, kind: str, symbol: Optional[str], payload=None, t: float = None):
+        """기록 요청 (블로킹하지 않음, t 를 주지 않으면 현재 시계 값)"""
+        if self._running:
+            self._queue.put([next(self._seq), clock.time() if t is None else t, kind, symbol, payload])
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self, handle):
+        try:
+            stop = False
+            while not stop:
+                item = self._queue.get()
+                lines = []
+                while item is not None:
+                    lines.append(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+                    if len(lines) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                stop = item is None
+                if lines:
+                    handle.write("\n".join(lines) + "\n")
+                    self.written += len(lines)
+        except Exception as e:
+            logger.error(f"세션 기록 실패 ({self.path}): {e}")
+        finally:
+            handle.close()
+
+
+class RecordingPriceSource:
+    """가격 소스 래퍼: 엔진 하나가 보는 가격/호가 응답을 엔진 식별자(key) 기준으로 기록
+
+    나머지 속성은 그대로 위임한다. 같은 심볼을 여러 계정 엔진이 보더라도 엔진별로 구분된다.
+    """
+
+    def __init__(self, inner, recorder: SessionRecorder, key: str):
+        self.inner = inner
+        self.recorder = recorder
+        self.key = key
+
+    def get_price(self, symbol: str, max_age: float = 5) -> Optional[float]:
+        price = self.inner.get_price(symbol, max_age=max_age)
+        self.recorder.record("get_price", self.key, price)
+        return price
+
+    def is_stale(self, symbol: str) -> bool:
+        is_stale = getattr(self.inner, "is_stale", None)
+        stale = is_stale is not None and is_stale(symbol)
+        self.recorder.record("is_stale", self.key, stale)
+        return stale
+
+    def get_orderbook(self, symbol: str):
+        book = self.inner.get_orderbook(symbol)
+        self.recorder.record("get_orderbook", self.key, encode_orderbook(book))
+        return book
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+class RecordingOrderClient:
+    """주문 클라이언트 래퍼: 주문 요청과 거래소 응답(또는 오류)을 엔진 식별자 기준으로 기록"""
+
+    def __init__(self, inner, recorder: SessionRecorder, key: str):
+        self.inner = inner
+        self.recorder = recorder
+        self.key = key
+
+    def place_order(self, market: str, side: str, ord_type: str, **params) -> Optional[Dict]:
+        request = dict(params, market=market, side=side, ord_type=ord_type)
+        return self._call("place_order", request)
+
+    def get_order(self, **params) -> Optional[Dict]:
+        return self._call("get_order", params)
+
+    def _call(self, kind: str, request: Dict) -> Optional[Dict]:
+        try:
+            result = getattr(self.inner, kind)(**request)
+        except Exception as e:
+            entry = {"request": request, "error": str(e)}
+            if isinstance(e, OrderOutcomeUnknown):
+                entry["unknown"] = True
+            self.recorder.record(kind, self.key, entry)
+            raise
+        self.recorder.record(kind, self.key, {"request": request, "result": result})
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+class RecordingRiskGate:
+    """리스크 관리자 래퍼: 주문 전 판정을 엔진 식별자 기준으로 기록
+
+    공용 리스크 관리자의 판정은 다른 엔진 스레드와의 체결 순서에 따라 달라지므로
+    가격과 같은 외부 입력으로 취급한다.
+    """
+
+    def __init__(self, inner, recorder: SessionRecorder, key: str):
+        self.inner = inner
+        self.recorder = recorder
+        self.key = key
+
+    def reserve_buy(self, symbol: str, amount: float, limits=None) -> bool:
+        allowed = self.inner.reserve_buy(symbol, amount, limits)
+        self.recorder.record("reserve_buy", self.key, allowed)
+        return allowed
+
+    def check_sell(self, symbol: str) -> bool:
+        allowed = self.inner.check_sell(symbol)
+        self.recorder.record("check_sell", self.key, allowed)
+        return allowed
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+_recorder: Optional[SessionRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[SessionRecorder]:
+    """프로세스 공용 세션 기록기 (RECORD_PATH 가 비어 있으면 None, 최초 호출 시 시작)"""
+    global _recorder
+    if _recorder is None and config.record_path:
+        with _recorder_lock:
+            if _recorder is None:
+                recorder = SessionRecorder(config.record_path)
+                recorder.start()
+                QUEUE_DEPTH.labels("recorder").set_function(recorder.queue_depth)
+                _recorder = recorder
+    return _recorder
+
+
+def shutdown_recorder(timeout: float = 5.0):
+    """공용 세션 기록기 종료"""
+    global _recorder
+    with _recorder_lock:
+        recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.stop(timeout)
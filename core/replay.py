@@ -0,0 +1,254 @@
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from core.config import config
+from core.checkpoint import TriggerState
+from core.recorder import SECRET_SETTINGS, decode_orderbook
+from core.resilience import OrderOutcomeUnknown
+from core.risk import RiskManager
+from core.settings import AssetConfig, NotifierConfig, Settings, StrategyConfig, as_asset_config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 재실행 중에는 외부로 나가는 부수 효과(파일, 포트, 웹훅, 실거래 키)를 모두 끔
+_REPLAY_OVERRIDES = dict({key: None for key in SECRET_SETTINGS}, accounts=(),
+                         record_path=None, ledger_path=None, checkpoint_path=None, history_spill_dir=None,
+                         metrics_port=None, api_port=None)
+# 알림(콘솔/거래 로그 파일/웹훅)도 끔
+_SILENT = NotifierConfig(enable_console=False, enable_file=False, enable_webhook=False)
+# 판정은 기록값을 쓰므로 합계용 리스크 관리자에는 자산별 한도를 적용하지 않음
+_NO_LIMITS = StrategyConfig(min_interval_minutes=0, max_position_ratio=1.0)
+
+
+def _asset(data: Dict) -> AssetConfig:
+    # 주문 응답과 리스크 판정은 기록값을 쓰므로 계정(키/한도)은 필요 없음
+    return as_asset_config(data)._replace(notifier=_SILENT, account=None)
+
+
+class ReplayError(ValueError):
+    """재실행할 수 없는 기록 파일"""
+
+
+class Mismatch(NamedTuple):
+    """기록과 다른 매매 판단"""
+    symbol: str
+    index: int          # 자산별 사이클 순번 (0 부터)
+    time: float         # 사이클 시각
+    expected: Optional[list]
+    actual: Optional[list]
+
+
+class ReplayResult(NamedTuple):
+    """재실행 결과"""
+    cycles: int
+    trades: int
+    mismatches: Tuple[Mismatch, ...]
+    missing_inputs: int  # 기록에 없는 입력을 요청한 횟수 (판단 경로가 갈라졌다는 뜻)
+    elapsed: float
+    recorded_span: float  # 기록된 첫 사이클 ~ 마지막 사이클 (초)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and not self.missing_inputs
+
+    def to_dict(self) -> Dict:
+        return dict(self._asdict(), ok=self.ok, mismatches=[m._asdict() for m in self.mismatches])
+
+
+def load_session(path: str) -> List[list]:
+    """기록 파일 읽기 (seq 순 정렬, 비정상 종료로 잘린 마지막 줄은 무시)"""
+    records = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"해석할 수 없는 기록 줄 무시 ({path})")
+    except EOFError:
+        logger.warning(f"기록 파일 끝이 잘림, 읽은 부분까지 사용 ({path})")
+    except OSError as e:
+        raise ReplayError(f"기록 파일을 읽을 수 없음 ({path}): {e}") from e
+    records.sort(key=lambda record: record[0])
+    if not records or records[0][2] != "session":
+        raise ReplayError(f"세션 헤더가 없는 기록 파일: {path}")
+    return records
+
+
+class _Inputs:
+    """(종류, 엔진 식별자) 별 기록된 응답 큐"""
+
+    KINDS = ("get_price", "is_stale", "get_orderbook", "place_order", "get_order", "reserve_buy", "check_sell")
+
+    def __init__(self, records: List[list]):
+        self._queues: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        # 이전 형식 기록은 주문 응답을 마켓 기준으로 남김 (요청에 market 이 없음)
+        self.orders_by_market = False
+        for _, _, kind, key, payload in records:
+            if kind in self.KINDS:
+                self._queues[(kind, key)].append(payload)
+                if kind == "place_order" and "market" not in payload["request"]:
+                    self.orders_by_market = True
+        self.missing = 0
+
+    def pop(self, kind: str, key: str, default=None):
+        queue = self._queues.get((kind, key))
+        if not queue:
+            self.missing += 1
+            logger.warning(f"[{key}] 기록에 없는 입력 요청: {kind}")
+            return default
+        return queue.popleft()
+
+
+class ReplayPriceSource:
+    """엔진 하나에 기록된 가격/호가 응답을 순서대로 돌려주는 가격 소스"""
+
+    def __init__(self, inputs: _Inputs, key: str):
+        self.inputs = inputs
+        self.key = key
+
+    def get_price(self, symbol: str, max_age: float = 5) -> Optional[float]:
+        return self.inputs.pop("get_price", self.key)
+
+    def is_stale(self, symbol: str) -> bool:
+        return self.inputs.pop("is_stale", self.key, False)
+
+    def get_orderbook(self, symbol: str):
+        return decode_orderbook(self.inputs.pop("get_orderbook", self.key))
+
+
+class ReplayOrderClient:
+    """엔진 하나에 기록된 거래소 주문 응답(또는 오류)을 순서대로 돌려주는 주문 클라이언트"""
+
+    def __init__(self, inputs: _Inputs, key: str):
+        self.inputs = inputs
+        self.key = key
+
+    def place_order(self, market: str, side: str, ord_type: str, **params) -> Optional[Dict]:
+        entry = self.inputs.pop("place_order", market if self.inputs.orders_by_market else self.key)
+        if entry is None:
+            raise Exception(f"기록에 없는 주문: {market} {side}")
+        return self._result(entry)
+
+    def get_order(self, **params) -> Optional[Dict]:
+        entry = self.inputs.pop("get_order", self.key)
+        if entry is None:
+            raise Exception(f"기록에 없는 주문 조회: {params}")
+        return self._result(entry)
+
+    @staticmethod
+    def _result(entry: Dict) -> Optional[Dict]:
+        if entry.get("unknown"):
+            raise OrderOutcomeUnknown(entry["error"])
+        if "error" in entry:
+            raise Exception(entry["error"])
+        return entry["result"]
+
+
+class ReplayRiskGate:
+    """기록된 주문 전 리스크 판정을 엔진별 순서대로 돌려줌 (체결 반영은 리스크 관리자에 그대로 전달)
+
+    판정은 다른 엔진과의 스레드 순서에 따라 달라지므로 기록값을 쓰고, 리스크 관리자는
+    재실행 후 합계 확인용으로만 갱신한다 (한도는 끈 상태).
+    """
+
+    def __init__(self, inputs: _Inputs, risk: RiskManager, key: str):
+        self.inputs = inputs
+        self.risk = risk
+        self.key = key
+
+    def reserve_buy(self, symbol: str, amount: float, limits=None) -> bool:
+        allowed = self.inputs.pop("reserve_buy", self.key, False)
+        if allowed:
+            self.risk.reserve_buy(symbol, amount, _NO_LIMITS)
+        return allowed
+
+    def check_sell(self, symbol: str) -> bool:
+        return self.inputs.pop("check_sell", self.key, False)
+
+    def __getattr__(self, name):
+        return getattr(self.risk, name)
+
+
+class ReplaySession:
+    """기록된 세션을 실제 엔진 코드로 다시 실행해 매매 판단을 비교
+
+    기록된 설정으로 스냅샷을 바꾼 뒤(파일/포트/웹훅/API 키는 끔) 엔진을 기록과 같은 상태로
+    만들고, 사이클 기록마다 같은 시각으로 run_once 를 호출한다. 가격/호가/주문 응답은
+    엔진별 기록 순서대로 공급하므로 엔진 간 스레드 순서와 무관하게 같은 입력을 받는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = load_session(path)
+        self.settings: Dict = self.records[0][4].get("settings", {})
+        # 재실행 중 체결로 갱신되는 리스크 합계 (한도 없음, 확인용)
+        self.risk: Optional[RiskManager] = None
+
+    def _apply_settings(self):
+        changes = {key: value for key, value in self.settings.items() if key in Settings._fields}
+        changes.update(_REPLAY_OVERRIDES)
+        config.replace(**changes)
+
+    def run(self, speed: float = 0.0) -> ReplayResult:
+        """재실행 (speed: 0 이면 최대 속도, 그 외에는 기록 시간의 speed 배속)"""
+        self._apply_settings()
+        inputs = _Inputs(self.records)
+        self.risk = RiskManager()
+        expected: Dict[str, List] = defaultdict(list)
+        for _, _, kind, symbol, payload in self.records:
+            if kind == "decision":
+                expected[symbol].append(payload)
+
+        from core.engine.trader import TraderEngine
+        engines: Dict[str, TraderEngine] = {}
+        counts: Dict[str, int] = defaultdict(int)
+        mismatches: List[Mismatch] = []
+        cycles = trades = 0
+        cycle_times = [t for _, t, kind, _, _ in self.records if kind == "cycle"]
+        first_time = cycle_times[0] if cycle_times else 0.0
+        started = time.perf_counter()
+
+        for _, t, kind, symbol, payload in self.records:
+            if kind == "engine":
+                engine = TraderEngine(_asset(payload["asset"]), payload["dry_run"],
+                                      ReplayPriceSource(inputs, symbol), ReplayOrderClient(inputs, symbol))
+                engine.recorder = None
+                engine.executor.risk = ReplayRiskGate(inputs, self.risk, symbol)
+                history, action, action_price = payload["state"]
+                engine.trigger.restore_state(TriggerState(symbol, tuple(history), action, action_price, 0.0))
+                engine.last_price_time = payload["last_price_time"]
+                engines[symbol] = engine
+            elif kind == "remove":
+                engines.pop(symbol, None)
+            elif kind == "config" and symbol in engines:
+                engines[symbol].apply_config(_asset(payload))
+            elif kind == "cycle" and symbol in engines:
+                index = counts[symbol]
+                recorded = expected[symbol]
+                if index >= len(recorded):
+                    # 판단이 기록되기 전에 끝난 사이클 (기록 중 비정상 종료)
+                    continue
+                if speed > 0:
+                    delay = (t - first_time) / speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                engine = engines[symbol]
+                engine.run_once(now=t)
+                actual = engine.last_decision
+                counts[symbol] += 1
+                cycles += 1
+                if actual is not None and actual[1] is not None:
+                    trades += 1
+                if recorded[index] != actual:
+                    mismatches.append(Mismatch(symbol, index, t, recorded[index], actual))
+
+        elapsed = time.perf_counter() - started
+        result = ReplayResult(cycles, trades, tuple(mismatches), inputs.missing, elapsed,
+                              cycle_times[-1] - first_time if cycle_times else 0.0)
+        logger.info(f"재실행 완료: 사이클 {cycles}, 체결 {trades}, 불일치 {len(mismatches)}, "
+                    f"누락 입력 {inputs.missing} ({elapsed:.2f}초)")
+        return result
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+from core.config import config
+from core.metrics import registry
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CIRCUIT_STATE = registry.gauge(
+    "ats_circuit_state", "Circuit breaker state (0=closed, 1=half-open, 2=open)", ["endpoint"])
+HEDGED_REQUESTS = registry.counter(
+    "ats_hedged_requests_total", "Duplicate GETs sent after the p95 latency was exceeded", ["endpoint"])
+
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+_STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half-open", OPEN: "open"}
+
+
+class CircuitOpenError(Exception):
+    """차단기가 열려 요청을 보내지 않음"""
+
+
+class RateLimitError(Exception):
+    """요청 한도 대기 시간 초과로 요청을 보내지 않음"""
+
+
+class OrderOutcomeUnknown(Exception):
+    """주문 요청은 보냈을 수 있으나 결과를 받지 못함 (식별자로 거래소 조회 후 확정해야 함)"""
+
+
+def endpoint_timeout(endpoint: str) -> float:
+    """엔드포인트별 요청 제한 시간 (초)
+
+    시세 조회는 짧게, 인증/주문 API 는 거래소 처리 시간을 고려해 길게 잡는다.
+    """
+    if endpoint in ("/v1/ticker", "/v1/orderbook", "/v1/candles/minutes/1"):
+        return config.quotation_timeout
+    if endpoint == "/v1/market/all":
+        return max(config.quotation_timeout, 5.0)
+    return config.exchange_timeout
+
+
+class LatencyWindow:
+    """최근 응답 시간 표본 (p95 계산용)"""
+
+    __slots__ = ("_samples", "_lock")
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        """표본이 min_samples 개 미만이면 None"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(int(len(samples) * q), len(samples) - 1)]
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지는 요청 한도 (최대 burst 개까지 모아 둠)"""
+
+    __slots__ = ("rate", "burst", "_tokens", "_updated", "_lock")
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """토큰 하나를 얻을 때까지 대기 (timeout 초 안에 못 얻으면 False)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_time = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait_time > deadline:
+                return False
+            time.sleep(wait_time)
+
+
+class CircuitBreaker:
+    """엔드포인트별 차단기
+
+    연속 실패(또는 slow_threshold 초를 넘긴 느린 응답)가 failure_threshold 회 쌓이면 열리고,
+    reset_timeout 초 동안 요청을 즉시 거부한다. 그 뒤 한 요청만 시험 삼아 통과시켜(half-open)
+    성공하면 닫고 실패하면 다시 연다. 모든 엔진이 같은 차단기를 공유하므로 거래소 장애 중
+    엔진 수만큼 재시도가 몰리지 않는다.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, slow_threshold: Optional[float] = None,
+                 reset_timeout: float = 15.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.slow_threshold = slow_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._gauge = CIRCUIT_STATE.labels(name)
+        self._gauge.set(CLOSED)
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지 (half-open 시험 요청은 한 번에 하나만)"""
+        if self.state == CLOSED:
+            return True
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, latency: Optional[float]):
+        """요청 결과 기록 (latency 가 None 이면 실패)"""
+        failed = latency is None or (self.slow_threshold is not None and latency > self.slow_threshold)
+        if not failed and self.state == CLOSED and not self.failures:
+            return
+        with self._lock:
+            self._probing = False
+            if not failed:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._set_state(CLOSED)
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._set_state(OPEN)
+
+    def _set_state(self, state: int):
+        previous, self.state = self.state, state
+        self._gauge.set(state)
+        log = logger.warning if state == OPEN else logger.info
+        log(f"차단기 상태 변경 [{self.name}]: {_STATE_NAMES[previous]} -> {_STATE_NAMES[state]}"
+            f" (연속 실패 {self.failures}회)")
+
+    def call(self, func: Callable, *args, **kwargs):
+        """차단기를 거쳐 func 실행 (열려 있으면 CircuitOpenError)"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} 차단기 열림")
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(None)
+            raise
+        self.record(time.perf_counter() - started)
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyWindow] = {}
+_registry_lock = threading.Lock()
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+# 중복 요청 동시 실행 수 (풀 크기와 같아 중복 요청이 풀 큐에서 기다리지 않음)
+HEDGE_WORKERS = 8
+_hedge_slots = threading.BoundedSemaphore(HEDGE_WORKERS)
+_SKIPPED = object()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """엔드포인트별 프로세스 공용 차단기"""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(endpoint)
+            if breaker is None:
+                slow_ms = config.circuit_slow_ms
+                breaker = _breakers[endpoint] = CircuitBreaker(
+                    endpoint, config.circuit_failure_threshold,
+                    slow_ms / 1000 if slow_ms else None, config.circuit_reset_timeout)
+    return breaker
+
+
+def get_latency_window(endpoint: str) -> LatencyWindow:
+    """엔드포인트별 프로세스 공용 응답 시간 표본"""
+    window = _latencies.get(endpoint)
+    if window is None:
+        with _registry_lock:
+            window = _latencies.setdefault(endpoint, LatencyWindow())
+    return window
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _registry_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="HedgedGet")
+    return _hedge_pool
+
+
+def _hedge(endpoint: str, func: Callable[[], object], hedge_after: float, primary_done: threading.Event):
+    """원 요청이 hedge_after 초 안에 끝나지 않았을 때만 중복 요청 실행 (끝났으면 _SKIPPED)"""
+    try:
+        if primary_done.wait(hedge_after):
+            return _SKIPPED
+        HEDGED_REQUESTS.labels(endpoint).inc()
+        return func()
+    finally:
+        _hedge_slots.release()
+
+
+def hedged_call(endpoint: str, func: Callable[[], object], hedge_after: float, timeout: float):
+    """func 를 호출 스레드에서 실행하고 hedge_after 초 안에 끝나지 않으면 풀에서 같은 요청을 한 번 더 보냄
+
+    원 요청이 실패(제한 시간 초과 포함)하면 이미 보낸 중복 요청 결과를 timeout 초까지 기다려 사용한다.
+    원 요청은 풀을 거치지 않으므로 중복 요청이 몰려도 막히지 않고, 풀이 모두 사용 중이면
+    중복 요청만 생략한다. 멱등인 시세 조회 GET 에만 사용한다. 둘 다 실패하면 마지막 예외를 다시 던진다.
+    """
+    primary_done = threading.Event()
+    hedge = None
+    if _hedge_slots.acquire(blocking=False):
+        hedge = _get_hedge_pool().submit(_hedge, endpoint, func, hedge_after, primary_done)
+    try:
+        return func()
+    except Exception as e:
+        error = e
+    finally:
+        primary_done.set()
+    if hedge is None:
+        raise error
+    try:
+        result = hedge.result(timeout)
+    except FutureTimeout:
+        raise error
+    if result is _SKIPPED:
+        raise error
+    return result
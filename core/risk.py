@@ -0,0 +1,263 @@
+import threading
+import zlib
+from typing import Dict, NamedTuple, Optional
+from core.clock import clock
+from core.config import config
+from core.metrics import registry
+from core.settings import StrategyConfig
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RISK_REJECTIONS = registry.counter(
+    "ats_risk_rejections_total", "Orders rejected by pre-trade risk checks", ["symbol", "reason"])
+
+# 합계를 나눠 담는 스트라이프 수 (자산은 심볼 해시로 스트라이프에 고정)
+STRIPES = 16
+
+
+class _Stripe:
+    """자산 일부의 부분 합계 (스트라이프별 락)"""
+
+    __slots__ = ("lock", "exposure", "reserved", "spent", "loss")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.exposure = 0.0   # 보유 원가 합계
+        self.reserved = 0.0   # 체결 전 주문이 잡아둔 금액
+        self.spent = 0.0      # 순 현금 사용액 (매수 원가 - 매도 대금)
+        self.loss = 0.0       # 당일 실현 손실
+
+
+class _AssetRisk:
+    """자산별 포지션 상태 (자산별 락)"""
+
+    __slots__ = ("lock", "stripe", "quantity", "cost", "reserved", "last_buy_time")
+
+    def __init__(self, stripe: _Stripe):
+        self.lock = threading.Lock()
+        self.stripe = stripe
+        self.quantity = 0.0
+        self.cost = 0.0
+        self.reserved = 0.0
+        self.last_buy_time = 0.0
+
+
+class RiskSnapshot(NamedTuple):
+    """리스크 합계 스냅샷"""
+    exposure: float
+    reserved: float
+    daily_loss: float
+    cash: Optional[float]
+    halted: Optional[str]
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+class RiskManager:
+    """포트폴리오 전체 리스크 관리
+
+    체결마다 자산별 보유 원가와 전체 합계(노출, 주문 대기 금액, 당일 실현 손실)를 증분
+    갱신하고, 주문 전에 O(1)로 한도를 확인한다. 자산 상태는 자산별 락, 전체 합계는
+    STRIPES 개로 나눈 부분 합계와 스트라이프별 락으로 관리해 수백 개 엔진이 동시에 확인해도
+    하나의 전역 락에 몰리지 않는다.
+
+    전체 한도는 "먼저 잡고 확인" 방식이다. 자기 스트라이프에 주문 금액을 먼저 더한 뒤
+    전체 합계를 읽어 한도를 넘으면 되돌리므로, 동시에 들어온 주문이 함께 한도를 넘기는 일은
+    없다 (대신 경합 시 둘 다 거부될 수는 있음).
+    """
+
+    def __init__(self, max_exposure: Optional[float] = None, max_daily_loss: Optional[float] = None,
+                 cash: Optional[float] = None, stripes: int = STRIPES):
+        self.max_exposure = max_exposure
+        self.max_daily_loss = max_daily_loss
+        # 기준 현금 (None 이면 잔고 확인 생략, 사용 가능 현금 = cash - spent - reserved)
+        self.cash = cash
+        self.halted: Optional[str] = None
+        self._stripes = tuple(_Stripe() for _ in range(max(stripes, 1)))
+        self._assets: Dict[str, _AssetRisk] = {}
+        self._assets_lock = threading.Lock()
+        self._day = self._today()
+        self._day_lock = threading.Lock()
+
+    @staticmethod
+    def _today() -> int:
+        return int(clock.time() // 86400)
+
+    def _asset(self, symbol: str) -> _AssetRisk:
+        state = self._assets.get(symbol)
+        if state is None:
+            with self._assets_lock:
+                state = self._assets.get(symbol)
+                if state is None:
+                    stripe = self._stripes[zlib.crc32(symbol.encode("utf-8")) % len(self._stripes)]
+                    state = self._assets[symbol] = _AssetRisk(stripe)
+        return state
+
+    def _total(self, field: str) -> float:
+        # 스트라이프 수가 고정이라 O(1), float 읽기는 락 없이 원자적
+        return sum(getattr(stripe, field) for stripe in self._stripes)
+
+    def _roll_day(self):
+        """날짜가 바뀌면 당일 실현 손실 초기화"""
+        today = self._today()
+        if today == self._day:
+            return
+        with self._day_lock:
+            if today == self._day:
+                return
+            for stripe in self._stripes:
+                with stripe.lock:
+                    stripe.loss = 0.0
+            self._day = today
+            if self.halted == "daily_loss":
+                self.halted = None
+            logger.info("일일 손실 한도 초기화")
+
+    def _reject(self, symbol: str, reason: str, detail: str) -> bool:
+        RISK_REJECTIONS.labels(symbol, reason).inc()
+        logger.warning(f"[{symbol}] 리스크 한도로 주문 거부: {detail}")
+        return False
+
+    # ----- 주문 전 확인 -----
+
+    def reserve_buy(self, symbol: str, amount: float, limits: StrategyConfig = None) -> bool:
+        """매수 주문 전 확인 후 amount 만큼 잡아둠 (통과하면 반드시 record_buy 또는 release 호출)"""
+        limits = limits or StrategyConfig()
+        self._roll_day()
+        if self.halted:
+            return self._reject(symbol, "halted", f"거래 중지 ({self.halted})")
+        if self.max_daily_loss and self._total("loss") >= self.max_daily_loss:
+            return self._reject(symbol, "daily_loss", f"당일 실현 손실 {self._total('loss'):,.0f} "
+                                                      f">= {self.max_daily_loss:,.0f}")
+
+        state = self._asset(symbol)
+        with state.lock:
+            if limits.min_interval_minutes and state.last_buy_time:
+                elapsed = clock.time() - state.last_buy_time
+                if elapsed < limits.min_interval_minutes * 60:
+                    return self._reject(symbol, "interval", f"최근 매수 후 {elapsed:.0f}초 "
+                                                            f"(최소 {limits.min_interval_minutes}분)")
+            budget = self.max_exposure or self.cash
+            if budget and state.cost + state.reserved + amount > budget * limits.max_position_ratio:
+                return self._reject(symbol, "position", f"자산 노출 {state.cost + state.reserved + amount:,.0f} "
+                                                        f"> 한도 {budget * limits.max_position_ratio:,.0f}")
+            state.reserved += amount
+            stripe = state.stripe
+            with stripe.lock:
+                stripe.reserved += amount
+
+            # 먼저 잡고 전체 합계 확인 (넘으면 되돌림)
+            reason = None
+            reserved = self._total("reserved")
+            if self.max_exposure and self._total("exposure") + reserved > self.max_exposure:
+                reason = "exposure", f"전체 노출 한도 {self.max_exposure:,.0f} 초과"
+            elif self.cash is not None and self._total("spent") + reserved > self.cash:
+                reason = "cash", "사용 가능 현금 부족"
+            if reason is not None:
+                state.reserved -= amount
+                with stripe.lock:
+                    stripe.reserved -= amount
+                return self._reject(symbol, *reason)
+        return True
+
+    def check_sell(self, symbol: str) -> bool:
+        """매도 주문 전 확인 (매도는 노출을 줄이므로 수동 거래 중지 때만 거부)"""
+        if self.halted and self.halted != "daily_loss":
+            return self._reject(symbol, "halted", f"거래 중지 ({self.halted})")
+        return True
+
+    def release(self, symbol: str, amount: float):
+        """체결되지 않은 매수 주문의 잡아둔 금액 반환"""
+        state = self._asset(symbol)
+        with state.lock:
+            state.reserved -= amount
+            with state.stripe.lock:
+                state.stripe.reserved -= amount
+
+    # ----- 체결 반영 -----
+
+    def record_buy(self, symbol: str, reserved: float, quantity: float, cost: float):
+        """매수 체결 반영 (잡아둔 금액을 실제 원가로 전환)"""
+        state = self._asset(symbol)
+        with state.lock:
+            state.reserved -= reserved
+            state.quantity += quantity
+            state.cost += cost
+            state.last_buy_time = clock.time()
+            with state.stripe.lock:
+                state.stripe.reserved -= reserved
+                state.stripe.exposure += cost
+                state.stripe.spent += cost
+
+    def record_sell(self, symbol: str, quantity: float, proceeds: float) -> float:
+        """매도 체결 반영, 실현 손익 반환 (원가는 이동평균 기준)"""
+        self._roll_day()
+        state = self._asset(symbol)
+        with state.lock:
+            if state.quantity > 0:
+                sold_cost = state.cost * min(quantity / state.quantity, 1.0)
+                state.quantity = max(state.quantity - quantity, 0.0)
+                pnl = proceeds - sold_cost
+            else:
+                # 추적 전부터 보유하던 수량 (원가를 모르므로 손익 0)
+                sold_cost = pnl = 0.0
+            state.cost -= sold_cost
+            with state.stripe.lock:
+                state.stripe.exposure -= sold_cost
+                state.stripe.spent -= proceeds
+                if pnl < 0:
+                    state.stripe.loss -= pnl
+        if pnl < 0 and self.max_daily_loss and self._total("loss") >= self.max_daily_loss and not self.halted:
+            self.halted = "daily_loss"
+            logger.warning(f"당일 실현 손실 한도 도달: {self._total('loss'):,.0f} >= {self.max_daily_loss:,.0f}"
+                           f" (신규 매수 중지)")
+        return pnl
+
+    # ----- 운영 -----
+
+    def set_cash(self, cash: Optional[float]):
+        """기준 현금 설정 (거래소 잔고 조회 후, 이후 증감은 체결로 추적)"""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.spent = 0.0
+        self.cash = cash
+
+    def halt(self, reason: str = "manual"):
+        """모든 신규 주문 중지"""
+        self.halted = reason
+        logger.warning(f"거래 중지: {reason}")
+
+    def resume(self):
+        self.halted = None
+        logger.info("거래 재개")
+
+    def exposure(self, symbol: str) -> float:
+        state = self._assets.get(symbol)
+        return state.cost if state is not None else 0.0
+
+    def snapshot(self) -> RiskSnapshot:
+        spent = self._total("spent")
+        reserved = self._total("reserved")
+        return RiskSnapshot(
+            exposure=self._total("exposure"),
+            reserved=reserved,
+            daily_loss=self._total("loss"),
+            cash=None if self.cash is None else self.cash - spent - reserved,
+            halted=self.halted,
+        )
+
+
+_risk_manager: Optional[RiskManager] = None
+_risk_lock = threading.Lock()
+
+
+def get_risk_manager() -> RiskManager:
+    """프로세스 공용 리스크 관리자 (한도는 처음 사용할 때의 설정 기준)"""
+    global _risk_manager
+    if _risk_manager is None:
+        with _risk_lock:
+            if _risk_manager is None:
+                _risk_manager = RiskManager(config.risk_max_exposure, config.risk_max_daily_loss)
+    return _risk_manager
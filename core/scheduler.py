@@ -0,0 +1,54 @@
+import threading
+from typing import Dict
+from core.metrics import POLL_INTERVAL_SECONDS
+
+
+class PollScheduler:
+    """자산별 적응형 폴링 간격 계산기
+
+    엔진이 사이클마다 보고하는 긴급도(0~1, 트리거 근접도/변동성)를
+    [max_interval, min_interval] 구간에 선형으로 대응시킨다. 모든 자산의 초당 요청 수
+    합계(sum(1/간격))가 request_budget 을 넘으면 전체 간격을 같은 비율로 늘려
+    예산 안에 맞춘다. 합계는 보고 시 차이만 반영해 갱신하므로 자산 수와 무관하게 O(1)이다.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, request_budget: float):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.request_budget = request_budget
+        self._desired: Dict[str, float] = {}
+        self._total_rate = 0.0
+        self._lock = threading.Lock()
+        self._gauges: Dict[str, object] = {}
+
+    def update(self, symbol: str, urgency: float) -> float:
+        """긴급도 보고 후 다음 폴링까지 대기할 간격(초) 반환"""
+        urgency = min(max(urgency, 0.0), 1.0)
+        desired = self.max_interval - (self.max_interval - self.min_interval) * urgency
+        with self._lock:
+            previous = self._desired.get(symbol)
+            if previous is not None:
+                self._total_rate -= 1.0 / previous
+            self._desired[symbol] = desired
+            self._total_rate += 1.0 / desired
+            scale = self._total_rate / self.request_budget if self.request_budget > 0 else 1.0
+            gauge = self._gauges.get(symbol)
+            if gauge is None:
+                gauge = self._gauges[symbol] = POLL_INTERVAL_SECONDS.labels(symbol)
+        interval = desired * max(scale, 1.0)
+        gauge.set(interval)
+        return interval
+
+    def remove(self, symbol: str):
+        """자산 제거"""
+        with self._lock:
+            previous = self._desired.pop(symbol, None)
+            if previous is not None:
+                self._total_rate -= 1.0 / previous
+            if self._gauges.pop(symbol, None) is not None:
+                POLL_INTERVAL_SECONDS.remove(symbol)
+
+    @property
+    def request_rate(self) -> float:
+        """예산 적용 전 초당 요청 수 합계"""
+        return self._total_rate
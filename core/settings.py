@@ -0,0 +1,454 @@
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+
+class ConfigError(ValueError):
+    """설정 값 오류 (시작 시점에 발생시켜 거래 중 실패를 막음)"""
+
+
+# ----- 환경변수 설정 -----
+
+_PLACEHOLDER_KEYS = ("your_upbit_access_key_here", "your_upbit_secret_key_here")
+_ACCOUNT_NAME = re.compile(r"^[a-z0-9_]+$")
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_LOG_FORMATS = ("text", "json")
+_TRUE = ("true", "1", "yes", "on")
+_FALSE = ("false", "0", "no", "off")
+
+
+class AccountSettings(NamedTuple):
+    """추가 거래소 계정 (ACCOUNTS 에 나열한 이름별 API 키와 리스크 한도)"""
+    name: str
+    access_key: Optional[str]
+    secret_key: Optional[str]
+    risk_max_exposure: Optional[float]
+    risk_max_daily_loss: Optional[float]
+
+    @property
+    def has_api_keys(self) -> bool:
+        return self.access_key is not None and self.secret_key is not None
+
+
+class Settings(NamedTuple):
+    """환경변수 설정 스냅샷 (불변)
+
+    로드 시 한 번만 파싱/검증하며, 다시 로드하면 새 스냅샷으로 통째로 교체된다.
+    항목별 의미와 기본값은 README 의 환경변수 설정 참고.
+    """
+    # 업비트 API
+    upbit_access_key: Optional[str]
+    upbit_secret_key: Optional[str]
+    upbit_api_url: str
+    # 거래
+    dry_run: bool
+    # 로깅 (.env 를 읽은 뒤 utils.logger 에 반영)
+    log_level: str
+    log_format: str
+    log_backup_days: int
+    # 폴링/실행
+    polling_interval: float
+    adaptive_polling: bool
+    min_polling_interval: float
+    max_polling_interval: float
+    request_budget: float
+    status_update_interval: int
+    max_workers: Optional[int]
+    assets_reload_interval: float
+    shutdown_timeout: float
+    # 샤드/클러스터
+    shard_count: int
+    shard_collect_interval: Optional[float]
+    cluster_role: Optional[str]
+    cluster_address: str
+    cluster_worker_id: Optional[str]
+    # 거래소 통신 장애 대응
+    quotation_timeout: float
+    exchange_timeout: float
+    circuit_failure_threshold: int
+    circuit_slow_ms: Optional[float]
+    circuit_reset_timeout: float
+    stale_price_max_age: float
+    hedge_requests: bool
+    # 리스크 한도 (KRW)
+    risk_max_exposure: Optional[float]
+    risk_max_daily_loss: Optional[float]
+    # 추가 계정 (기본 계정은 UPBIT_*_KEY / RISK_* 사용)
+    accounts: Tuple[AccountSettings, ...]
+    # 체크포인트
+    checkpoint_path: Optional[str]
+    checkpoint_interval: float
+    checkpoint_max_age: float
+    checkpoint_backfill: bool
+    # 모의 체결
+    sim_fee_rate: float
+    sim_latency_ms: float
+    sim_slippage_bps: float
+    # 알림/거래 로그
+    discord_webhook_url: Optional[str]
+    slack_webhook_url: Optional[str]
+    notify_queue_size: int
+    notify_batch_interval: float
+    trade_log_flush_interval: float
+    trade_log_max_bytes: int
+    trade_log_compress: bool
+    order_history_size: int
+    notification_history_size: int
+    history_spill_dir: Optional[str]
+    ledger_path: Optional[str]
+    record_path: Optional[str]
+    # 모니터링
+    metrics_port: Optional[int]
+    metrics_host: str
+    api_port: Optional[int]
+    api_host: str
+    trace_sample_rate: float
+    trace_slow_ms: Optional[float]
+    trace_buffer_size: int
+
+    @property
+    def has_api_keys(self) -> bool:
+        """API 키가 올바르게 설정되었는지 확인"""
+        return self.upbit_access_key is not None and self.upbit_secret_key is not None
+
+
+class _EnvReader:
+    """환경변수 파싱 (오류를 모아 한 번에 보고)"""
+
+    def __init__(self, environ: Mapping[str, str]):
+        self.environ = environ
+        self.errors: List[str] = []
+
+    def raw(self, name: str) -> Optional[str]:
+        value = self.environ.get(name)
+        return value.strip() if value is not None and value.strip() else None
+
+    def text(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.raw(name)
+        return value if value is not None else default
+
+    def flag(self, name: str, default: bool) -> bool:
+        value = self.raw(name)
+        if value is None:
+            return default
+        if value.lower() in _TRUE:
+            return True
+        if value.lower() in _FALSE:
+            return False
+        self.errors.append(f"{name}: true/false 가 아님 ({value!r})")
+        return default
+
+    def number(self, name: str, default, cast=float, minimum: float = None, maximum: float = None):
+        value = self.raw(name)
+        if value is None:
+            return default
+        try:
+            number = cast(value)
+        except ValueError:
+            self.errors.append(f"{name}: {cast.__name__} 값이 아님 ({value!r})")
+            return default
+        if minimum is not None and number < minimum:
+            self.errors.append(f"{name}: {minimum} 이상이어야 함 ({value!r})")
+            return default
+        if maximum is not None and number > maximum:
+            self.errors.append(f"{name}: {maximum} 이하여야 함 ({value!r})")
+            return default
+        return number
+
+
+def _api_key(env: _EnvReader, name: str) -> Optional[str]:
+    key = env.text(name)
+    return key if key and key not in _PLACEHOLDER_KEYS else None
+
+
+def _accounts(env: _EnvReader, max_exposure: Optional[float],
+              max_daily_loss: Optional[float]) -> Tuple[AccountSettings, ...]:
+    """ACCOUNTS=sub1,sub2 와 계정별 UPBIT_ACCESS_KEY_<이름>, RISK_MAX_EXPOSURE_<이름> 등
+
+    계정별 리스크 한도를 지정하지 않으면 기본 계정의 한도를 그대로 쓴다 (0: 제한 없음).
+    """
+    names = [name.strip().lower() for name in (env.text("ACCOUNTS") or "").split(",") if name.strip()]
+    accounts = []
+    for name in names:
+        if not _ACCOUNT_NAME.match(name):
+            env.errors.append(f"ACCOUNTS: 계정 이름은 영문 소문자/숫자/_ 만 가능 ({name!r})")
+            continue
+        if name in (account.name for account in accounts):
+            env.errors.append(f"ACCOUNTS: 중복된 계정 {name!r}")
+            continue
+        suffix = name.upper()
+        exposure = env.number(f"RISK_MAX_EXPOSURE_{suffix}", max_exposure or 0.0, minimum=0)
+        daily_loss = env.number(f"RISK_MAX_DAILY_LOSS_{suffix}", max_daily_loss or 0.0, minimum=0)
+        accounts.append(AccountSettings(name, _api_key(env, f"UPBIT_ACCESS_KEY_{suffix}"),
+                                        _api_key(env, f"UPBIT_SECRET_KEY_{suffix}"),
+                                        exposure or None, daily_loss or None))
+    return tuple(accounts)
+
+
+def load_settings(environ: Mapping[str, str] = None) -> Settings:
+    """환경변수에서 설정 스냅샷 생성 (잘못된 값이 있으면 모두 모아 ConfigError)"""
+    env = _EnvReader(os.environ if environ is None else environ)
+    polling_interval = env.number("POLLING_INTERVAL", 10.0, minimum=0.01)
+    max_polling_interval = env.number("MAX_POLLING_INTERVAL", polling_interval * 3, minimum=0.01)
+    # 지정하지 않은 한도는 다른 쪽 한도에 맞춤 (짧은 POLLING_INTERVAL 에서 0.5초 하한이 상한을 넘지 않게)
+    min_polling_interval = env.number("MIN_POLLING_INTERVAL",
+                                      min(max(polling_interval / 5, 0.5), max_polling_interval), minimum=0.01)
+    if env.raw("MAX_POLLING_INTERVAL") is None:
+        max_polling_interval = max(max_polling_interval, min_polling_interval)
+    adaptive_polling = env.flag("ADAPTIVE_POLLING", True)
+    if adaptive_polling and min_polling_interval > max_polling_interval:
+        env.errors.append(f"MIN_POLLING_INTERVAL({min_polling_interval}) 이 "
+                          f"MAX_POLLING_INTERVAL({max_polling_interval}) 보다 큼")
+    cluster_role = env.text("CLUSTER_ROLE")
+    if cluster_role is not None:
+        cluster_role = cluster_role.lower()
+        if cluster_role not in ("coordinator", "worker"):
+            env.errors.append(f"CLUSTER_ROLE: coordinator/worker 가 아님 ({cluster_role!r})")
+    circuit_slow_ms = env.number("CIRCUIT_SLOW_MS", 2000.0, minimum=0)
+    history_spill_dir = env.environ.get("HISTORY_SPILL_DIR", "logs/history")
+    checkpoint_path = env.environ.get("CHECKPOINT_PATH", "state/engines.ckpt")
+    ledger_path = env.environ.get("LEDGER_PATH", "logs/ledger.db")
+    log_level = env.text("LOG_LEVEL", "INFO").upper()
+    if log_level not in _LOG_LEVELS:
+        env.errors.append(f"LOG_LEVEL: {'/'.join(_LOG_LEVELS)} 중 하나가 아님 ({log_level!r})")
+        log_level = "INFO"
+    log_format = env.text("LOG_FORMAT", "text").lower()
+    if log_format not in _LOG_FORMATS:
+        env.errors.append(f"LOG_FORMAT: text/json 이 아님 ({log_format!r})")
+        log_format = "text"
+    risk_max_exposure = env.number("RISK_MAX_EXPOSURE", 0.0, minimum=0) or None
+    risk_max_daily_loss = env.number("RISK_MAX_DAILY_LOSS", 0.0, minimum=0) or None
+
+    settings = Settings(
+        upbit_access_key=_api_key(env, "UPBIT_ACCESS_KEY"),
+        upbit_secret_key=_api_key(env, "UPBIT_SECRET_KEY"),
+        upbit_api_url=env.text("UPBIT_API_URL", "https://api.upbit.com").rstrip("/"),
+        dry_run=env.flag("DRY_RUN", True),
+        log_level=log_level,
+        log_format=log_format,
+        log_backup_days=env.number("LOG_BACKUP_DAYS", 30, int, minimum=0),
+        polling_interval=polling_interval,
+        adaptive_polling=adaptive_polling,
+        min_polling_interval=min_polling_interval,
+        max_polling_interval=max_polling_interval,
+        request_budget=env.number("REQUEST_BUDGET", 8.0, minimum=0),
+        status_update_interval=env.number("STATUS_UPDATE_INTERVAL", 300, int, minimum=1),
+        max_workers=env.number("MAX_WORKERS", None, int, minimum=1),
+        assets_reload_interval=env.number("ASSETS_RELOAD_INTERVAL", 2.0, minimum=0),
+        shutdown_timeout=env.number("SHUTDOWN_TIMEOUT", 10.0, minimum=0),
+        shard_count=env.number("SHARDS", 1, int, minimum=1),
+        shard_collect_interval=env.number("SHARD_COLLECT_INTERVAL", None, minimum=0.01),
+        cluster_role=cluster_role,
+        cluster_address=env.text("CLUSTER_ADDRESS", "127.0.0.1:9200"),
+        cluster_worker_id=env.text("CLUSTER_WORKER_ID"),
+        quotation_timeout=env.number("QUOTATION_TIMEOUT", 3.0, minimum=0.01),
+        exchange_timeout=env.number("EXCHANGE_TIMEOUT", 10.0, minimum=0.01),
+        circuit_failure_threshold=env.number("CIRCUIT_FAILURE_THRESHOLD", 5, int, minimum=1),
+        circuit_slow_ms=circuit_slow_ms or None,
+        circuit_reset_timeout=env.number("CIRCUIT_RESET_TIMEOUT", 15.0, minimum=0),
+        stale_price_max_age=env.number("STALE_PRICE_MAX_AGE", 60.0, minimum=0),
+        hedge_requests=env.flag("HEDGE_REQUESTS", False),
+        risk_max_exposure=risk_max_exposure,
+        risk_max_daily_loss=risk_max_daily_loss,
+        accounts=_accounts(env, risk_max_exposure, risk_max_daily_loss),
+        checkpoint_path=checkpoint_path.strip() or None,
+        checkpoint_interval=env.number("CHECKPOINT_INTERVAL", 30.0, minimum=0),
+        checkpoint_max_age=env.number("CHECKPOINT_MAX_AGE", 900.0, minimum=0),
+        checkpoint_backfill=env.flag("CHECKPOINT_BACKFILL", True),
+        sim_fee_rate=env.number("SIM_FEE_RATE", 0.0005, minimum=0, maximum=1),
+        sim_latency_ms=env.number("SIM_LATENCY_MS", 50.0, minimum=0),
+        sim_slippage_bps=env.number("SIM_SLIPPAGE_BPS", 5.0, minimum=0),
+        discord_webhook_url=env.text("DISCORD_WEBHOOK_URL"),
+        slack_webhook_url=env.text("SLACK_WEBHOOK_URL"),
+        notify_queue_size=env.number("NOTIFY_QUEUE_SIZE", 10000, int, minimum=1),
+        notify_batch_interval=env.number("NOTIFY_BATCH_INTERVAL", 2.0, minimum=0),
+        trade_log_flush_interval=env.number("TRADE_LOG_FLUSH_INTERVAL", 1.0, minimum=0),
+        trade_log_max_bytes=env.number("TRADE_LOG_MAX_BYTES", 50 * 1024 * 1024, int, minimum=0),
+        trade_log_compress=env.flag("TRADE_LOG_COMPRESS", False),
+        order_history_size=env.number("ORDER_HISTORY_SIZE", 1000, int, minimum=1),
+        notification_history_size=env.number("NOTIFICATION_HISTORY_SIZE", 200, int, minimum=1),
+        history_spill_dir=history_spill_dir.strip() or None,
+        ledger_path=ledger_path.strip() or None,
+        record_path=env.text("RECORD_PATH"),
+        metrics_port=env.number("METRICS_PORT", None, int, minimum=1, maximum=65535),
+        metrics_host=env.text("METRICS_HOST", "127.0.0.1"),
+        api_port=env.number("API_PORT", None, int, minimum=1, maximum=65535),
+        api_host=env.text("API_HOST", "127.0.0.1"),
+        trace_sample_rate=env.number("TRACE_SAMPLE_RATE", 0.0, minimum=0, maximum=1),
+        trace_slow_ms=env.number("TRACE_SLOW_MS", None, minimum=0),
+        trace_buffer_size=env.number("TRACE_BUFFER_SIZE", 10000, int, minimum=1),
+    )
+    if env.errors:
+        raise ConfigError("환경변수 설정 오류: " + "; ".join(env.errors))
+    return settings
+
+
+# ----- 자산별 설정 (assets.json) -----
+
+class StrategyConfig(NamedTuple):
+    """매매 전략 파라미터 (Trigger)"""
+    buy_drop_threshold: float = -0.02   # 최근 고점 대비 이만큼 하락하면 매수
+    sell_profit_threshold: float = 0.0  # 평단가 대비 이 수익률 이상이면 매도
+    sell_ratio: float = 0.2             # 매도 시 보유량 중 매도 비율
+    min_interval_minutes: float = 5     # 최소 거래 간격
+    max_position_ratio: float = 0.8     # 최대 포지션 비율
+
+
+class ExecutorConfig(NamedTuple):
+    """주문 실행 파라미터 (Executor)"""
+    min_order_interval: float = 30.0    # 최소 주문 간격 (초)
+
+
+class NotifierConfig(NamedTuple):
+    """알림 파라미터 (Notifier)"""
+    enable_console: bool = True
+    enable_file: bool = True
+    enable_webhook: bool = False
+    webhook_url: Optional[str] = None
+
+
+class AssetConfig(NamedTuple):
+    """자산 설정 스냅샷 (불변, 다시 로드하면 통째로 교체)"""
+    symbol: str
+    base_currency: str
+    quote_currency: str
+    trade_amount: float
+    market: Optional[str] = None
+    strategy: StrategyConfig = StrategyConfig()
+    executor: ExecutorConfig = ExecutorConfig()
+    notifier: NotifierConfig = NotifierConfig()
+    account: Optional[str] = None  # None: 기본 계정
+
+    @property
+    def key(self) -> str:
+        """엔진 식별자 (같은 심볼을 여러 계정에서 거래할 수 있음)"""
+        return engine_key(self.symbol, self.account)
+
+    def to_dict(self) -> Dict:
+        """assets.json 항목 형식 (클러스터 전송용)"""
+        data = {
+            "symbol": self.symbol,
+            "base_currency": self.base_currency,
+            "quote_currency": self.quote_currency,
+            "trade_amount": self.trade_amount,
+            "strategy": self.strategy._asdict(),
+            "executor": self.executor._asdict(),
+            "notifier": self.notifier._asdict(),
+        }
+        if self.market:
+            data["market"] = self.market
+        if self.account:
+            data["account"] = self.account
+        return data
+
+
+def engine_key(symbol: str, account: Optional[str] = None) -> str:
+    """기본 계정은 심볼, 그 외 계정은 '심볼@계정'"""
+    return symbol if account is None else f"{symbol}@{account}"
+
+
+# 값 범위 (최소, 최대) - None 은 제한 없음
+_RANGES = {
+    "trade_amount": (0, None),
+    "buy_drop_threshold": (-1, 0),
+    "sell_profit_threshold": (-1, None),
+    "sell_ratio": (0, 1),
+    "min_interval_minutes": (0, None),
+    "max_position_ratio": (0, 1),
+    "min_order_interval": (0, None),
+}
+
+
+def _check_value(where: str, key: str, value, annotation, errors: List[str]):
+    if annotation is bool:
+        valid = isinstance(value, bool)
+    elif annotation is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif annotation is str:
+        valid = isinstance(value, str) and bool(value.strip())
+    else:  # Optional[str]
+        valid = value is None or isinstance(value, str)
+    if not valid:
+        errors.append(f"{where}.{key}: 잘못된 값 {value!r}")
+        return value
+    if annotation is float:
+        value = float(value)
+        low, high = _RANGES.get(key, (None, None))
+        if (low is not None and value < low) or (high is not None and value > high):
+            bounds = f"{'' if low is None else low}~{'' if high is None else high}"
+            errors.append(f"{where}.{key}: 범위({bounds}) 밖의 값 {value}")
+    return value
+
+
+def _parse_section(cls, data, where: str, errors: List[str]):
+    """NamedTuple 스키마로 dict 검증 (모르는 키, 타입, 범위)"""
+    if data is None:
+        return cls()
+    if not isinstance(data, dict):
+        errors.append(f"{where}: 객체가 아님")
+        return cls()
+    unknown = set(data) - set(cls._fields)
+    if unknown:
+        errors.append(f"{where}: 알 수 없는 항목 {sorted(unknown)}")
+    values = {}
+    for key, annotation in cls.__annotations__.items():
+        if key in data:
+            values[key] = _check_value(where, key, data[key], annotation, errors)
+    return cls(**values)
+
+
+def parse_asset(data: Dict) -> AssetConfig:
+    """assets.json 항목 하나를 검증해 AssetConfig 로 변환 (오류 시 ConfigError)"""
+    errors: List[str] = []
+    if not isinstance(data, dict):
+        raise ConfigError(f"자산 설정이 객체가 아님: {data!r}")
+    where = str(data.get("symbol", "?"))
+    sections = {"strategy": StrategyConfig, "executor": ExecutorConfig, "notifier": NotifierConfig}
+    top = {key: value for key, value in data.items() if key not in sections}
+    for key in ("symbol", "base_currency", "quote_currency", "trade_amount"):
+        if key not in top:
+            errors.append(f"{where}: 필수 항목 {key} 없음")
+    if errors:
+        raise ConfigError("자산 설정 오류: " + "; ".join(errors))
+
+    unknown = set(top) - set(AssetConfig._fields)
+    if unknown:
+        errors.append(f"{where}: 알 수 없는 항목 {sorted(unknown)}")
+    values = {}
+    for key in ("symbol", "base_currency", "quote_currency", "trade_amount", "market", "account"):
+        if key in top:
+            values[key] = _check_value(where, key, top[key], AssetConfig.__annotations__[key], errors)
+    account = values.get("account")
+    if isinstance(account, str) and not _ACCOUNT_NAME.match(account):
+        errors.append(f"{where}.account: 계정 이름은 영문 소문자/숫자/_ 만 가능 ({account!r})")
+    for key, cls in sections.items():
+        values[key] = _parse_section(cls, data.get(key), f"{where}.{key}", errors)
+    if errors:
+        raise ConfigError("자산 설정 오류: " + "; ".join(errors))
+    return AssetConfig(**values)
+
+
+def as_asset_config(value: Union[AssetConfig, Dict]) -> AssetConfig:
+    """dict(assets.json 항목, 클러스터 ASSIGN 등)이면 검증해서 변환"""
+    return value if isinstance(value, AssetConfig) else parse_asset(value)
+
+
+def parse_assets(items: Iterable[Union[AssetConfig, Dict]]) -> Tuple[AssetConfig, ...]:
+    """자산 목록 검증 (항목별 스키마 + 계정 내 심볼 중복)"""
+    assets = tuple(as_asset_config(item) for item in items)
+    counts = Counter(asset.key for asset in assets)
+    duplicates = sorted(key for key, count in counts.items() if count > 1)
+    if duplicates:
+        raise ConfigError(f"중복된 심볼이 있습니다: {duplicates}")
+    return assets
+
+
+def load_assets(path: str) -> Tuple[AssetConfig, ...]:
+    """assets.json 로드 및 검증"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ConfigError(f"{path}: 자산 목록(배열)이 아님")
+    return parse_assets(data)
@@ -0,0 +1,216 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from core.config import config
+from core.settings import AssetConfig, load_assets
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Upbit 시세 API 한 번에 조회할 최대 마켓 수
+COLLECT_BATCH_SIZE = 100
+
+
+def _set_log_file(name: str):
+    """자식 프로세스별 로그 파일 지정 (spawn 시 부모 환경변수를 물려받음)"""
+    os.environ["LOG_FILE"] = f"ats_v2.{name}.log"
+
+
+def collector_main(shm_name: str, assets: List[AssetConfig], interval: float, control):
+    """가격 수집 프로세스: 전체 자산 시세를 배치 조회해 공유 테이블에 기록"""
+    from core.data_collector import DataCollector
+    from core.shared_prices import SharedPriceTable
+
+    # 여러 계정이 같은 심볼을 거래해도 시세는 한 번만 수집
+    symbols = list(dict.fromkeys(asset.symbol for asset in assets))
+    for asset in assets:
+        if asset.market:
+            config.register_market(asset.symbol, asset.market)
+    table = SharedPriceTable(symbols, name=shm_name)
+    collector = DataCollector()
+    logger.info(f"가격 수집 프로세스 시작: {len(symbols)}개 자산, {interval}초 간격")
+    try:
+        while True:
+            for start in range(0, len(symbols), COLLECT_BATCH_SIZE):
+                prices = collector._get_upbit_prices(symbols[start:start + COLLECT_BATCH_SIZE])
+                now = time.time()
+                for symbol, price in prices.items():
+                    if price is not None:
+                        table.write(symbol, price, now)
+            # 종료 신호(또는 감시자 종료로 인한 EOF)가 오면 즉시 깨어남
+            if control.poll(interval):
+                break
+    finally:
+        table.close()
+        logger.info("가격 수집 프로세스 종료")
+
+
+def shard_main(shard_id: int, shm_name: str, symbols: List[str], assets: List[AssetConfig],
+               dry_run: bool, stale_after: float, control):
+    """샤드 워커 프로세스: 자산 일부의 엔진을 실행하고 공유 테이블에서 가격을 읽음"""
+    from core.engine.manager import TraderManager
+    from core.shared_prices import SharedPriceTable
+
+    table = SharedPriceTable(symbols, name=shm_name, stale_after=stale_after)
+    # 샤드마다 자기 체크포인트 파일 사용 (자산 목록과 SHARDS 가 같으면 같은 자산이 같은 샤드로 감)
+    checkpoint_path = f"{config.checkpoint_path}.{shard_id}" if config.checkpoint_path else ""
+    if config.record_path:
+        config.replace(record_path=f"{config.record_path}.{shard_id}")
+    manager = TraderManager(dry_run=dry_run, assets=assets, price_source=table,
+                            checkpoint_path=checkpoint_path)
+    manager.start()
+    logger.info(f"샤드 {shard_id} 시작: {len(assets)}개 자산")
+    try:
+        # 종료 신호(또는 감시자 종료로 인한 EOF)까지 대기
+        control.poll(None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        table.close()
+        logger.info(f"샤드 {shard_id} 종료")
+
+
+class ShardSupervisor:
+    """멀티프로세스 샤드 실행기
+
+    - 수집 프로세스 1개가 전체 자산 시세를 공유 메모리 가격 테이블에 기록
+    - 워커 프로세스 N개가 자산을 나눠 맡아 TraderEngine 을 실행 (GIL 을 나눠 CPU 코어 활용)
+    - 감시 스레드가 비정상 종료된 프로세스를 지수 백오프로 재시작
+
+    공유 메모리는 감시자가 소유하므로 자식이 죽어도 마지막 가격은 유지된다.
+    종료 신호는 자식별 파이프로 보낸다. 공유 락을 쓰는 multiprocessing.Event 와 달리
+    자식이 강제 종료돼도 망가지지 않으며, 감시자가 죽으면 자식도 EOF 로 깨어나 종료한다.
+    """
+
+    def __init__(self, config_file: str = "config/assets.json", shard_count: int = 2,
+                 dry_run: bool = None, collect_interval: float = None):
+        # 잘못된 설정은 자식 프로세스를 띄우기 전에 ConfigError
+        self.assets: List[AssetConfig] = list(load_assets(config_file))
+        self.shard_count = max(1, min(shard_count, len(self.assets)))
+        self.dry_run = dry_run if dry_run is not None else config.dry_run
+        self.collect_interval = collect_interval or config.min_polling_interval
+        self.symbols = list(dict.fromkeys(asset.symbol for asset in self.assets))
+        # 수집이 세 번 연속 실패하면 가격을 오래된 것으로 취급
+        self.stale_after = max(self.collect_interval * 3, 5.0)
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stopping = False
+        self._controls: Dict[str, object] = {}
+        self._table = None
+        self._processes: Dict[str, multiprocessing.process.BaseProcess] = {}
+        self._restarts: Dict[str, int] = {}
+        self._next_start: Dict[str, float] = {}
+        self._monitor_stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def shard_assets(self, shard_id: int) -> List[AssetConfig]:
+        """샤드에 배정된 자산 (라운드 로빈)"""
+        return self.assets[shard_id::self.shard_count]
+
+    def _spawn(self, name: str):
+        previous_control = self._controls.pop(name, None)
+        if previous_control is not None:
+            previous_control.close()
+        control, child_control = self._ctx.Pipe()
+        if name == "collector":
+            target, args = collector_main, (self._table.name, self.assets, self.collect_interval,
+                                            child_control)
+        else:
+            shard_id = int(name.split("-")[1])
+            target, args = shard_main, (shard_id, self._table.name, self.symbols, self.shard_assets(shard_id),
+                                        self.dry_run, self.stale_after, child_control)
+        # 자식의 로그 파일명은 시작 시점 환경변수로 전달
+        previous = os.environ.get("LOG_FILE")
+        _set_log_file(name)
+        try:
+            process = self._ctx.Process(target=target, args=args, name=name, daemon=False)
+            process.start()
+        finally:
+            if previous is None:
+                os.environ.pop("LOG_FILE", None)
+            else:
+                os.environ["LOG_FILE"] = previous
+        child_control.close()
+        self._controls[name] = control
+        self._processes[name] = process
+        logger.info(f"프로세스 시작: {name} (pid={process.pid})")
+
+    def start(self):
+        """가격 테이블 생성 및 모든 프로세스 시작"""
+        from core.shared_prices import SharedPriceTable
+
+        if self._table is not None:
+            return
+        self._table = SharedPriceTable(self.symbols, create=True)
+        self._stopping = False
+        with self._lock:
+            self._spawn("collector")
+            for shard_id in range(self.shard_count):
+                self._spawn(f"shard-{shard_id}")
+        self._monitor_stop.clear()
+        self._monitor = threading.Thread(target=self._watch, name="ShardSupervisor", daemon=True)
+        self._monitor.start()
+        logger.info(f"샤드 실행 시작: {len(self.assets)}개 자산, {self.shard_count}개 샤드")
+
+    def _watch(self):
+        while not self._monitor_stop.wait(1.0):
+            with self._lock:
+                for name, process in list(self._processes.items()):
+                    if process.is_alive() or self._stopping:
+                        continue
+                    now = time.monotonic()
+                    if name not in self._next_start:
+                        restarts = self._restarts.get(name, 0)
+                        delay = min(2 ** restarts, 60)
+                        self._next_start[name] = now + delay
+                        logger.error(f"프로세스 비정상 종료: {name} (exitcode={process.exitcode}), "
+                                     f"{delay}초 후 재시작")
+                    elif now >= self._next_start[name]:
+                        del self._next_start[name]
+                        self._restarts[name] = self._restarts.get(name, 0) + 1
+                        self._spawn(name)
+
+    def status(self) -> Dict[str, Dict]:
+        """프로세스별 상태"""
+        return {
+            name: {"pid": process.pid, "alive": process.is_alive(), "restarts": self._restarts.get(name, 0)}
+            for name, process in list(self._processes.items())
+        }
+
+    def alive_count(self) -> int:
+        return sum(1 for process in list(self._processes.values()) if process.is_alive())
+
+    def stop(self, timeout: float = None):
+        """모든 프로세스에 종료 신호 후 timeout 안에 끝나지 않으면 강제 종료"""
+        if self._table is None:
+            return
+        timeout = timeout if timeout is not None else config.shutdown_timeout
+        self._monitor_stop.set()
+        if self._monitor:
+            self._monitor.join(timeout=2)
+            self._monitor = None
+        self._stopping = True
+        for control in self._controls.values():
+            try:
+                control.send("stop")
+            except OSError:
+                pass
+
+        deadline = time.monotonic() + timeout
+        for name, process in list(self._processes.items()):
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"프로세스 강제 종료: {name}")
+                process.terminate()
+                process.join(1)
+        self._processes.clear()
+        for control in self._controls.values():
+            control.close()
+        self._controls.clear()
+        self._table.close()
+        self._table = None
+        logger.info("샤드 실행 종료")
@@ -0,0 +1,82 @@
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# 슬롯 구성: 시퀀스(홀수면 쓰는 중), 가격, 갱신 시각
+SLOT_DTYPE = np.dtype([("seq", "<u8"), ("price", "<f8"), ("ts", "<f8")])
+# 작성자가 쓰는 도중 멈춘 슬롯을 무한히 기다리지 않도록 재시도 제한
+READ_RETRIES = 1000
+
+
+class SharedPriceTable:
+    """프로세스 간 공유 최신가 테이블 (seqlock)
+
+    수집 프로세스 하나만 쓰고 여러 워커 프로세스가 공유 메모리를 직접 읽는다.
+    쓰기: seq 를 홀수로 올림 -> 가격/시각 기록 -> seq 를 짝수로 올림.
+    읽기: seq 가 짝수이고 읽기 전후로 같을 때까지 재시도 (락 없음, 복사 없음).
+    각 필드는 8바이트 정렬이라 x86/ARM64 에서 찢어진 읽기는 생기지 않는다.
+
+    TraderEngine 의 가격 조회 인터페이스(get_price/get_orderbook)를 그대로 제공한다.
+    """
+
+    def __init__(self, symbols: List[str], name: Optional[str] = None, create: bool = False,
+                 stale_after: float = 30.0):
+        self.symbols = list(symbols)
+        self.index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.stale_after = stale_after
+        size = max(len(self.symbols), 1) * SLOT_DTYPE.itemsize
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self._owner = create
+        slots = np.ndarray((max(len(self.symbols), 1),), dtype=SLOT_DTYPE, buffer=self._shm.buf)
+        if create:
+            slots[:] = 0
+        self._seq = slots["seq"]
+        self._price = slots["price"]
+        self._ts = slots["ts"]
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def write(self, symbol: str, price: float, ts: Optional[float] = None):
+        """가격 기록 (단일 작성자 전용)"""
+        i = self.index[symbol]
+        # 이전 작성자가 쓰는 도중 죽어 홀수로 남은 경우도 그대로 이어서 기록
+        start = int(self._seq[i]) | 1
+        self._seq[i] = start
+        self._price[i] = price
+        self._ts[i] = ts if ts is not None else time.time()
+        self._seq[i] = start + 1
+
+    def read(self, symbol: str) -> Tuple[Optional[float], float]:
+        """(가격, 갱신 시각) 읽기 (기록된 적 없으면 (None, 0))"""
+        i = self.index.get(symbol)
+        if i is None:
+            return None, 0.0
+        seq, price, ts = self._seq, self._price, self._ts
+        for _ in range(READ_RETRIES):
+            before = int(seq[i])
+            if before & 1:
+                continue
+            value, updated = float(price[i]), float(ts[i])
+            if int(seq[i]) == before:
+                return (value, updated) if before else (None, 0.0)
+        return None, 0.0
+
+    def get_price(self, symbol: str, max_age: float = None) -> Optional[float]:
+        """최신가 (stale_after 초보다 오래됐으면 None)"""
+        price, updated = self.read(symbol)
+        if price is None or time.time() - updated > self.stale_after:
+            return None
+        return price
+
+    def get_orderbook(self, symbol: str):
+        """호가는 공유하지 않음 (모의 체결은 슬리피지 모델 사용)"""
+        return None
+
+    def close(self):
+        self._seq = self._price = self._ts = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ShutdownCoordinator:
+    """전체 마감 시간이 있는 단계별 종료 절차
+
+    등록된 단계를 순서대로 실행하되, 각 단계는 (단계 제한 시간, 남은 전체 시간) 중
+    짧은 시간 안에 끝나야 한다. 시간을 넘긴 단계는 백그라운드에 남겨 두고 다음 단계로
+    넘어가므로 전체 종료 시간은 deadline 을 넘지 않는다. 단계별 소요 시간은 로그로 남긴다.
+    """
+
+    def __init__(self, deadline: float = 10.0):
+        self.deadline = deadline
+        self._phases: List[Tuple[str, Callable[[float], None], Optional[float]]] = []
+        self.timings: Dict[str, float] = {}
+
+    def add_phase(self, name: str, func: Callable[[float], None], timeout: Optional[float] = None):
+        """종료 단계 등록 (func 는 남은 허용 시간(초)을 인자로 받음)"""
+        self._phases.append((name, func, timeout))
+
+    def run(self) -> Dict[str, float]:
+        """등록된 단계 실행 후 단계별 소요 시간(초) 반환"""
+        started = time.monotonic()
+        end = started + self.deadline
+        for name, func, timeout in self._phases:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"종료 마감 시간 초과, 단계 생략: {name}")
+                self.timings[name] = 0.0
+                continue
+            budget = min(timeout, remaining) if timeout is not None else remaining
+            self.timings[name] = self._run_phase(name, func, budget)
+
+        total = time.monotonic() - started
+        self.timings["total"] = total
+        summary = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.timings.items())
+        logger.info(f"종료 완료: {summary}")
+        return self.timings
+
+    def _run_phase(self, name: str, func: Callable[[float], None], budget: float) -> float:
+        phase_started = time.monotonic()
+        errors = []
+
+        def target():
+            try:
+                func(budget)
+            except Exception as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=target, name=f"Shutdown-{name}", daemon=True)
+        worker.start()
+        worker.join(budget)
+        elapsed = time.monotonic() - phase_started
+        if worker.is_alive():
+            logger.warning(f"종료 단계 시간 초과: {name} ({budget:.2f}초)")
+        elif errors:
+            logger.error(f"종료 단계 실패: {name}: {errors[0]}")
+        return elapsed
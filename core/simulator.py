@@ -0,0 +1,170 @@
+import itertools
+import os
+import time
+from collections import deque
+from typing import Sequence, Tuple
+from utils.logger import get_logger
+from core.clock import clock
+
+logger = get_logger(__name__)
+
+# 업비트 원화 마켓 호가 단위 (하한가, 호가 단위) - 내림차순
+KRW_TICK_TABLE: Tuple[Tuple[float, float], ...] = (
+    (2_000_000, 1000),
+    (1_000_000, 500),
+    (500_000, 100),
+    (100_000, 50),
+    (10_000, 10),
+    (1_000, 1),
+    (100, 0.1),
+    (10, 0.01),
+    (1, 0.001),
+    (0.1, 0.0001),
+    (0.01, 0.00001),
+    (0.001, 0.000001),
+    (0.0001, 0.0000001),
+    (0, 0.00000001),
+)
+
+# 프로세스 전역 주문 번호 (itertools.count 의 next 는 GIL 하에서 원자적)
+_order_seq = itertools.count(1)
+_run_token = f"{os.getpid():x}{int(time.time()) & 0xFFFFFF:x}"
+
+
+def tick_size(price: float) -> float:
+    """가격에 해당하는 호가 단위 반환"""
+    for floor, tick in KRW_TICK_TABLE:
+        if price >= floor:
+            return tick
+    return KRW_TICK_TABLE[-1][1]
+
+
+def round_to_tick(price: float, side: str) -> float:
+    """호가 단위로 가격 보정 (매수는 올림, 매도는 내림)"""
+    tick = tick_size(price)
+    steps = price / tick
+    # 부동소수 오차 보정 후 방향에 맞게 반올림
+    nearest = round(steps)
+    if abs(steps - nearest) < 1e-9:
+        steps = nearest
+    elif side == "buy":
+        steps = int(steps) + 1
+    else:
+        steps = int(steps)
+    return round(steps * tick, 8)
+
+
+def next_order_id() -> str:
+    """충돌 없는 모의 주문 ID 생성"""
+    return f"sim_{_run_token}_{next(_order_seq)}"
+
+
+class BookSnapshot:
+    """시뮬레이터용 호가 스냅샷 (가격 오름/내림차순 정렬된 호가 목록)"""
+
+    __slots__ = ("timestamp", "ask_prices", "ask_sizes", "bid_prices", "bid_sizes")
+
+    def __init__(self, asks: Sequence[Tuple[float, float]], bids: Sequence[Tuple[float, float]],
+                 timestamp: float = None):
+        self.timestamp = timestamp if timestamp is not None else clock.time()
+        self.ask_prices = [float(p) for p, _ in asks]
+        self.ask_sizes = [float(s) for _, s in asks]
+        self.bid_prices = [float(p) for p, _ in bids]
+        self.bid_sizes = [float(s) for _, s in bids]
+
+    def walk(self, side: str, quantity: float) -> Tuple[float, float]:
+        """호가를 따라 체결 (체결 수량, 체결 금액) 반환"""
+        prices, sizes = (self.ask_prices, self.ask_sizes) if side == "buy" else (self.bid_prices, self.bid_sizes)
+        remaining = quantity
+        notional = 0.0
+        for price, size in zip(prices, sizes):
+            take = size if size < remaining else remaining
+            notional += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        return quantity - remaining, notional
+
+
+class SimFill:
+    """모의 체결 결과"""
+
+    __slots__ = ("order_id", "side", "requested", "quantity", "avg_price", "fee", "status", "timestamp")
+
+    def __init__(self, order_id: str, side: str, requested: float, quantity: float,
+                 avg_price: float, fee: float, status: str, timestamp: float):
+        self.order_id = order_id
+        self.side = side
+        self.requested = requested
+        self.quantity = quantity
+        self.avg_price = avg_price
+        self.fee = fee
+        self.status = status
+        self.timestamp = timestamp
+
+
+class FillSimulator:
+    """호가, 호가 단위, 수수료, 지연을 반영하는 모의 체결 엔진
+
+    호가 스냅샷이 있으면 지연 시간 이후 시점의 스냅샷을 따라 체결하고,
+    없으면 기준 가격에 슬리피지를 더해 호가 단위로 보정한 가격으로 체결한다.
+    스냅샷은 ``walk(side, quantity)`` 메서드를 가진 객체면 된다. 최소 주문 금액 미만 매수는
+    실거래와 같이 최소 금액으로 올려 체결하고, 매도는 거부한다.
+    """
+
+    def __init__(self, market: str, fee_rate: float = 0.0005, latency_ms: float = 0.0,
+                 slippage_bps: float = 0.0, min_order_amount: float = 5000,
+                 history_size: int = 64):
+        self.market = market
+        self.fee_rate = fee_rate
+        self.latency = latency_ms / 1000.0
+        self.slippage = slippage_bps / 10000.0
+        self.min_order_amount = min_order_amount
+        self._books = deque(maxlen=history_size)
+
+    def update_book(self, snapshot) -> None:
+        """호가 스냅샷 추가 (시간순)"""
+        self._books.append(snapshot)
+
+    def _book_at(self, ts: float):
+        """주문 도착 시점(ts)에 유효한 최신 스냅샷"""
+        books = self._books
+        if not books:
+            return None
+        # 대부분 마지막 스냅샷이 해당되므로 뒤에서부터 탐색
+        for i in range(len(books) - 1, -1, -1):
+            book = books[i]
+            if book.timestamp <= ts:
+                return book
+        return books[0]
+
+    def execute(self, side: str, quantity: float, ref_price: float,
+                timestamp: float = None) -> SimFill:
+        """시장가 주문 모의 체결"""
+        submitted = timestamp if timestamp is not None else clock.time()
+        arrival = submitted + self.latency
+        order_id = next_order_id()
+
+        if quantity <= 0 or ref_price is None or ref_price <= 0:
+            return SimFill(order_id, side, quantity, 0.0, 0.0, 0.0, "rejected", arrival)
+        if side == "buy" and quantity * ref_price < self.min_order_amount:
+            # 실거래(금액 기준 시장가 매수)와 같이 최소 주문 금액만큼 매수
+            quantity = self.min_order_amount / ref_price
+
+        book = self._book_at(arrival)
+        if book is not None:
+            filled, notional = book.walk(side, quantity)
+            if filled <= 0:
+                return SimFill(order_id, side, quantity, 0.0, 0.0, 0.0, "rejected", arrival)
+            avg_price = notional / filled
+        else:
+            filled = quantity
+            slipped = ref_price * (1 + self.slippage) if side == "buy" else ref_price * (1 - self.slippage)
+            avg_price = round_to_tick(slipped, side)
+            notional = filled * avg_price
+
+        if side == "sell" and notional < self.min_order_amount:
+            return SimFill(order_id, side, quantity, 0.0, 0.0, 0.0, "rejected", arrival)
+
+        status = "filled" if filled >= quantity else "partial"
+        return SimFill(order_id, side, quantity, filled, avg_price, notional * self.fee_rate, status, arrival)
@@ -0,0 +1,148 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional
+
+_EMPTY = MappingProxyType({})
+
+
+class EngineSnapshot(NamedTuple):
+    """엔진 한 개의 상태 스냅샷 (불변)"""
+
+    symbol: str
+    is_running: bool
+    run_count: int
+    error_count: int
+    last_run_time: float
+    current_price: Optional[float]
+    price_time: float
+    portfolio: Mapping
+    last_action: Optional[str]
+    signal_strength: float
+    updated_at: float
+
+    @property
+    def current_value(self) -> float:
+        return self.portfolio.get("current_value") or 0.0
+
+    @property
+    def profit(self) -> float:
+        return self.portfolio.get("profit") or 0.0
+
+    def to_dict(self) -> Dict:
+        """기존 TraderEngine.get_status() 형식의 dict"""
+        status = self._asdict()
+        status["portfolio"] = dict(self.portfolio)
+        return status
+
+
+class StatusAggregate(NamedTuple):
+    """전체 엔진 스냅샷 집계 (불변)"""
+
+    engines: Mapping[str, EngineSnapshot]
+    total_value: float
+    total_profit: float
+    total_profit_rate: float
+    version: int
+    updated_at: float
+
+
+class SystemStatus(NamedTuple):
+    """매니저 상태 + 엔진 집계 (불변)"""
+
+    is_running: bool
+    total_engines: int
+    active_threads: int
+    dry_run: bool
+    engines: Mapping[str, EngineSnapshot]
+    total_value: float
+    total_profit: float
+    total_profit_rate: float
+    updated_at: float
+
+    def to_dict(self) -> Dict:
+        """기존 get_overall_status() 형식의 dict"""
+        return {
+            "manager": {
+                "is_running": self.is_running,
+                "total_engines": self.total_engines,
+                "active_threads": self.active_threads,
+                "dry_run": self.dry_run,
+                "total_value": self.total_value,
+                "total_profit": self.total_profit,
+                "total_profit_rate": self.total_profit_rate,
+                "updated_at": self.updated_at,
+            },
+            "engines": {symbol: snapshot.to_dict() for symbol, snapshot in self.engines.items()},
+        }
+
+
+class StatusBoard:
+    """엔진 상태 게시판
+
+    엔진은 사이클마다 자기 스냅샷을 게시하고(publish), 조회 측은 메모리에 있는
+    스냅샷만 읽는다. 조회 경로에서는 가격 조회 등 네트워크 호출이 일어나지 않는다.
+
+    합계는 게시할 때 이전 스냅샷과의 차이만 반영해 갱신하고, 집계 객체는
+    변경이 있을 때만 새로 만들어 캐시한다 (변경 없으면 같은 객체 반환).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, EngineSnapshot] = {}
+        self._total_value = 0.0
+        self._total_profit = 0.0
+        self._version = 0
+        self._aggregate = StatusAggregate(_EMPTY, 0.0, 0.0, 0.0, 0, 0.0)
+
+    def publish(self, snapshot: EngineSnapshot):
+        """엔진 스냅샷 게시"""
+        with self._lock:
+            previous = self._engines.get(snapshot.symbol)
+            if previous is not None:
+                self._total_value -= previous.current_value
+                self._total_profit -= previous.profit
+            self._engines[snapshot.symbol] = snapshot
+            self._total_value += snapshot.current_value
+            self._total_profit += snapshot.profit
+            self._version += 1
+
+    def remove(self, symbol: str):
+        """엔진 스냅샷 제거"""
+        with self._lock:
+            previous = self._engines.pop(symbol, None)
+            if previous is None:
+                return
+            self._total_value -= previous.current_value
+            self._total_profit -= previous.profit
+            self._version += 1
+
+    def get(self, symbol: str) -> Optional[EngineSnapshot]:
+        """엔진 스냅샷 조회"""
+        return self._engines.get(symbol)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def aggregate(self) -> StatusAggregate:
+        """전체 집계 (변경이 없으면 캐시된 객체 반환)"""
+        cached = self._aggregate
+        if cached.version == self._version:
+            return cached
+        with self._lock:
+            total_value = self._total_value
+            total_profit = self._total_profit
+            aggregate = StatusAggregate(
+                engines=MappingProxyType(dict(self._engines)),
+                total_value=total_value,
+                total_profit=total_profit,
+                total_profit_rate=(total_profit / total_value * 100) if total_value > 0 else 0,
+                version=self._version,
+                updated_at=time.time()
+            )
+            self._aggregate = aggregate
+        return aggregate
+
+
+status_board = StatusBoard()
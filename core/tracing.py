@@ -0,0 +1,246 @@
+import contextvars
+import functools
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from utils.logger import get_logger
+from core.config import config
+from core.metrics import add_route
+
+logger = get_logger(__name__)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("ats_current_span", default=None)
+_span_ids = itertools.count(1)
+
+# perf_counter_ns 를 벽시계 시각으로 변환하기 위한 기준점
+_WALL_ORIGIN_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class Span:
+    """하나의 처리 구간"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns",
+                 "thread_id", "attrs", "_root", "_pending", "_sampled", "_token")
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"], attrs: Dict,
+                 sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.attrs = attrs
+        self.thread_id = threading.get_ident()
+        self.start_ns = 0
+        self.end_ns = 0
+        self._root = parent._root if parent is not None else self
+        self._pending: Optional[List["Span"]] = None if parent is not None else []
+        self._sampled = sampled
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, key: str, value):
+        """속성 추가"""
+        self.attrs[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._root._pending.append(self)
+        if self._root is self:
+            tracer._finish_trace(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": (_WALL_ORIGIN_NS + self.start_ns) / 1e9,
+            "duration_ms": self.duration_ms,
+            "thread_id": self.thread_id,
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    """샘플링되지 않은 구간 (아무 것도 기록하지 않음)"""
+
+    __slots__ = ()
+    trace_id = None
+
+    def set(self, key: str, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """경량 구간 추적기
+
+    루트 구간(start_trace)에서 샘플링 여부를 결정하고, 그 안에서 열린
+    하위 구간(span)은 같은 trace_id 를 공유한다. 완료된 트레이스는 고정 크기
+    링 버퍼에 저장되며 JSON 또는 Chrome trace 형식으로 내보낼 수 있다.
+
+    slow_threshold_ms 를 지정하면 샘플링되지 않은 트레이스도 임시로 기록해 두었다가
+    루트 구간이 임계값을 넘은 경우에만 버퍼에 남긴다 (꼬리 지연 분석용).
+    """
+
+    def __init__(self, capacity: int = 10000, sample_rate: float = 0.0,
+                 slow_threshold_ms: Optional[float] = None):
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self._buffer: deque = deque(maxlen=capacity)
+        self._trace_ids = itertools.count(1)
+        self._prefix = f"{os.getpid():x}"
+
+    def configure(self, capacity: int, sample_rate: float, slow_threshold_ms: Optional[float]):
+        """설정 반영 (버퍼 크기가 바뀌면 최근 구간은 유지한 채 교체)"""
+        if capacity != self._buffer.maxlen:
+            self._buffer = deque(self._buffer, maxlen=capacity)
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_threshold_ms is not None
+
+    def start_trace(self, name: str, **attrs):
+        """새 트레이스의 루트 구간 시작"""
+        sampled = self.sample_rate >= 1.0 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        if not sampled and self.slow_threshold_ms is None:
+            # 하위 구간이 이전 트레이스에 붙지 않도록 현재 구간을 비움
+            _current_span.set(None)
+            return NOOP_SPAN
+        trace_id = f"{self._prefix}-{next(self._trace_ids):x}"
+        return Span(name, trace_id, None, attrs, sampled)
+
+    def span(self, name: str, **attrs):
+        """현재 트레이스의 하위 구간 시작 (트레이스가 없으면 no-op)"""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(name, parent.trace_id, parent, attrs)
+
+    def current_trace_id(self) -> Optional[str]:
+        """현재 트레이스 ID"""
+        span = _current_span.get()
+        return span.trace_id if span is not None else None
+
+    def record(self, name: str, start: float, end: float, **attrs):
+        """이미 끝난 구간을 독립 트레이스로 기록 (perf_counter 초 단위)"""
+        if not self.enabled:
+            return
+        duration_ms = (end - start) * 1000
+        sampled = self.sample_rate >= 1.0 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        if not sampled and (self.slow_threshold_ms is None or duration_ms < self.slow_threshold_ms):
+            return
+        span = Span(name, f"{self._prefix}-{next(self._trace_ids):x}", None, attrs)
+        span.start_ns = int(start * 1e9)
+        span.end_ns = int(end * 1e9)
+        self._buffer.append(span)
+
+    def _finish_trace(self, root: Span):
+        keep = root._sampled or (
+            self.slow_threshold_ms is not None and root.duration_ms >= self.slow_threshold_ms
+        )
+        if keep:
+            self._buffer.extend(root._pending)
+        root._pending = []
+
+    def spans(self) -> List[Span]:
+        """버퍼에 있는 구간 목록 (복사본)"""
+        return list(self._buffer)
+
+    def clear(self):
+        self._buffer.clear()
+
+    def export_json(self) -> List[Dict]:
+        """구간 목록을 dict 리스트로 내보내기"""
+        return [span.to_dict() for span in self.spans()]
+
+    def export_chrome(self) -> Dict:
+        """Chrome trace (chrome://tracing, Perfetto) 형식으로 내보내기"""
+        pid = os.getpid()
+        events = []
+        for span in self.spans():
+            args = dict(span.attrs)
+            args["trace_id"] = span.trace_id
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": (_WALL_ORIGIN_NS + span.start_ns) / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str, fmt: str = "chrome") -> str:
+        """파일로 내보내기"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = self.export_chrome() if fmt == "chrome" else self.export_json()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        logger.info(f"트레이스 저장: {path} ({len(self._buffer)}개 구간)")
+        return path
+
+
+def traced(name: str):
+    """함수 실행을 현재 트레이스의 하위 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# 설정이 로드되기 전까지는 비활성 상태 (import 만으로 설정을 읽지 않도록)
+tracer = Tracer()
+config.on_load(lambda settings: tracer.configure(
+    settings.trace_buffer_size, settings.trace_sample_rate, settings.trace_slow_ms))
+
+
+def _serve_traces(handler):
+    """GET /debug/traces?format=chrome|json"""
+    query = handler.path.split("?", 1)[1] if "?" in handler.path else ""
+    fmt = "json" if "format=json" in query else "chrome"
+    data = tracer.export_json() if fmt == "json" else tracer.export_chrome()
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    handler.send_response(200)
+    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+add_route("/debug/traces", _serve_traces)
@@ -0,0 +1,250 @@
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from utils.logger import get_logger
+from core.config import config
+from core.metrics import QUEUE_DEPTH
+
+logger = get_logger(__name__)
+
+# flush 요청 표식
+_FLUSH = object()
+
+
+class _Segment:
+    """열려 있는 로그 파일 세그먼트"""
+
+    __slots__ = ("path", "handle", "date", "size", "buffer", "buffered")
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.handle = open(path, "a", encoding="utf-8")
+        self.size = self.handle.tell()
+        # 기존 파일이면 마지막 수정일 기준으로 날짜 판단
+        mtime = os.path.getmtime(path) if self.size else time.time()
+        self.date = datetime.fromtimestamp(mtime).strftime("%Y%m%d")
+        self.buffer: List[str] = []
+        self.buffered = 0
+
+
+class TradeLogWriter:
+    """심볼별 JSONL 거래 로그를 하나의 스레드에서 기록하는 공용 작성기
+
+    파일 핸들을 열어 둔 채 버퍼에 모았다가 flush_interval 또는
+    flush_bytes 를 넘으면 한 번에 기록한다. 날짜가 바뀌거나 max_bytes 를
+    넘으면 `<파일>.<YYYYMMDD>[.<n>]` 으로 교체하고, 필요하면 gzip 압축한다.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, flush_bytes: int = 64 * 1024,
+                 max_bytes: int = 50 * 1024 * 1024, compress: bool = False,
+                 max_open_files: int = 256):
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.max_open_files = max_open_files
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._segments: "OrderedDict[str, _Segment]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._flushed = threading.Condition()
+        self._flush_generation = 0
+        self.written = 0
+
+    def start(self):
+        """작성 스레드 시작"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="TradeLogWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """남은 버퍼를 기록하고 파일을 닫음"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def write(self, path: str, record: Dict):
+        """레코드 기록 요청 (블로킹하지 않음)"""
+        self._queue.put((path, record))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """버퍼를 디스크에 기록할 때까지 대기"""
+        if not self._running:
+            return False
+        with self._flushed:
+            target = self._flush_generation + 1
+            self._queue.put(_FLUSH)
+            return self._flushed.wait_for(lambda: self._flush_generation >= target, timeout)
+
+    def queue_depth(self) -> int:
+        """대기 중인 레코드 수"""
+        return self._queue.qsize()
+
+    def _run(self):
+        last_flush = time.time()
+        while True:
+            timeout = max(self.flush_interval - (time.time() - last_flush), 0.01)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            stop = item is None
+            force = stop or item is _FLUSH
+            if item and not force:
+                self._append(*item)
+                # 대기 중인 레코드를 한 번에 처리
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None or item is _FLUSH:
+                        stop = stop or item is None
+                        force = True
+                        break
+                    self._append(*item)
+
+            if force or time.time() - last_flush >= self.flush_interval:
+                self._flush_all()
+                last_flush = time.time()
+                if force:
+                    with self._flushed:
+                        self._flush_generation += 1
+                        self._flushed.notify_all()
+
+            if stop:
+                self._close_all()
+                break
+
+    def _segment(self, path: str) -> _Segment:
+        segment = self._segments.get(path)
+        if segment is not None:
+            self._segments.move_to_end(path)
+            return segment
+        if len(self._segments) >= self.max_open_files:
+            _, oldest = self._segments.popitem(last=False)
+            self._close_segment(oldest)
+        segment = _Segment(path)
+        self._segments[path] = segment
+        return segment
+
+    def _append(self, path: str, record: Dict):
+        try:
+            segment = self._segment(path)
+            today = time.strftime("%Y%m%d")
+            if segment.date != today or (self.max_bytes and segment.size >= self.max_bytes):
+                segment = self._rotate(segment)
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            segment.buffer.append(line)
+            size = len(line.encode("utf-8"))
+            segment.buffered += size
+            segment.size += size
+            self.written += 1
+            if segment.buffered >= self.flush_bytes:
+                self._flush_segment(segment)
+        except Exception as e:
+            logger.error(f"거래 로그 기록 실패 ({path}): {e}")
+
+    def _flush_segment(self, segment: _Segment):
+        if segment.buffer:
+            segment.handle.write("".join(segment.buffer))
+            segment.handle.flush()
+            segment.buffer.clear()
+            segment.buffered = 0
+
+    def _flush_all(self):
+        for segment in self._segments.values():
+            try:
+                self._flush_segment(segment)
+            except Exception as e:
+                logger.error(f"거래 로그 flush 실패 ({segment.path}): {e}")
+
+    def _close_segment(self, segment: _Segment):
+        try:
+            self._flush_segment(segment)
+        finally:
+            segment.handle.close()
+
+    def _close_all(self):
+        for segment in self._segments.values():
+            try:
+                self._close_segment(segment)
+            except Exception as e:
+                logger.error(f"거래 로그 닫기 실패 ({segment.path}): {e}")
+        self._segments.clear()
+
+    def _rotate(self, segment: _Segment) -> _Segment:
+        """현재 세그먼트를 닫고 날짜 접미사로 교체"""
+        path = segment.path
+        self._close_segment(segment)
+        del self._segments[path]
+
+        target = f"{path}.{segment.date}"
+        index = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{path}.{segment.date}.{index}"
+            index += 1
+        os.replace(path, target)
+        logger.info(f"거래 로그 교체: {target}")
+
+        if self.compress:
+            threading.Thread(target=self._compress, args=(target,), name="TradeLogCompress", daemon=True).start()
+        return self._segment(path)
+
+    @staticmethod
+    def _compress(path: str):
+        """닫힌 세그먼트 gzip 압축"""
+        try:
+            with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(path)
+        except Exception as e:
+            logger.error(f"거래 로그 압축 실패 ({path}): {e}")
+
+
+_writer: Optional[TradeLogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_trade_log_writer() -> TradeLogWriter:
+    """프로세스 공용 거래 로그 작성기 (최초 호출 시 시작)"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = TradeLogWriter(
+                    flush_interval=config.trade_log_flush_interval,
+                    max_bytes=config.trade_log_max_bytes,
+                    compress=config.trade_log_compress
+                )
+                writer.start()
+                QUEUE_DEPTH.labels("trade_log").set_function(writer.queue_depth)
+                _writer = writer
+    return _writer
+
+
+def shutdown_trade_log_writer(timeout: float = 5.0):
+    """공용 거래 로그 작성기 종료"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop(timeout)
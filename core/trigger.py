@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import Optional, Sequence
+from core.settings import StrategyConfig
+from core.checkpoint import TriggerState
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -6,30 +8,36 @@ logger = get_logger(__name__)
 class Trigger:
     """자산별 매매 시그널 판단기"""
     
-    def __init__(self, symbol: str, config: dict = None):
+    # 유지할 가격 히스토리 길이
+    HISTORY_SIZE = 100
+    
+    def __init__(self, symbol: str, config: StrategyConfig = None):
         self.symbol = symbol
-        self.config = config or self._default_config()
+        # 불변 스냅샷이라 설정 변경은 참조 교체로만 반영됨
+        self.config = config or StrategyConfig()
         self.price_history = []
         self.last_action = None
         self.last_action_price = None
     
-    def _default_config(self) -> dict:
-        """기본 설정"""
-        return {
-            "buy_drop_threshold": -0.02,  # 2% 하락시 매수
-            "sell_profit_threshold": 0.0,  # 평단가 이상이면 매도
-            "sell_ratio": 0.2,  # 매도 비율
-            "min_interval_minutes": 5,  # 최소 거래 간격
-            "max_position_ratio": 0.8  # 최대 포지션 비율
-        }
-    
     def update_price(self, price: float):
         """가격 히스토리 업데이트"""
         self.price_history.append(price)
-        # 최근 100개만 유지
-        if len(self.price_history) > 100:
+        # 최근 HISTORY_SIZE 개만 유지
+        if len(self.price_history) > self.HISTORY_SIZE:
             self.price_history.pop(0)
     
+    def get_state(self, updated_at: float) -> TriggerState:
+        """체크포인트용 상태 (updated_at: 마지막 가격 표본 시각)"""
+        return TriggerState(self.symbol, tuple(self.price_history), self.last_action,
+                            self.last_action_price, updated_at)
+    
+    def restore_state(self, state: TriggerState, backfill: Sequence[float] = ()):
+        """체크포인트 상태 복원 후 그 사이 빠진 가격 표본(backfill)을 이어 붙임"""
+        history = list(state.price_history) + list(backfill)
+        self.price_history = history[-self.HISTORY_SIZE:]
+        self.last_action = state.last_action
+        self.last_action_price = state.last_action_price
+    
     def check_buy_signal(self, current_price: float, portfolio) -> bool:
         """매수 시그널 체크"""
         if len(self.price_history) < 10:
@@ -40,7 +48,7 @@ class Trigger:
         drop_rate = (current_price - recent_high) / recent_high
         
         # 하락 임계값 체크
-        if drop_rate <= self.config["buy_drop_threshold"]:
+        if drop_rate <= self.config.buy_drop_threshold:
             logger.info(f"[{self.symbol}] 매수 시그널: {drop_rate:.2%} 하락")
             return True
         
@@ -54,7 +62,7 @@ class Trigger:
         profit, profit_rate = portfolio.get_profit_loss(current_price)
         
         # 수익 실현 체크 (평단가 이상)
-        if profit_rate >= self.config["sell_profit_threshold"] * 100:
+        if profit_rate >= self.config.sell_profit_threshold * 100:
             logger.info(f"[{self.symbol}] 매도 시그널: {profit_rate:.2f}% 수익")
             return True
 
@@ -81,6 +89,35 @@ class Trigger:
         
         return "hold"
     
+    def get_urgency(self, current_price: float, portfolio) -> float:
+        """매매 조건 근접도/변동성 기반 긴급도 (0: 여유, 1: 곧 시그널)"""
+        if current_price is None:
+            return 0.0
+        
+        urgency = 0.0
+        buy_threshold = self.config.buy_drop_threshold
+        recent = self.price_history[-10:]
+        if len(recent) >= 10 and buy_threshold < 0:
+            # 최근 고점 대비 하락률이 매수 임계값에 얼마나 가까운지
+            recent_high = max(recent)
+            drop_rate = (current_price - recent_high) / recent_high
+            urgency = max(urgency, drop_rate / buy_threshold)
+            
+            # 변동성: 틱당 변화율 표준편차가 임계값의 1/3 이상이면 최대
+            returns = [(b - a) / a for a, b in zip(recent, recent[1:]) if a]
+            if returns:
+                mean = sum(returns) / len(returns)
+                std = (sum((r - mean) ** 2 for r in returns) / len(returns)) ** 0.5
+                urgency = max(urgency, std * 3 / -buy_threshold)
+        
+        if portfolio.holdings > 0:
+            # 수익률이 매도 임계값까지 2%p 이내로 다가오면 선형 증가
+            _, profit_rate = portfolio.get_profit_loss(current_price)
+            gap = self.config.sell_profit_threshold * 100 - profit_rate
+            urgency = max(urgency, 1.0 - gap / 2.0)
+        
+        return min(max(urgency, 0.0), 1.0)
+    
     def get_signal_strength(self, current_price: float) -> float:
         """시그널 강도 반환 (0-1)"""
         if len(self.price_history) < 10:
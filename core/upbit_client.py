@@ -1,30 +1,46 @@
-import jwt
 import uuid
 import hashlib
-import requests
+import threading
 import time
 from urllib.parse import urlencode
 from typing import Dict, List, Optional
 from utils.logger import get_logger
 from core.config import config
+from core.metrics import record_http
+from core.tracing import traced
+from core.resilience import CircuitOpenError, RateLimitError, TokenBucket, endpoint_timeout, get_breaker
 
 logger = get_logger(__name__)
 
+# 업비트 계정별 요청 한도 (초당, 주문 생성 / 그 외 거래 API)
+ORDER_RATE_LIMIT = 8
+EXCHANGE_RATE_LIMIT = 30
+
 class UpbitClient:
-    """업비트 API 클라이언트"""
+    """업비트 API 클라이언트
+
+    요청 한도와 차단기는 계정(API 키)별이다. 한 계정의 주문 폭주나 장애가 다른 계정의
+    주문을 막지 않는다.
+    """
     
-    def __init__(self, access_key: str = None, secret_key: str = None):
+    def __init__(self, access_key: str = None, secret_key: str = None, account: str = None):
         # 환경변수에서 API 키 가져오기
         self.access_key = access_key or config.upbit_access_key
         self.secret_key = secret_key or config.upbit_secret_key
+        self.account = account
         
         if not self.access_key or not self.secret_key:
             raise ValueError("업비트 API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
         
-        self.base_url = "https://api.upbit.com"
+        self.base_url = config.upbit_api_url
+        self._order_bucket = TokenBucket(ORDER_RATE_LIMIT)
+        self._request_bucket = TokenBucket(EXCHANGE_RATE_LIMIT)
+        # requests/jwt 는 import 비용이 커서 실거래 클라이언트를 만들 때 처음 로드
+        import requests
         self.session = requests.Session()
-        logger.info("업비트 클라이언트 초기화 완료")
+        logger.info("업비트 클라이언트 초기화 완료" + (f" ({account})" if account else ""))
     
+    @traced("upbit.jwt_sign")
     def _generate_jwt_token(self, query_params: Dict = None) -> str:
         """JWT 토큰 생성"""
         payload = {
@@ -44,17 +60,42 @@ class UpbitClient:
                 'query_hash_alg': 'SHA512'
             })
         
+        import jwt
         jwt_token = jwt.encode(payload, self.secret_key, algorithm='HS256')
         return f"Bearer {jwt_token}"
     
+    @traced("upbit.http")
+    def _send(self, method: str, endpoint: str, **kwargs):
+        """세션 요청 실행 (응답 상태 메트릭 기록, 엔드포인트별 제한 시간/차단기, 계정별 요청 한도 적용)"""
+        breaker = get_breaker(endpoint if self.account is None else f"{endpoint}@{self.account}")
+        if not breaker.allow():
+            raise CircuitOpenError(f"{endpoint} 차단기 열림")
+        kwargs.setdefault("timeout", endpoint_timeout(endpoint))
+        bucket = self._order_bucket if method == "POST" and endpoint == "/v1/orders" else self._request_bucket
+        if not bucket.acquire(kwargs["timeout"]):
+            raise RateLimitError(f"{endpoint} 요청 한도 대기 시간 초과")
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{endpoint}", **kwargs)
+        except Exception:
+            record_http(endpoint, "error")
+            breaker.record(None)
+            raise
+        record_http(endpoint, response.status_code)
+        # 4xx(잔고 부족 등 요청 자체의 문제)는 거래소 장애로 보지 않음 (429 제외)
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record(None)
+        else:
+            breaker.record(time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+    
     def get_ticker(self, market: str) -> Optional[Dict]:
         """현재가 조회"""
         try:
-            url = f"{self.base_url}/v1/ticker"
             params = {'markets': market}
             
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
+            response = self._send("GET", "/v1/ticker", params=params)
             
             data = response.json()
             if data and len(data) > 0:
@@ -68,11 +109,9 @@ class UpbitClient:
     def get_accounts(self) -> List[Dict]:
         """계좌 정보 조회"""
         try:
-            url = f"{self.base_url}/v1/accounts"
             headers = {'Authorization': self._generate_jwt_token()}
             
-            response = self.session.get(url, headers=headers)
-            response.raise_for_status()
+            response = self._send("GET", "/v1/accounts", headers=headers)
             
             return response.json()
             
@@ -80,12 +119,11 @@ class UpbitClient:
             logger.error(f"업비트 계좌 조회 실패: {e}")
             return []
     
+    @traced("upbit.place_order")
     def place_order(self, market: str, side: str, ord_type: str, 
-                   volume: float = None, price: float = None) -> Optional[Dict]:
-        """주문 실행"""
+                   volume: float = None, price: float = None, identifier: str = None) -> Optional[Dict]:
+        """주문 실행 (identifier: 응답을 못 받았을 때 get_order 로 조회할 주문 식별자)"""
         try:
-            url = f"{self.base_url}/v1/orders"
-            
             params = {
                 'market': market,
                 'side': side,  # 'bid' (매수) or 'ask' (매도)
@@ -96,14 +134,15 @@ class UpbitClient:
                 params['volume'] = str(volume)
             if price:
                 params['price'] = str(int(price))
+            if identifier:
+                params['identifier'] = identifier
             
             headers = {
                 'Authorization': self._generate_jwt_token(params),
                 'Content-Type': 'application/json; charset=utf-8'
             }
             
-            response = self.session.post(url, json=params, headers=headers)
-            response.raise_for_status()
+            response = self._send("POST", "/v1/orders", json=params, headers=headers)
             
             order_result = response.json()
             logger.info(f"업비트 주문 성공 [{market}]: {side} {volume} @ {price}")
@@ -116,13 +155,11 @@ class UpbitClient:
     def cancel_order(self, uuid_or_identifier: str) -> Optional[Dict]:
         """주문 취소"""
         try:
-            url = f"{self.base_url}/v1/order"
             params = {'uuid': uuid_or_identifier}
             
             headers = {'Authorization': self._generate_jwt_token(params)}
             
-            response = self.session.delete(url, params=params, headers=headers)
-            response.raise_for_status()
+            response = self._send("DELETE", "/v1/order", params=params, headers=headers)
             
             return response.json()
             
@@ -130,10 +167,25 @@ class UpbitClient:
             logger.error(f"업비트 주문 취소 실패: {e}")
             return None
     
+    def get_order(self, order_uuid: str = None, identifier: str = None) -> Optional[Dict]:
+        """개별 주문 조회 (주문이 없으면 None)
+
+        결과를 모르는 주문을 확정하는 데 쓰므로 조회 실패는 '주문 없음'과 구분되도록 예외로 올린다.
+        """
+        params = {'uuid': order_uuid} if order_uuid else {'identifier': identifier}
+        headers = {'Authorization': self._generate_jwt_token(params)}
+        try:
+            response = self._send("GET", "/v1/order", params=params, headers=headers)
+        except Exception as e:
+            # HTTPError 의 응답 (404: 해당 주문 없음)
+            if getattr(getattr(e, "response", None), "status_code", None) == 404:
+                return None
+            raise
+        return response.json()
+    
     def get_orders(self, market: str = None, state: str = 'wait') -> List[Dict]:
         """주문 목록 조회"""
         try:
-            url = f"{self.base_url}/v1/orders"
             params = {'state': state}
             
             if market:
@@ -141,11 +193,27 @@ class UpbitClient:
             
             headers = {'Authorization': self._generate_jwt_token(params)}
             
-            response = self.session.get(url, params=params, headers=headers)
-            response.raise_for_status()
+            response = self._send("GET", "/v1/orders", params=params, headers=headers)
             
             return response.json()
             
         except Exception as e:
             logger.error(f"업비트 주문 목록 조회 실패: {e}")
-            return [] 
\ No newline at end of file
+            return []
+
+
+_client: Optional[UpbitClient] = None
+_client_lock = threading.Lock()
+
+
+def get_upbit_client() -> UpbitClient:
+    """프로세스 공용 업비트 클라이언트 (최초 호출 시 생성, 세션/연결 풀 공유)
+
+    API 키가 없으면 ValueError.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = UpbitClient()
+    return _client
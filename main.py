@@ -3,11 +3,18 @@
 ATS v2 - 멀티자산 자동 거래 시스템
 """
 
+import time
+_import_started = time.perf_counter()
+
 import signal
 import sys
-import time
 from core.engine.manager import TraderManager
 from core.config import config
+from core.metrics import MetricsServer
+from core.api_server import ApiServer
+from core.profiling import profiler
+from core.sharding import ShardSupervisor
+from core.settings import ConfigError
 from utils.logger import get_logger
 
 logger = get_logger("ATS_V2_Main")
@@ -17,16 +24,91 @@ def signal_handler(signum, frame):
     logger.info(f"시그널 {signum} 수신, 종료 준비 중...")
     if 'manager' in globals():
         manager.stop()
+    if 'supervisor' in globals():
+        supervisor.stop()
+    if 'cluster_node' in globals():
+        cluster_node.stop()
     sys.exit(0)
 
+def reload_handler(signum, frame):
+    """SIGHUP: .env 와 assets.json 을 다시 읽어 설정 스냅샷 교체"""
+    try:
+        config.reload()
+    except ConfigError as e:
+        logger.error(f"설정 다시 로드 실패, 기존 설정 유지: {e}")
+        return
+    if 'manager' in globals():
+        manager.reload_config()
+
+def run_cluster(role: str):
+    """멀티노드 모드 실행 (CLUSTER_ROLE=coordinator|worker)"""
+    global cluster_node
+    if role == "coordinator":
+        from core.cluster.coordinator import Coordinator
+        cluster_node = Coordinator(config.cluster_address)
+    elif role == "worker":
+        from core.cluster.worker import ClusterWorker
+        cluster_node = ClusterWorker(config.cluster_address, config.cluster_worker_id)
+    else:
+        logger.error(f"알 수 없는 CLUSTER_ROLE: {role}")
+        return
+    cluster_node.start()
+    try:
+        while True:
+            time.sleep(60)
+            if role == "coordinator":
+                logger.info(f"코디네이터 동작 중: 워커 {cluster_node.status()}")
+            else:
+                logger.info(f"워커 동작 중: {len(cluster_node.manager.engines)}개 엔진")
+    except KeyboardInterrupt:
+        logger.info("사용자 중단 요청")
+    finally:
+        cluster_node.stop()
+        logger.info("=== ATS v2 종료 완료 ===")
+
+def run_sharded():
+    """멀티프로세스 샤드 모드 실행 (SHARDS > 1)"""
+    global supervisor
+    supervisor = ShardSupervisor(shard_count=config.shard_count,
+                                 collect_interval=config.shard_collect_interval)
+    supervisor.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"샤드 동작 중: {supervisor.alive_count()}/{len(supervisor.status())} 프로세스 활성")
+    except KeyboardInterrupt:
+        logger.info("사용자 중단 요청")
+    finally:
+        supervisor.stop()
+        logger.info("=== ATS v2 종료 완료 ===")
+
 def main():
     """메인 함수"""
     # 시그널 핸들러 등록
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload_handler)
+    profiler.install_signal_handlers()
     
     logger.info("=== ATS v2 멀티자산 트레이딩 시스템 시작 ===")
     
+    # 설정은 import 시점이 아니라 여기서 한 번 로드/검증 (잘못된 설정이면 바로 종료)
+    try:
+        config.load()
+    except ConfigError as e:
+        logger.error(f"설정 오류: {e}")
+        sys.exit(1)
+    logger.info(f"모듈 로드 시간: {(time.perf_counter() - _import_started) * 1000:.0f}ms")
+    
+    if config.cluster_role:
+        run_cluster(config.cluster_role)
+        return
+    
+    if config.shard_count > 1:
+        run_sharded()
+        return
+    
     try:
         # 트레이딩 매니저 초기화 (환경변수 기반)
         global manager
@@ -40,6 +122,16 @@ def main():
         else:
             logger.warning("업비트 API 키 미설정 - 모의거래만 가능")
         
+        # 메트릭 엔드포인트 시작 (METRICS_PORT 설정 시)
+        if config.metrics_port:
+            metrics_server = MetricsServer(config.metrics_host, config.metrics_port)
+            metrics_server.start()
+        
+        # 상태 API/SSE 서버 시작 (API_PORT 설정 시)
+        if config.api_port:
+            api_server = ApiServer(manager, config.api_host, config.api_port)
+            api_server.start()
+        
         # 시스템 시작
         manager.start()
         
@@ -49,10 +141,8 @@ def main():
                 time.sleep(60)  # 1분마다 상태 체크
                 status = manager.get_overall_status()
                 
-                if status["manager"]["is_running"]:
-                    active_engines = status["manager"]["active_threads"]
-                    total_engines = status["manager"]["total_engines"]
-                    logger.info(f"시스템 정상 동작 중: {active_engines}/{total_engines} 엔진 활성")
+                if status.is_running:
+                    logger.info(f"시스템 정상 동작 중: {status.active_threads}/{status.total_engines} 엔진 활성")
                 else:
                     logger.warning("매니저가 중지되었습니다")
                     break
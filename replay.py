@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+ATS v2 세션 재실행 (RECORD_PATH 로 기록한 세션)
+
+사용법:
+    python replay.py logs/session.jsonl.gz               # 최대 속도로 재실행 후 판단 비교
+    python replay.py logs/session.jsonl.gz --speed 10    # 기록 시간의 10배속
+    python replay.py logs/session.jsonl.gz --json
+"""
+
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기록된 세션 재실행 및 매매 판단 비교")
+    parser.add_argument("path", help="기록 파일 (RECORD_PATH)")
+    parser.add_argument("--speed", type=float, default=0.0, help="재생 배속 (0: 최대 속도)")
+    parser.add_argument("--show", type=int, default=20, help="출력할 최대 불일치 수")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args()
+    if args.speed < 0:
+        parser.error("--speed 는 0 이상이어야 함")
+
+    from core.replay import ReplayError, ReplaySession
+
+    try:
+        result = ReplaySession(args.path).run(args.speed)
+    except ReplayError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        speedup = result.recorded_span / result.elapsed if result.elapsed > 0 else float("inf")
+        print(f"🔁 재실행: 사이클 {result.cycles}, 체결 {result.trades}, "
+              f"기록 {result.recorded_span:.0f}초 -> {result.elapsed:.2f}초 ({speedup:,.0f}배속)")
+        for mismatch in result.mismatches[:args.show]:
+            print(f"  [{mismatch.symbol}] #{mismatch.index} 기록 {mismatch.expected} != 재실행 {mismatch.actual}")
+        if result.missing_inputs:
+            print(f"  기록에 없는 입력 요청 {result.missing_inputs}회")
+        print("✅ 판단 일치" if result.ok else f"❌ 불일치 {len(result.mismatches)}건")
+    sys.exit(0 if result.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
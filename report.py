@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+ATS v2 거래 성과 보고서 (거래 원장 기준)
+
+사용법:
+    python report.py                                  # 일별, 자산별 성과 + 현재 보유 평가손익
+    python report.py --period month --since 2024-01-01 --until 2025-01-01
+    python report.py --symbol BTC/USDT --mode live --no-prices
+    python report.py --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def _date(value: str) -> str:
+    """argparse 용 날짜(YYYY-MM-DD) 검증"""
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"YYYY-MM-DD 형식이 아님: {value}")
+    return value
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """YYYY-MM-DD (로컬 시간 자정) -> epoch 초"""
+    if not value:
+        return None
+    return time.mktime(datetime.strptime(value, "%Y-%m-%d").timetuple())
+
+
+def _current_prices(symbols: List[str], assets_file: str) -> Dict[str, Optional[float]]:
+    """평가손익 계산용 현재가 (조회 실패 시 빈 dict)"""
+    from core.config import config
+    from core.data_collector import DataCollector
+    from core.settings import load_assets
+    try:
+        for asset in load_assets(assets_file):
+            if asset.market:
+                config.register_market(asset.symbol, asset.market)
+        return DataCollector().get_multiple_prices(symbols)
+    except Exception as e:
+        print(f"⚠️  현재가 조회 실패, 평가손익 생략: {e}", file=sys.stderr)
+        return {}
+
+
+def _symbol(key: str) -> str:
+    """원장 자산 식별자 -> 시세 심볼"""
+    return key.partition("@")[0]
+
+
+def _format(value: Optional[float], digits: int = 0) -> str:
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거래 원장 성과 보고서")
+    parser.add_argument("--db", help="원장 경로 (기본: LEDGER_PATH)")
+    parser.add_argument("--period", choices=["day", "week", "month", "all"], default="day")
+    parser.add_argument("--since", type=_date, help="시작일 YYYY-MM-DD (포함)")
+    parser.add_argument("--until", type=_date, help="종료일 YYYY-MM-DD (미포함)")
+    parser.add_argument("--symbol", help="자산 심볼")
+    parser.add_argument("--mode", choices=["dry", "live"], help="모의/실거래 (기본: DRY_RUN)")
+    parser.add_argument("--no-prices", action="store_true", help="현재가 조회 없이 보유 현황만 표시")
+    parser.add_argument("--assets", default="config/assets.json", help="마켓 매핑용 자산 설정 파일")
+    parser.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args()
+
+    from core.config import config
+    from core.ledger import connect, performance, positions
+
+    path = args.db or config.ledger_path
+    if not path or not os.path.exists(path):
+        print(f"❌ 거래 원장이 없습니다: {path}", file=sys.stderr)
+        sys.exit(1)
+    mode = args.mode or ("dry" if config.dry_run else "live")
+    until_ts = _timestamp(args.until)
+
+    started = time.perf_counter()
+    conn = connect(path, readonly=True)
+    try:
+        rows = performance(conn, mode, args.period, args.since, args.until, args.symbol)
+        totals = [] if args.symbol else performance(conn, mode, args.period, args.since, args.until, total=True)
+        holdings = positions(conn, mode, until_ts, args.symbol)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+
+    # 종료일을 지정하면 그 시점 보유분이라 현재가 평가는 의미 없음
+    prices = {}
+    if holdings and not args.no_prices and until_ts is None:
+        # 추가 계정 원장 행은 '심볼@계정' 이므로 시세는 심볼로 조회
+        quoted = _current_prices(list(dict.fromkeys(_symbol(p.symbol) for p in holdings)), args.assets)
+        prices = {p.symbol: quoted.get(_symbol(p.symbol)) for p in holdings}
+
+    if args.json:
+        print(json.dumps({
+            "mode": mode,
+            "period": args.period,
+            "performance": [dict(row._asdict(), win_rate=row.win_rate) for row in rows + totals],
+            "positions": [dict(p._asdict(), price=prices.get(p.symbol),
+                               unrealized_pnl=p.unrealized_pnl(prices.get(p.symbol))) for p in holdings],
+            "query_seconds": elapsed,
+        }, ensure_ascii=False, indent=2))
+        return
+
+    print(f"📒 거래 성과 ({mode}, {args.period}) - 조회 {elapsed * 1000:.0f}ms")
+    header = f"{'자산':<14}{'기간':<12}{'체결':>6}{'승률':>8}{'실현손익':>14}{'거래대금':>16}{'수수료':>10}{'최대낙폭':>12}"
+    print(header)
+    print("-" * len(header))
+    for row in rows + totals:
+        win_rate = "-" if row.win_rate is None else f"{row.win_rate:.0%}"
+        print(f"{row.symbol:<14}{row.period:<12}{row.fills:>6}{win_rate:>8}{_format(row.realized_pnl):>14}"
+              f"{_format(row.turnover):>16}{_format(row.fees):>10}{_format(row.max_drawdown):>12}")
+
+    if holdings:
+        print()
+        print(f"{'보유 자산':<14}{'수량':>16}{'평단':>14}{'현재가':>14}{'평가손익':>14}")
+        for p in holdings:
+            price = prices.get(p.symbol)
+            print(f"{p.symbol:<14}{p.quantity:>16.6f}{_format(p.avg_cost, 2):>14}{_format(price, 2):>14}"
+                  f"{_format(p.unrealized_pnl(price)):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,157 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import re
+import threading
+from typing import Optional
 
-def setup_logger(name: str = "ATS_V2", level: int = logging.INFO) -> logging.Logger:
-    """로거 설정"""
-    
-    # 로그 디렉토리 생성
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # 로거 생성
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
-    # 이미 핸들러가 있으면 반환
-    if logger.handlers:
-        return logger
-    
-    # 포맷터 설정
-    formatter = logging.Formatter(
+LOG_DIR = "logs"
+LOG_FILE = "ats_v2.log"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 구조화 로그 포맷터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        extra = getattr(record, "fields", None)
+        if extra:
+            entry.update(extra)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """호출 스레드에서는 메시지 인자 병합만 하고 포맷팅은 리스너 스레드에 맡기는 핸들러"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 인자가 가변 객체일 수 있으므로 메시지는 지금 확정하고,
+        # 시간/레벨 등 나머지 포맷팅은 리스너 스레드에서 수행한다.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _build_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter(
         fmt='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    # 콘솔 핸들러
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # 파일 핸들러
-    log_file = os.path.join(log_dir, f"ats_v2_{datetime.now().strftime('%Y%m%d')}.log")
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(level)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+
+
+def _build_file_handler(formatter: logging.Formatter) -> logging.Handler:
+    """자정마다 ats_v2.log.YYYYMMDD 로 교체되는 파일 핸들러"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    handler = logging.handlers.TimedRotatingFileHandler(
+        os.path.join(LOG_DIR, os.getenv("LOG_FILE", LOG_FILE)),
+        when="midnight",
+        backupCount=int(os.getenv("LOG_BACKUP_DAYS", "30")),
+        encoding="utf-8",
+        delay=True
+    )
+    handler.suffix = "%Y%m%d"
+    handler.extMatch = re.compile(r"^\d{8}$", re.ASCII)
+    handler.setFormatter(formatter)
+    return handler
+
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None) -> logging.Logger:
+    """프로세스 공용 로깅 설정 (최초 1회)
+
+    모든 로거는 루트 로거의 QueueHandler 로 기록하고, 콘솔/파일 출력은
+    QueueListener 스레드 하나가 담당한다. 모듈 import 시점에 호출되므로 이때는
+    셸 환경변수(LOG_LEVEL, LOG_FORMAT, LOG_BACKUP_DAYS)만 보이며, .env 값은 설정
+    스냅샷이 로드될 때 apply_log_settings 로 반영된다.
+    """
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None:
+        return root
+
+    with _setup_lock:
+        if _listener is not None:
+            return root
+
+        level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+        log_format = (log_format or os.getenv("LOG_FORMAT", "text")).lower()
+        formatter = _build_formatter(log_format)
+
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        file_handler = _build_file_handler(formatter)
+
+        log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_LazyQueueHandler(log_queue))
+        root.setLevel(getattr(logging, level, logging.INFO))
+
+        listener.start()
+        _listener = listener
+        atexit.register(shutdown_logging)
+    return root
+
+
+def apply_log_settings(level: str, log_format: str, backup_days: int):
+    """설정 스냅샷의 로그 레벨/형식/보관 일수를 실행 중인 로깅에 반영 (로드/다시 로드마다)"""
+    root = configure_logging()
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    listener = _listener
+    if listener is None:
+        return
+    formatter = _build_formatter(log_format.lower())
+    for handler in listener.handlers:
+        handler.setFormatter(formatter)
+        if isinstance(handler, logging.handlers.TimedRotatingFileHandler):
+            handler.backupCount = backup_days
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 기록하고 리스너 종료"""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def setup_logger(name: str = "ATS_V2", level: Optional[int] = None) -> logging.Logger:
+    """로거 설정"""
+    configure_logging()
+    logger = logging.getLogger(name)
+    if level is not None:
+        logger.setLevel(level)
     return logger
 
+
 def get_logger(name: str = "ATS_V2") -> logging.Logger:
     """로거 인스턴스 반환"""
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        return setup_logger(name)
-    return logger 
\ No newline at end of file
+    configure_logging()
+    return logging.getLogger(name)